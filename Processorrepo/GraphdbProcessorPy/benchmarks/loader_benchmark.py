@@ -0,0 +1,78 @@
+"""Times inserting N-Quads messages into a local stand-in for the GraphDB statements endpoint that takes a fixed
+time per request: one requests.post per message on a new connection, as insert_db did, against BulkLoader.
+
+Run from the GraphdbProcessorPy directory, e.g.
+    PYTHONPATH=src python benchmarks/loader_benchmark.py --messages 500 --latency 0.005 --batch-bytes 100000
+"""
+import argparse
+import asyncio
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from GraphdbProcessorPy.loader import BulkLoader
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        time.sleep(ARGS.latency)
+        self.server.requests += 1
+        self.send_response(204)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def log_message(self, format, *args):
+        pass
+
+
+def build_messages():
+    return ["".join("<http://example.com/s{0}_{1}> <http://example.com/p> \"{1}\" .\n".format(index, triple)
+                    for triple in range(ARGS.triples)) for index in range(ARGS.messages)]
+
+
+def post_each(endpoint, messages):
+    for msg in messages:
+        requests.post(endpoint, data=msg.encode("utf-8"), headers={"Content-Type": "application/n-quads"})
+
+
+async def bulk(endpoint, messages, concurrency):
+    loader = BulkLoader(endpoint, "application/n-quads", batch_bytes=ARGS.batch_bytes, concurrency=concurrency)
+    for msg in messages:
+        await loader.add(msg)
+    await loader.close()
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    endpoint = "http://127.0.0.1:{}/repositories/RDFconnect/statements".format(server.server_address[1])
+    messages = build_messages()
+    print("{} messages of {} triples, {:.0f} ms per request".format(ARGS.messages, ARGS.triples, ARGS.latency * 1000))
+    print("{:>24} {:>10} {:>10}".format("loader", "seconds", "requests"))
+    runs = [("requests.post each", lambda: post_each(endpoint, messages))]
+    for concurrency in ARGS.concurrency:
+        runs.append(("BulkLoader x{}".format(concurrency),
+                     lambda concurrency=concurrency: asyncio.run(bulk(endpoint, messages, concurrency))))
+    for name, run in runs:
+        server.requests = 0
+        start = time.perf_counter()
+        run()
+        print("{:>24} {:>10.3f} {:>10}".format(name, time.perf_counter() - start, server.requests))
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--triples", type=int, default=100, help="triples per message")
+    parser.add_argument("--latency", type=float, default=0.005, help="seconds the server takes per request")
+    parser.add_argument("--batch-bytes", type=int, default=1_000_000)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4])
+    ARGS = parser.parse_args()
+    main()
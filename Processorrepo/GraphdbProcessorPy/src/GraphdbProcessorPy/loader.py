@@ -0,0 +1,150 @@
+import asyncio
+import re
+from concurrent.futures import ThreadPoolExecutor
+from logging import getLogger, Logger
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# formats in which two documents written one after the other still read as one document
+JOINABLE_TYPES = {"application/n-triples", "text/plain", "application/n-quads", "text/turtle",
+                  "application/x-turtle", "application/trig"}
+# formats with @prefix/@base directives, which hold up to the end of the document and so for the messages after them
+DIRECTIVE_TYPES = {"text/turtle", "application/x-turtle", "application/trig"}
+# also matches the words in IRIs and literals, which only costs such a message its batch
+DIRECTIVE = re.compile(rb"@prefix|@base|\bprefix\b|\bbase\b", re.IGNORECASE)
+
+
+class LoadError(Exception):
+    """Raised when a batch could not be inserted into GraphDB."""
+
+
+class BulkLoader:
+    """Batches RDF messages into uploads to the statements endpoint of a GraphDB repository.
+
+    Messages are sent together once batch_bytes are waiting or batch_interval seconds after the first one came in,
+    as a single document: blank node labels must not repeat across messages (the labels rdflib writes do not),
+    or the blank nodes of those messages are merged. Only N-Triples, N-Quads, Turtle and TriG are batched,
+    messages in any other format (JSON-LD, RDF/XML, ...) are uploaded one by one. A Turtle or TriG message with
+    a @prefix/@base (or PREFIX/BASE) directive is uploaded on its own as well, the directive would otherwise
+    change how the messages after it in the batch are read.
+    At most concurrency uploads run at once over a keep-alive connection pool, add() waits for a free slot.
+    Uploads are retried with exponential backoff on 5xx responses and connection errors, other failures are not.
+    A failed upload is raised as LoadError by the next add() or by close()."""
+    logger: Logger = getLogger('rdfc.BulkLoader')
+
+    def __init__(self, endpoint: str, content_type: str, batch_bytes: int = 1_000_000, batch_interval: float = 1.0,
+                 concurrency: int = 4, retries: int = 5, backoff: float = 0.5, timeout: float = 60.0):
+        self.endpoint = endpoint
+        self.content_type = content_type
+        media_type = content_type.split(";")[0].strip().lower()
+        self.joinable = media_type in JOINABLE_TYPES
+        self.directives = media_type in DIRECTIVE_TYPES
+        if not self.joinable:
+            self.logger.debug("Messages of type {} cannot be joined, uploading them one by one".format(content_type))
+        self.batch_bytes = batch_bytes
+        self.batch_interval = batch_interval
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        # one pooled keep-alive connection per concurrent upload
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(1, concurrency))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.slots = asyncio.Semaphore(max(1, concurrency))
+        # the blocking posts run in threads of their own, not in the default executor shared with the runner
+        self.threads = ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="graphdb")
+        self.batch: list[bytes] = []
+        self.size = 0
+        self.timer: asyncio.TimerHandle | None = None
+        self.uploads: set[asyncio.Task] = set()
+        self.error: LoadError | None = None
+        self.sent = 0
+
+    async def add(self, data: str) -> None:
+        self.raise_error()
+        encoded = data.encode("utf-8")
+        alone = not self.joinable or (self.directives and DIRECTIVE.search(encoded) is not None)
+        if alone:
+            # the batch so far is sent first, so the message is read without the directives of the others
+            await self.flush()
+        self.batch.append(encoded)
+        self.size += len(encoded)
+        if self.size >= self.batch_bytes or alone:
+            await self.flush()
+        elif self.timer is None and self.batch_interval > 0:
+            self.timer = asyncio.get_running_loop().call_later(self.batch_interval, self.flush_later)
+
+    async def flush(self) -> None:
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        if not self.batch:
+            return
+        # messages are joined on a newline, so a message without a final one cannot run into the next
+        body = b"\n".join(self.batch)
+        messages = len(self.batch)
+        self.batch = []
+        self.size = 0
+        await self.slots.acquire()
+        self.track(self.upload(body, messages))
+
+    def flush_later(self) -> None:
+        self.track(self.flush())
+
+    def track(self, coroutine) -> None:
+        task = asyncio.get_running_loop().create_task(coroutine)
+        self.uploads.add(task)
+        task.add_done_callback(self.uploads.discard)
+
+    async def upload(self, body: bytes, messages: int) -> None:
+        try:
+            await self.post(body, messages)
+        except LoadError as e:
+            self.logger.error(str(e))
+            if self.error is None:
+                self.error = e
+        finally:
+            self.slots.release()
+
+    async def post(self, body: bytes, messages: int) -> None:
+        for attempt in range(self.retries + 1):
+            try:
+                response = await asyncio.get_running_loop().run_in_executor(self.threads, self.send, body)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                problem = "could not reach GraphDB ({})".format(e)
+            else:
+                if response.status_code < 300:
+                    self.sent += messages
+                    self.logger.debug("Inserted {} messages ({} bytes) into {}".format(messages, len(body), self.endpoint))
+                    return
+                problem = "GraphDB answered {}: {}".format(response.status_code, response.text[:500])
+                if response.status_code < 500:
+                    raise LoadError("Failed to insert {} messages into {}, {}".format(messages, self.endpoint, problem))
+            if attempt < self.retries:
+                delay = self.backoff * 2 ** attempt
+                self.logger.warning("Upload to {} failed, {}, retrying in {:.1f} s".format(self.endpoint, problem, delay))
+                await asyncio.sleep(delay)
+        raise LoadError("Failed to insert {} messages into {} after {} attempts, {}".format(
+            messages, self.endpoint, self.retries + 1, problem))
+
+    def send(self, body: bytes) -> requests.Response:
+        return self.session.post(self.endpoint, data=body, timeout=self.timeout,
+                                 headers={"Content-Type": self.content_type})
+
+    def raise_error(self) -> None:
+        if self.error is not None:
+            raise self.error
+
+    async def close(self) -> None:
+        """Send what is left, wait for all uploads and close the connections."""
+        try:
+            await self.flush()
+            while self.uploads:
+                await asyncio.gather(*list(self.uploads))
+        finally:
+            self.threads.shutdown()
+            self.session.close()
+        self.raise_error()
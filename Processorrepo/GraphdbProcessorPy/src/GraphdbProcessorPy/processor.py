@@ -1,17 +1,29 @@
 import logging
 from dataclasses import dataclass
 from logging import getLogger, Logger
-import requests
 
 from rdfc_runner import Processor, ProcessorArgs, Reader, Writer
 
+from .loader import BulkLoader
+
+# GraphDB configuration
+GRAPHDB_BASE_URL = "http://localhost:7200"
+REPOSITORY = "RDFconnect"  # replace with your repository name
+
 
 # --- Type Definitions ---
 @dataclass
 class TemplateArgs(ProcessorArgs):
     reader: Reader
     type: str
-    
+    baseUrl: str = GRAPHDB_BASE_URL
+    repository: str = REPOSITORY
+    batchBytes: int = 1_000_000
+    batchInterval: float = 1.0
+    maxConcurrency: int = 4
+    maxRetries: int = 5
+    retryBackoff: float = 0.5
+    timeout: float = 60.0
 
 
 # --- Processor Implementation ---
@@ -20,53 +32,31 @@ class GraphdbProcessorPy(Processor[TemplateArgs]):
 
     def __init__(self, args: TemplateArgs):
         super().__init__(args)
+        self.loader: BulkLoader | None = None
         self.logger.debug(msg="Created TemplateProcessor with args: {}".format(args))
 
     async def init(self) -> None:
         """This is the first function that is called (and awaited) when creating a processor.
         This is the perfect location to start things like database connections."""
         self.logger.debug("Initializing TemplateProcessor with args: {}", self.args)
+        endpoint = "{}/repositories/{}/statements".format(self.args.baseUrl.rstrip("/"), self.args.repository)
+        # HTTP headers: Content-Type is the format of the RDF data, e.g. "text/turtle" or "application/n-quads"
+        self.loader = BulkLoader(endpoint, self.args.type,
+                                 batch_bytes=self.args.batchBytes, batch_interval=self.args.batchInterval,
+                                 concurrency=self.args.maxConcurrency, retries=self.args.maxRetries,
+                                 backoff=self.args.retryBackoff, timeout=self.args.timeout)
 
     async def transform(self) -> None:
         
-        async for msg in self.args.reader.strings():
-            self.insert_db(msg)
+        # messages are batched and inserted in the background, a batch that could not be inserted is raised here
+        try:
+            async for msg in self.args.reader.strings():
+                await self.loader.add(msg)
+        finally:
+            await self.loader.close()
+        self.logger.info("Inserted {} messages into {}".format(self.loader.sent, self.loader.endpoint))
 
     async def produce(self) -> None:
         """Function to start the production of data, starting the pipeline.
         This function is called after all processors are completely set up."""
         pass
-#####################################################################################
-
-    def insert_db(self,rdf_data):
-        # GraphDB configuration
-        GRAPHDB_BASE_URL = "http://localhost:7200"
-        REPOSITORY = " RDFconnect"  # replace with your repository name
-        ENDPOINT = f"{GRAPHDB_BASE_URL}/repositories/{REPOSITORY}/statements"
-        # HTTP headers
-        headers = { #"text/turtle"
-            "Content-Type": self.args.type,  # Format of RDF data
-        }
-
-        try:
-            # POST the RDF data to GraphDB
-            response = requests.post("http://localhost:7200/repositories/RDFconnect/statements", data=rdf_data.encode("utf-8"), headers=headers)
-
-            # Check response
-            if response.status_code == 204:
-                self.logger.debug("Data inserted successfully!")
-            else:
-                self.logger.debug(f"Failed to insert data: {response.status_code}")
-                self.logger.debug(response.text)
-
-        except requests.exceptions.ConnectionError as e:
-            self.logger.debug("Could not connect to GraphDB. Is the server running?")
-            self.logger.debug(f"Details: {e}")
-
-        except requests.exceptions.Timeout:
-            self.logger.debug("Request to GraphDB timed out. The server may be too slow or unreachable.")
-
-        except requests.exceptions.RequestException as e:
-            # Catches all other requests-related errors
-            self.logger.debug("An unexpected error occurred while communicating with GraphDB.")
-            self.logger.debug(f"Details: {e}")
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import GraphdbProcessorPy.processor as processor
+from GraphdbProcessorPy.loader import LoadError
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages, pause=0.0):
+        self._messages = messages
+        self._pause = pause
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+            await asyncio.sleep(self._pause)
+
+
+class GraphDB(ThreadingHTTPServer):
+    """Stand-in for the statements endpoint: records every request and answers with the queued statuses, 204 after."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), Handler)
+        self.requests = []
+        self.statuses = []
+        self.delay = 0.0
+        self.running = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:{}".format(self.server_address[1])
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self):
+        server = self.server
+        body = self.rfile.read(int(self.headers["Content-Length"]))
+        with server.lock:
+            server.running += 1
+            server.peak = max(server.peak, server.running)
+            status = server.statuses.pop(0) if server.statuses else 204
+        time.sleep(server.delay)
+        with server.lock:
+            server.running -= 1
+            server.requests.append({"path": self.path, "type": self.headers["Content-Type"], "body": body,
+                                    "port": self.client_address[1]})
+        text = b"" if status == 204 else b"error"
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(text)))
+        self.end_headers()
+        self.wfile.write(text)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def graphdb():
+    server = GraphDB()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_processor(messages, url, pause=0.0, type="application/n-quads", **options):
+    args = processor.TemplateArgs(reader=DummyReader(messages, pause), type=type, baseUrl=url, **options)
+    return processor.GraphdbProcessorPy(args)
+
+
+def message(index):
+    return "<http://example.com/s{0}> <http://example.com/p> \"{0}\" .\n".format(index)
+
+
+async def load(messages, url, **options):
+    proc = make_processor(messages, url, **options)
+    await proc.init()
+    await proc.transform()
+    return proc
+
+
+@pytest.mark.asyncio
+async def test_messages_are_batched_by_size_over_one_connection(graphdb):
+    messages = [message(index) for index in range(20)]
+    proc = await load(messages, graphdb.url, repository="repo", batchBytes=len(messages[0]) * 5, maxConcurrency=1)
+    assert len(graphdb.requests) == 4
+    assert {request["path"] for request in graphdb.requests} == {"/repositories/repo/statements"}
+    assert {request["type"] for request in graphdb.requests} == {"application/n-quads"}
+    assert b"\n".join(request["body"] for request in graphdb.requests) == "\n".join(messages).encode("utf-8")
+    # the connection is kept alive between uploads
+    assert len({request["port"] for request in graphdb.requests}) == 1
+    assert proc.loader.sent == 20
+
+
+@pytest.mark.asyncio
+async def test_batch_is_sent_after_the_interval(graphdb):
+    proc = make_processor([message(1)], graphdb.url, batchInterval=0.05)
+    await proc.init()
+    await proc.loader.add(message(1))
+    await asyncio.sleep(0.5)
+    # sent by the timer, before the loader is closed
+    assert len(graphdb.requests) == 1
+    await proc.loader.add(message(2))
+    await proc.loader.close()
+    assert [request["body"] for request in graphdb.requests] == [message(1).encode(), message(2).encode()]
+
+
+@pytest.mark.asyncio
+async def test_uploads_run_with_bounded_concurrency(graphdb):
+    graphdb.delay = 0.1
+    await load([message(index) for index in range(12)], graphdb.url, batchBytes=1, maxConcurrency=3)
+    assert len(graphdb.requests) == 12
+    assert 1 < graphdb.peak <= 3
+
+
+@pytest.mark.asyncio
+async def test_server_errors_are_retried_with_backoff(graphdb, caplog):
+    graphdb.statuses = [503, 500]
+    caplog.set_level(logging.WARNING)
+    start = time.perf_counter()
+    proc = await load([message(1)], graphdb.url, batchBytes=1, retryBackoff=0.1)
+    # waited 0.1 s and 0.2 s before the retries
+    assert time.perf_counter() - start >= 0.3
+    assert [request["body"] for request in graphdb.requests] == [message(1).encode()] * 3
+    assert caplog.text.count("retrying") == 2
+    assert proc.loader.sent == 1
+
+
+@pytest.mark.asyncio
+async def test_client_errors_are_raised_without_retry(graphdb, caplog):
+    graphdb.statuses = [400]
+    with pytest.raises(LoadError, match="400"):
+        await load([message(1), message(2)], graphdb.url, batchBytes=1, maxConcurrency=1, pause=0.2)
+    assert len(graphdb.requests) == 1
+    assert "Failed to insert 1 messages" in caplog.text
+
+
+@pytest.mark.asyncio
+async def test_unreachable_server_is_raised_after_the_retries():
+    with socket.socket() as unused:
+        unused.bind(("127.0.0.1", 0))
+        url = "http://127.0.0.1:{}".format(unused.getsockname()[1])
+    with pytest.raises(LoadError, match="after 3 attempts, could not reach GraphDB"):
+        await load([message(1)], url, batchBytes=1, maxRetries=2, retryBackoff=0.01)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content_type", ["application/ld+json", "application/rdf+xml"])
+async def test_formats_that_cannot_be_joined_are_sent_one_by_one(graphdb, content_type):
+    messages = ['{{"@id": "http://example.com/s{0}", "http://example.com/p": "{0}"}}'.format(index)
+                for index in range(3)]
+    await load(messages, graphdb.url, type=content_type, maxConcurrency=1)
+    assert [request["body"] for request in graphdb.requests] == [msg.encode("utf-8") for msg in messages]
+    assert {request["type"] for request in graphdb.requests} == {content_type}
+
+
+@pytest.mark.asyncio
+async def test_turtle_messages_are_joined(graphdb):
+    messages = ["<http://example.com/s{0}> <http://example.com/p> \"{0}\" .\n".format(index) for index in range(3)]
+    await load(messages, graphdb.url, type="text/turtle; charset=utf-8", maxConcurrency=1)
+    assert [request["body"] for request in graphdb.requests] == ["\n".join(messages).encode("utf-8")]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("content_type", ["text/turtle", "application/trig"])
+async def test_turtle_messages_with_directives_are_sent_on_their_own(graphdb, content_type):
+    # joined, the @base and PREFIX of a message would change the IRIs of the ones after it
+    plain = ["<http://example.com/s{0}> <http://example.com/p> <o> .\n".format(index) for index in range(4)]
+    messages = [plain[0], plain[1], "@base <http://example.org/> .\n<s> <p> <o> .\n", plain[2],
+                "PREFIX ex: <http://example.org/>\nex:s ex:p ex:o .\n", plain[3]]
+    await load(messages, graphdb.url, type=content_type, maxConcurrency=1)
+    assert [request["body"] for request in graphdb.requests] == [
+        "\n".join(plain[:2]).encode(), messages[2].encode(), plain[2].encode(), messages[4].encode(), plain[3].encode()]
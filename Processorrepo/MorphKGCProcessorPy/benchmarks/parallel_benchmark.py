@@ -0,0 +1,67 @@
+"""Times MorphKGCProcessorPy materialization of one large CSV message for 1..N worker processes.
+
+Run from the pipeline directory, e.g.
+    python ../Processorrepo/MorphKGCProcessorPy/benchmarks/parallel_benchmark.py --copies 20 --max-workers 8
+"""
+import argparse
+import asyncio
+import os
+import time
+
+import pandas as pd
+
+import MorphKGCProcessorPy.processor as processor
+
+
+async def run(csv, workers, partition_by):
+    args = processor.TemplateArgs(reader=None, writer=None, loc=ARGS.mapping,
+                                  workers=workers, partitionBy=partition_by)
+    proc = processor.MorphKGCProcessorPy(args)
+    await proc.init()
+    if proc.pool:
+        # warm up the pool so that process start and mapping parsing are not timed
+        loop = asyncio.get_running_loop()
+        head = proc.read_message(csv).head(1)
+        await asyncio.gather(*(loop.run_in_executor(proc.pool, processor._materialize_part, head)
+                               for _ in range(workers)))
+        start = time.perf_counter()
+        triples = len(await proc.materialize_parallel(csv))
+        elapsed = time.perf_counter() - start
+        proc.pool.shutdown()
+    else:
+        start = time.perf_counter()
+        triples = len(proc.materialize(csv))
+        elapsed = time.perf_counter() - start
+    return elapsed, triples
+
+
+def main():
+    df = pd.read_csv(ARGS.csv, dtype=str, keep_default_na=False)
+    # shift the timestamps of every copy so that the rows stay distinct
+    copies = []
+    for i in range(ARGS.copies):
+        copy = df.copy()
+        copy["Timestamp"] = copy["Timestamp"] + "_" + str(i)
+        copies.append(copy)
+    csv = pd.concat(copies).to_csv(index=False)
+    rows = len(df) * ARGS.copies
+
+    baseline = None
+    workers = 1
+    while workers <= ARGS.max_workers:
+        elapsed, triples = asyncio.run(run(csv, workers, ARGS.partition_by))
+        baseline = baseline or elapsed
+        print("{:>3} workers: {:8.2f} s  {:>9} triples  {:>9.0f} rows/s  speedup {:.2f}x".format(
+            workers, elapsed, triples, rows / elapsed, baseline / elapsed))
+        workers *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="./WFresources/sample_data.csv")
+    parser.add_argument("--mapping", default="./WFresources/KGCMapping.rml.ttl")
+    parser.add_argument("--copies", type=int, default=10)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    parser.add_argument("--partition-by", default="", help="column to partition on, e.g. ts_id")
+    ARGS = parser.parse_args()
+    main()
@@ -1,9 +1,17 @@
 import logging
 from dataclasses import dataclass
 from logging import getLogger, Logger
-import morph_kgc
+import asyncio
+import io
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from morph_kgc.args_parser import load_config_from_argument
+from morph_kgc.constants import RML_REFERENCE, RML_TEMPLATE, RML_TRIPLES_MAP_CLASS
+from morph_kgc.mapping.mapping_parser import retrieve_mappings
+from morph_kgc.materializer import _materialize_mapping_group_to_set
+from morph_kgc.utils import get_references_in_template
 from rdflib import Graph
-import csv
 
 from rdfc_runner import Processor, ProcessorArgs, Reader, Writer
 
@@ -14,6 +22,57 @@ class TemplateArgs(ProcessorArgs):
     reader: Reader
     writer: Writer
     loc: str
+    workers: int = 1
+    partitionBy: str = ""
+
+
+# name of the in-memory data source that every message is bound to
+MESSAGE_SOURCE = "message"
+
+
+def load_mapping(config_str):
+    # parse, normalize and partition the mapping, returns everything needed to materialize a message
+    config = load_config_from_argument(config_str)
+    rml_df, fnml_df, http_api_df = retrieve_mappings(config)
+    config.set('CONFIGURATION', 'http_api_df', http_api_df.to_csv())
+    asserted_mapping_df = rml_df.loc[rml_df['triples_map_type'] == RML_TRIPLES_MAP_CLASS]
+    mapping_groups = [group for _, group in asserted_mapping_df.groupby(by='mapping_partition')]
+    return config, rml_df, fnml_df, mapping_groups
+
+
+def mapping_columns(rml_df) -> set:
+    # the columns of the message that the references and templates of the term maps read
+    columns = set()
+    for position in ('subject', 'predicate', 'object', 'lang_datatype', 'graph'):
+        for map_type, value in zip(rml_df[position + '_map_type'], rml_df[position + '_map_value']):
+            if map_type == RML_REFERENCE:
+                columns.add(value)
+            elif map_type == RML_TEMPLATE:
+                columns.update(get_references_in_template(value))
+    return columns
+
+
+def materialize_frame(mapping, df) -> set:
+    config, rml_df, fnml_df, mapping_groups = mapping
+    python_source = {MESSAGE_SOURCE: df}
+    triples = set()
+    for mapping_group in mapping_groups:
+        triples.update(_materialize_mapping_group_to_set(mapping_group, rml_df, fnml_df, config, python_source))
+    return triples
+
+
+# mapping loaded once in every process of the pool
+_worker_mapping = None
+
+
+def _init_worker(config_str):
+    global _worker_mapping
+    _worker_mapping = load_mapping(config_str)
+
+
+def _materialize_part(df) -> set:
+    # the N-Triples statements of the part, deduplicated with the other parts by the caller
+    return materialize_frame(_worker_mapping, df)
 
 
 # --- Processor Implementation ---
@@ -22,18 +81,19 @@ class MorphKGCProcessorPy(Processor[TemplateArgs]):
 
     def __init__(self, args: TemplateArgs):
         super().__init__(args)
-        self.clear_temp_file()
         self.finalGraph: Graph | None = None
+        self.pool: ProcessPoolExecutor | None = None
+        # file_path with braces makes morph-kgc read the data source from python_source instead of disk
         self.config_str = f"""
 [DEFAULT]
 main_dir: ./
 
 [CONFIGURATION]
-output_file: knowledge-graph.ttl
+number_of_processes: 1
 
 [DataSource1]
 mappings: {self.args.loc}
-file_path: temp_data.csv
+file_path: {{{MESSAGE_SOURCE}}}
 """
 
 
@@ -42,32 +102,72 @@ file_path: temp_data.csv
     async def init(self) -> None:
 
         self.logger.debug("Initializing TemplateProcessor with args: {}", self.args)
+        # parse, normalize and partition the mapping once instead of on every message
+        self.mapping = load_mapping(self.config_str)
+        if self.args.partitionBy:
+            # every message has the columns the mapping reads, so only those can be partitioned by
+            columns = mapping_columns(self.mapping[1])
+            if self.args.partitionBy not in columns:
+                raise ValueError("partitionBy {!r} is not a column the mapping reads, expected one of: {}".format(
+                    self.args.partitionBy, ", ".join(sorted(columns))))
+            if self.args.workers <= 1:
+                self.logger.warning("partitionBy is only used with more than one worker")
+        if self.args.workers > 1:
+            # every worker process loads the mapping once when it starts
+            self.pool = ProcessPoolExecutor(max_workers=self.args.workers,
+                                            initializer=_init_worker, initargs=(self.config_str,))
 
     async def transform(self) -> None:
-        async for msg in self.args.reader.strings():
-            self.write_temp_file(msg)
-            self.finalGraph = self.materialize()
-            self.clear_temp_file()
-            await self.args.writer.string(self.finalGraph.serialize(format="turtle"))
-            await self.args.writer.close()
+        try:
+            async for msg in self.args.reader.strings():
+                if self.pool:
+                    self.finalGraph = await self.materialize_parallel(msg)
+                else:
+                    self.finalGraph = self.materialize(msg)
+                await self.args.writer.string(self.finalGraph.serialize(format="turtle"))
+        finally:
+            if self.pool:
+                # waiting for the workers to exit is left to a thread, not the event loop
+                await asyncio.get_running_loop().run_in_executor(None, self.pool.shutdown)
+                self.pool = None
+        await self.args.writer.close()
 
 
     async def produce(self) -> None:
         pass
 
 ########################################################################################
-    def clear_temp_file(self) -> None:
-        with open("./temp_data.csv", "w", encoding="utf-8") as outfile:
-            pass
-
-    def write_temp_file(self,msg) -> None:
-        # Open the destination file
-        with open("temp_data.csv", "a", encoding="utf-8") as outfile:
-            outfile.write(msg)
-    
-    def materialize(self):
-        graph = Graph()
+    def read_message(self, msg):
+        # the message is handed to morph-kgc as a DataFrame, nothing is written to disk
+        return pd.read_csv(io.StringIO(msg), dtype=str, keep_default_na=False)
+
+    def materialize_triples(self, msg) -> set:
+        return materialize_frame(self.mapping, self.read_message(msg))
+
+    def partition(self, df) -> list:
+        # split by a column such as ts_id when configured, otherwise into one row range per worker
+        if self.args.partitionBy:
+            if self.args.partitionBy not in df.columns:
+                raise ValueError("the message has no {!r} column to partition by".format(self.args.partitionBy))
+            parts = [part for _, part in df.groupby(self.args.partitionBy, sort=False)]
+        else:
+            parts = [df.iloc[rows] for rows in np.array_split(np.arange(len(df)), self.args.workers)]
+        return [part for part in parts if not part.empty]
+
+    async def materialize_parallel(self, msg):
+        # parts are materialized across the pool, their triples deduplicated and loaded as in materialize
+        loop = asyncio.get_running_loop()
+        parts = self.partition(self.read_message(msg))
+        chunks = await asyncio.gather(*(loop.run_in_executor(self.pool, _materialize_part, part) for part in parts))
+        return self.triples_graph(set().union(*chunks))
+
+    def materialize(self, msg):
         # generate the triples and load them to an RDFLib graph
-        graph = morph_kgc.materialize(self.config_str)
+        return self.triples_graph(self.materialize_triples(msg))
+
+    def triples_graph(self, triples):
+        graph = Graph()
+        if triples:
+            graph.parse(data='.\n'.join(triples) + '.', format='nquads')
         return graph
-    
+
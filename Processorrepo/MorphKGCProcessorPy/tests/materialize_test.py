@@ -0,0 +1,125 @@
+from unittest.mock import AsyncMock
+
+import morph_kgc
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+import MorphKGCProcessorPy.processor as processor
+
+MAPPING = """
+@prefix rr:  <http://www.w3.org/ns/r2rml#> .
+@prefix rml: <http://semweb.mmlab.be/ns/rml#> .
+@prefix ql:  <http://semweb.mmlab.be/ns/ql#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+
+<http://example.com/#SensorMapping> a rr:TriplesMap ;
+  rml:logicalSource [ rml:referenceFormulation ql:CSV ] ;
+  rr:subjectMap [ rr:template "http://example.com/reading_{ts_id}_{Timestamp}" ] ;
+  rr:predicateObjectMap [ rr:predicate rdf:type ; rr:objectMap [ rr:constant sosa:Observation ] ] ;
+  rr:predicateObjectMap [ rr:predicate sosa:madeBySensor ; rr:objectMap [ rml:reference "ts_id" ] ] ;
+  rr:predicateObjectMap [
+    rr:predicate sosa:hasSimpleResult ;
+    rr:objectMap [ rml:reference "Value" ; rr:datatype xsd:double ]
+  ] ;
+  rr:predicateObjectMap [
+    rr:predicate sosa:resultTime ;
+    rr:objectMap [ rml:reference "Timestamp" ; rr:datatype xsd:dateTime ]
+  ] .
+"""
+
+CSV = """Timestamp,Value,ts_id
+2025-08-12T12:15:00+00:00,1010.49,78124042
+2025-08-12T12:30:00+00:00,,78124042
+2025-08-12T12:15:00+00:00,3.5,78124043
+2025-08-12T12:15:00+00:00,3.5,78124043
+"""
+
+
+def reference_graph(tmp_path, mapping_file):
+    # morph-kgc itself, reading the same CSV from disk
+    csv_file = tmp_path / "data.csv"
+    csv_file.write_text(CSV, encoding="utf-8")
+    return morph_kgc.materialize("""
+[CONFIGURATION]
+number_of_processes: 1
+
+[DataSource1]
+mappings: {}
+file_path: {}
+""".format(mapping_file, csv_file))
+
+
+@pytest.mark.asyncio
+async def test_materialize_matches_morph_kgc(tmp_path):
+    mapping_file = tmp_path / "mapping.rml.ttl"
+    mapping_file.write_text(MAPPING, encoding="utf-8")
+    proc = processor.MorphKGCProcessorPy(processor.TemplateArgs(reader=None, writer=None, loc=str(mapping_file)))
+    await proc.init()
+
+    graph = proc.materialize(CSV)
+    expected = reference_graph(tmp_path, mapping_file)
+    assert len(graph) == len(expected) == 11
+    assert isomorphic(graph, expected)
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+async def transform(mapping_file, **options):
+    writer = AsyncMock()
+    args = processor.TemplateArgs(reader=DummyReader([CSV]), writer=writer, loc=str(mapping_file), **options)
+    proc = processor.MorphKGCProcessorPy(args)
+    await proc.init()
+    await proc.transform()
+    writer.close.assert_awaited_once()
+    assert proc.pool is None
+    [output] = [call.args[0] for call in writer.string.await_args_list]
+    return output
+
+
+@pytest.mark.asyncio
+async def test_pool_output_is_the_sequential_graph(tmp_path):
+    mapping_file = tmp_path / "mapping.rml.ttl"
+    mapping_file.write_text(MAPPING, encoding="utf-8")
+    sequential = await transform(mapping_file)
+    # the duplicate rows end up in different row ranges
+    parallel = await transform(mapping_file, workers=4)
+    # both are Turtle, with the triples of the duplicate rows written once
+    expected = Graph().parse(data=sequential, format="turtle")
+    result = Graph().parse(data=parallel, format="turtle")
+    assert len(result) == len(expected) == 11
+    assert isomorphic(result, expected)
+
+
+@pytest.mark.asyncio
+async def test_partition_column_must_be_read_by_the_mapping(tmp_path):
+    mapping_file = tmp_path / "mapping.rml.ttl"
+    mapping_file.write_text(MAPPING, encoding="utf-8")
+    args = processor.TemplateArgs(reader=DummyReader([CSV]), writer=AsyncMock(), loc=str(mapping_file),
+                                  workers=2, partitionBy="sensor")
+    proc = processor.MorphKGCProcessorPy(args)
+    # the columns of the subject template and the references, no KeyError on the first message
+    with pytest.raises(ValueError, match="partitionBy 'sensor' is not a column the mapping reads, "
+                                         "expected one of: Timestamp, Value, ts_id"):
+        await proc.init()
+    assert proc.pool is None
+
+
+@pytest.mark.asyncio
+async def test_partitioned_output_is_the_sequential_graph(tmp_path):
+    mapping_file = tmp_path / "mapping.rml.ttl"
+    mapping_file.write_text(MAPPING, encoding="utf-8")
+    sequential = await transform(mapping_file)
+    parallel = await transform(mapping_file, workers=2, partitionBy="ts_id")
+    assert isomorphic(Graph().parse(data=parallel, format="turtle"), Graph().parse(data=sequential, format="turtle"))
@@ -0,0 +1,71 @@
+"""Compares the rdflib graph path of PrettifyProcessorPy with the streaming prettifier.
+
+Every run happens in a fresh process so that the reported peak RSS belongs to one path only, e.g.
+    python benchmarks/streaming_benchmark.py --observations 200000 --message-size 5000
+"""
+import argparse
+import resource
+import subprocess
+import sys
+import time
+
+from rdflib import Graph
+
+from PrettifyProcessorPy.streaming import StreamingPrettifier, parse_prefixes, read_triples
+
+SOSA = "http://www.w3.org/ns/sosa/"
+XSD_DOUBLE = "<http://www.w3.org/2001/XMLSchema#double>"
+
+
+def messages(observations, message_size):
+    for start in range(0, observations, message_size):
+        lines = []
+        for i in range(start, min(start + message_size, observations)):
+            subject = "<http://example.com/reading_{}_{}>".format(i % 5, i)
+            lines.append("{} <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <{}Observation> .\n".format(subject, SOSA))
+            lines.append('{} <{}madeBySensor> "{}" .\n'.format(subject, SOSA, i % 5))
+            lines.append('{} <{}hasSimpleResult> "{}.25"^^{} .\n'.format(subject, SOSA, i, XSD_DOUBLE))
+        yield "".join(lines)
+
+
+def run_rdflib():
+    graph = Graph()
+    graph.bind("sosa", SOSA)
+    for msg in messages(ARGS.observations, ARGS.message_size):
+        graph.parse(data=msg, format="turtle")
+    return len(graph.serialize(format="turtle"))
+
+
+def run_streaming():
+    prettifier = StreamingPrettifier(parse_prefixes("sosa=" + SOSA), ARGS.window_size, ARGS.spill)
+    size = 0
+    for msg in messages(ARGS.observations, ARGS.message_size):
+        size += len(prettifier.add(read_triples(msg)))
+    for chunk in prettifier.flush(1024 * 1024):
+        size += len(chunk)
+    return size
+
+
+def main():
+    if ARGS.path:
+        start = time.perf_counter()
+        size = run_rdflib() if ARGS.path == "rdflib" else run_streaming()
+        elapsed = time.perf_counter() - start
+        peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        triples = ARGS.observations * 3
+        print("{:>9}: {:8.2f} s  {:>10.0f} triples/s  peak RSS {:8.1f} MiB  {:>11} chars".format(
+            ARGS.path, elapsed, triples / elapsed, peak_mib, size))
+        return
+    for path in ("rdflib", "streaming"):
+        subprocess.run([sys.executable, __file__, "--path", path] + sys.argv[1:], check=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--observations", type=int, default=100000)
+    parser.add_argument("--message-size", type=int, default=5000)
+    parser.add_argument("--window-size", type=int, default=100000)
+    parser.add_argument("--spill", action="store_true")
+    parser.add_argument("--path", choices=["rdflib", "streaming"])
+    ARGS = parser.parse_args()
+    main()
@@ -1,9 +1,11 @@
 import logging
 from dataclasses import dataclass
 from logging import getLogger, Logger
+import tempfile
 from rdflib import Graph,URIRef,Namespace,BNode,Literal
 from rdflib.namespace import XSD,RDF
 from rdfc_runner import Processor, ProcessorArgs, Reader, Writer
+from .streaming import StreamingPrettifier, parse_prefixes, read_triples
 
 
 # --- Type Definitions ---
@@ -11,6 +13,14 @@ from rdfc_runner import Processor, ProcessorArgs, Reader, Writer
 class TemplateArgs(ProcessorArgs):
     reader: Reader
     writer: Writer
+    mode: str = "accumulate"
+    prefixes: str = ""
+    windowSize: int = 100000
+    spill: bool = False
+
+
+# size of the messages written at the end of a streamed document
+STREAM_BATCH_BYTES = 1024 * 1024
 
 
 # --- Processor Implementation ---
@@ -30,7 +40,17 @@ class PrettifyProcessorPy(Processor[TemplateArgs]):
         """Function to start reading channels.
         This function is called for each processor before `produce` is called.
         Listen to the incoming stream, log them, and push them to the outgoing stream."""
-        
+
+        if self.args.mode == "delta":
+            await self.transform_delta()
+            return
+        if self.args.mode == "final":
+            await self.transform_final()
+            return
+        if self.args.mode == "stream":
+            await self.transform_streaming()
+            return
+
         graph = Graph()
         
         async for msg in self.args.reader.strings():
@@ -60,6 +80,70 @@ class PrettifyProcessorPy(Processor[TemplateArgs]):
 
             
 
+    async def transform_delta(self) -> None:
+        """Pretty-print every message on its own, only the triples of the current message are emitted."""
+        namespaces = Graph().namespace_manager
+        async for msg in self.args.reader.strings():
+            graph = Graph(namespace_manager=namespaces)
+            graph.parse(data=msg, format="turtle")
+            await self.args.writer.string(graph.serialize(format="turtle"))
+        await self.args.writer.close()
+
+    async def transform_final(self) -> None:
+        """Emit one consolidated document at the end of the stream.
+        Each message is pretty-printed on arrival and spooled to disk, so only one message is held as a graph.
+        The document is written in messages of about STREAM_BATCH_BYTES, each starting with all prefixes."""
+        namespaces = Graph().namespace_manager
+        prefixes: dict[str, None] = {}
+        # length of every spooled body, the messages are cut between them
+        sizes = []
+        with tempfile.TemporaryFile(mode="w+", encoding="utf-8") as spool:
+            async for msg in self.args.reader.strings():
+                # all messages share the prefix bindings, so the bodies fit under one prefix header
+                graph = Graph(namespace_manager=namespaces)
+                graph.parse(data=msg, format="turtle")
+                message_prefixes, body = self.split_prefixes(graph.serialize(format="turtle"))
+                prefixes.update(dict.fromkeys(message_prefixes))
+                spool.write(body)
+                sizes.append(len(body))
+            spool.seek(0)
+            header = "".join(prefix + "\n" for prefix in prefixes) + "\n"
+            batch = []
+            size = 0
+            for length in sizes:
+                batch.append(spool.read(length))
+                size += length
+                if size >= STREAM_BATCH_BYTES:
+                    await self.args.writer.string(header + "".join(batch))
+                    batch = []
+                    size = 0
+            if batch or not sizes:
+                await self.args.writer.string(header + "".join(batch))
+        await self.args.writer.close()
+
+    async def transform_streaming(self) -> None:
+        """Group triples by subject in a bounded window instead of a graph, memory does not grow with the input.
+        Every emitted message starts with the prefix declarations so that it can be parsed on its own."""
+        prettifier = StreamingPrettifier(parse_prefixes(self.args.prefixes), self.args.windowSize, self.args.spill)
+        async for msg in self.args.reader.strings():
+            turtle = prettifier.add(read_triples(msg))
+            if turtle:
+                await self.args.writer.string(prettifier.header + turtle)
+        for turtle in prettifier.flush(STREAM_BATCH_BYTES):
+            await self.args.writer.string(prettifier.header + turtle)
+        await self.args.writer.close()
+
+    def split_prefixes(self, turtle: str):
+        prefixes = []
+        lines = turtle.split("\n")
+        position = 0
+        while position < len(lines) and (lines[position].startswith("@prefix") or not lines[position].strip()):
+            if lines[position].strip():
+                prefixes.append(lines[position])
+            position += 1
+        body = "\n".join(lines[position:])
+        return prefixes, body.strip("\n") + "\n\n" if body.strip() else ""
+
     async def produce(self) -> None:
         """Function to start the production of data, starting the pipeline.
         This function is called after all processors are completely set up."""
@@ -0,0 +1,168 @@
+import heapq
+import os
+import re
+import tempfile
+from itertools import groupby
+from logging import getLogger, Logger
+
+from rdflib import Graph
+
+RDF_TYPE = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type>"
+DEFAULT_PREFIXES = {
+    "rdf": "http://www.w3.org/1999/02/22-rdf-syntax-ns#",
+    "rdfs": "http://www.w3.org/2000/01/rdf-schema#",
+    "xsd": "http://www.w3.org/2001/XMLSchema#",
+}
+# subject, predicate and object of one N-Triples statement, the object is kept as written
+NTRIPLE = re.compile(r'^(<[^>]*>|_:\S+)\s+(<[^>]*>)\s+(.+?)\s*\.\s*$')
+# local names that can be written as prefix:name without escaping
+LOCAL_NAME = re.compile(r'^[A-Za-z_][A-Za-z0-9_-]*$')
+DATATYPE = re.compile(r'^(".*")\^\^(<[^>]*>)$', re.DOTALL)
+
+
+def parse_prefixes(text: str) -> dict[str, str]:
+    # "sosa=http://www.w3.org/ns/sosa/ ex=http://example.com/"
+    prefixes = dict(DEFAULT_PREFIXES)
+    for binding in text.split():
+        prefix, _, namespace = binding.partition("=")
+        prefixes[prefix] = namespace
+    return prefixes
+
+
+def read_triples(msg: str):
+    """Yield (subject, predicate, object) as N-Triples terms.
+    N-Triples is split line by line, anything else is parsed as Turtle one message at a time."""
+    triples = []
+    for line in msg.splitlines():
+        if not line.strip() or line.lstrip().startswith("#"):
+            continue
+        match = NTRIPLE.match(line)
+        if match is None:
+            graph = Graph()
+            graph.parse(data=msg, format="turtle")
+            yield from ((s.n3(), p.n3(), o.n3()) for s, p, o in graph)
+            return
+        triples.append(match.groups())
+    yield from triples
+
+
+class StreamingPrettifier:
+    """Turns a stream of triples into compact Turtle without building a graph.
+
+    Triples are buffered per subject in a window of at most window_size triples. When the window is
+    full the oldest subjects are written out, so a subject that shows up again later gets a second
+    block. With spill=True nothing is written before the end: full windows are sorted and spilled to
+    disk and the runs are merged at the end, so every subject gets exactly one block."""
+    logger: Logger = getLogger('rdfc.StreamingPrettifier')
+
+    def __init__(self, prefixes: dict[str, str], window_size: int, spill: bool = False):
+        self.prefixes = sorted(prefixes.items(), key=lambda item: len(item[1]), reverse=True)
+        self.header = "".join("@prefix {}: <{}> .\n".format(p, ns) for p, ns in prefixes.items()) + "\n"
+        self.window_size = max(1, window_size)
+        self.spill = spill
+        self.window: dict[str, list[tuple[str, str]]] = {}
+        self.buffered = 0
+        self.runs: list[str] = []
+
+    def add(self, triples) -> str:
+        """Buffer the triples and return the Turtle of the subjects that left the window."""
+        out = []
+        for s, p, o in triples:
+            group = self.window.get(s)
+            if group is None:
+                group = self.window[s] = []
+            group.append((p, o))
+            self.buffered += 1
+            if self.buffered >= self.window_size:
+                if self.spill:
+                    self.spill_window()
+                else:
+                    out.append(self.evict())
+        return "".join(out)
+
+    def evict(self) -> str:
+        # write the older half of the window, the newest subjects may still get more triples
+        out = []
+        while self.buffered > self.window_size // 2:
+            subject = next(iter(self.window))
+            group = self.window.pop(subject)
+            self.buffered -= len(group)
+            out.append(self.format_subject(subject, group))
+        return "".join(out)
+
+    def spill_window(self) -> None:
+        fd, path = tempfile.mkstemp(prefix="prettify-run-", suffix=".nt")
+        with os.fdopen(fd, "w", encoding="utf-8") as run:
+            for subject in sorted(self.window):
+                for p, o in self.window[subject]:
+                    # long Turtle literals may span lines, the escaped form means the same
+                    run.write("{}\t{}\t{}\n".format(subject, p, o.replace("\r", "\\r").replace("\n", "\\n")))
+        self.runs.append(path)
+        self.window = {}
+        self.buffered = 0
+        self.logger.debug("Spilled sorted run {} to {}".format(len(self.runs), path))
+
+    def flush(self, batch_bytes: int):
+        """Yield the remaining Turtle in chunks of about batch_bytes characters."""
+        if self.runs:
+            self.spill_window()
+            blocks = self.merge_runs()
+        else:
+            blocks = (self.format_subject(subject, group) for subject, group in self.window.items())
+        batch = []
+        size = 0
+        for block in blocks:
+            batch.append(block)
+            size += len(block)
+            if size >= batch_bytes:
+                yield "".join(batch)
+                batch = []
+                size = 0
+        if batch:
+            yield "".join(batch)
+        self.window = {}
+        self.buffered = 0
+
+    def merge_runs(self):
+        files = [open(path, "r", encoding="utf-8") for path in self.runs]
+        try:
+            rows = heapq.merge(*(map(self.split_row, f) for f in files), key=lambda row: row[0])
+            for subject, group in groupby(rows, key=lambda row: row[0]):
+                yield self.format_subject(subject, [(p, o) for _, p, o in group])
+        finally:
+            for f in files:
+                f.close()
+            for path in self.runs:
+                os.remove(path)
+            self.runs = []
+
+    @staticmethod
+    def split_row(row: str):
+        # the object is last, so tabs inside literals end up in it unchanged
+        return tuple(row.rstrip("\n").split("\t", 2))
+
+    def format_subject(self, subject: str, group: list[tuple[str, str]]) -> str:
+        objects: dict[str, list[str]] = {}
+        for p, o in group:
+            objects.setdefault(p, []).append(self.term(o))
+        lines = []
+        for p, values in objects.items():
+            predicate = "a" if p == RDF_TYPE else self.term(p)
+            lines.append("{} {}".format(predicate, " ,\n        ".join(values)))
+        return "{} {} .\n\n".format(self.term(subject), " ;\n    ".join(lines))
+
+    def term(self, term: str) -> str:
+        if term.startswith("<"):
+            return self.compact(term)
+        if term.startswith('"'):
+            match = DATATYPE.match(term)
+            if match:
+                return match.group(1) + "^^" + self.compact(match.group(2))
+        return term
+
+    def compact(self, iri: str) -> str:
+        value = iri[1:-1]
+        for prefix, namespace in self.prefixes:
+            if value.startswith(namespace) and LOCAL_NAME.match(value[len(namespace):]):
+                return prefix + ":" + value[len(namespace):]
+        return iri
@@ -0,0 +1,77 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+import PrettifyProcessorPy.processor as processor
+
+MESSAGES = [
+    '<http://example.com/a> <http://www.w3.org/ns/sosa/madeBySensor> "1" .\n',
+    '<http://example.com/b> <http://www.w3.org/ns/sosa/madeBySensor> "2" .\n'
+    '<http://example.com/b> a <http://www.w3.org/ns/sosa/Observation> .\n',
+]
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+def parse(*documents):
+    graph = Graph()
+    for document in documents:
+        graph.parse(data=document, format="turtle")
+    return graph
+
+
+@pytest.mark.asyncio
+async def test_delta_mode_emits_only_the_current_message():
+    writer = AsyncMock()
+    proc = processor.PrettifyProcessorPy(processor.TemplateArgs(
+        reader=DummyReader(MESSAGES), writer=writer, mode="delta"))
+
+    await proc.transform()
+
+    emitted = [call.args[0] for call in writer.string.await_args_list]
+    assert len(emitted) == 2
+    for document, msg in zip(emitted, MESSAGES):
+        assert isomorphic(parse(document), parse(msg))
+    writer.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_final_mode_emits_one_consolidated_document():
+    writer = AsyncMock()
+    proc = processor.PrettifyProcessorPy(processor.TemplateArgs(
+        reader=DummyReader(MESSAGES), writer=writer, mode="final"))
+
+    await proc.transform()
+
+    emitted = [call.args[0] for call in writer.string.await_args_list]
+    assert len(emitted) == 1
+    assert emitted[0].count("@prefix sosa:") == 1
+    assert isomorphic(parse(emitted[0]), parse(*MESSAGES))
+    writer.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_final_mode_writes_large_documents_in_batches(monkeypatch):
+    monkeypatch.setattr(processor, "STREAM_BATCH_BYTES", 1)
+    writer = AsyncMock()
+    proc = processor.PrettifyProcessorPy(processor.TemplateArgs(
+        reader=DummyReader(MESSAGES), writer=writer, mode="final"))
+
+    await proc.transform()
+
+    emitted = [call.args[0] for call in writer.string.await_args_list]
+    assert len(emitted) == 2
+    # every batch carries the prefixes and parses on its own
+    assert all(document.count("@prefix sosa:") == 1 for document in emitted)
+    assert isomorphic(parse(*emitted), parse(*MESSAGES))
@@ -0,0 +1,83 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+import PrettifyProcessorPy.processor as processor
+from PrettifyProcessorPy.streaming import StreamingPrettifier, parse_prefixes, read_triples
+
+SOSA = "http://www.w3.org/ns/sosa/"
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+def observation(sensor, index):
+    subject = "<http://example.com/reading_{}_{}>".format(sensor, index)
+    return (
+        '{} <http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <{}Observation> .\n'
+        '{} <{}madeBySensor> "{}" .\n'
+        '{} <{}hasSimpleResult> "{}.5"^^<http://www.w3.org/2001/XMLSchema#double> .\n'
+    ).format(subject, SOSA, subject, SOSA, sensor, subject, SOSA, index)
+
+
+def parse(*documents):
+    graph = Graph()
+    for document in documents:
+        graph.parse(data=document, format="turtle")
+    return graph
+
+
+async def run(messages, **kwargs):
+    writer = AsyncMock()
+    proc = processor.PrettifyProcessorPy(processor.TemplateArgs(
+        reader=DummyReader(messages), writer=writer, mode="stream", prefixes="sosa=" + SOSA, **kwargs))
+    await proc.transform()
+    writer.close.assert_awaited_once()
+    return [call.args[0] for call in writer.string.await_args_list]
+
+
+@pytest.mark.asyncio
+async def test_contiguous_subjects_stream_through_a_small_window():
+    messages = ["".join(observation(1, i) for i in range(j * 10, j * 10 + 10)) for j in range(5)]
+
+    emitted = await run(messages, windowSize=12)
+
+    assert len(emitted) > 1
+    # every message parses on its own and every subject gets a single block
+    assert isomorphic(parse(*emitted), parse(*messages))
+    assert sum(out.count("sosa:madeBySensor") for out in emitted) == 50
+    assert sum(out.count(" a sosa:Observation") for out in emitted) == 50
+    assert '"1.5"^^xsd:double' in "".join(emitted)
+
+
+@pytest.mark.asyncio
+async def test_spill_groups_non_contiguous_subjects():
+    # the three triples of every observation arrive in different messages
+    lines = "".join(observation(2, i) for i in range(40)).splitlines(keepends=True)
+    messages = ["".join(lines[start::3]) for start in range(3)]
+
+    emitted = await run(messages, windowSize=8, spill=True)
+
+    assert isomorphic(parse(*emitted), parse(*messages))
+    assert sum(out.count("<http://example.com/reading_2_") for out in emitted) == 40
+
+
+def test_turtle_input_and_multiline_literals_survive_a_spill():
+    turtle = '@prefix ex: <http://example.com/> .\nex:a ex:note """two\nlines""" ; ex:b ex:c .\n'
+    prettifier = StreamingPrettifier(parse_prefixes("ex=http://example.com/"), window_size=1, spill=True)
+
+    assert prettifier.add(read_triples(turtle)) == ""
+    output = "".join(prettifier.flush(1024))
+
+    assert isomorphic(parse(prettifier.header + output), parse(turtle))
+    assert output.count("ex:a ") == 1
@@ -0,0 +1,71 @@
+"""Compares the JSON array and the columnar tss:points of the snippets built from sample_data.csv:
+literal size, encoding time and decoding time.
+
+The literals are decoded by TSS2RDFProcessorPy, which reads them downstream. Run from the pipeline directory, e.g.
+    PYTHONPATH=../Processorrepo/RDF2TSSProcssorPy/src:../Processorrepo/TSS2RDFProcessorPy/src python ../Processorrepo/RDF2TSSProcssorPy/benchmarks/encoding_benchmark.py
+"""
+import argparse
+import csv
+import json
+import time
+from urllib.parse import quote
+
+from rdflib import Literal, URIRef
+from rdflib.namespace import XSD
+
+from RDF2TSSProcssorPy.encoding import encode_points
+from RDF2TSSProcssorPy.processor import time_key
+from TSS2RDFProcessorPy.encoding import decode_points
+
+
+def build_series(csv_path):
+    series = {}
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if not row["Value"]:
+                continue
+            series.setdefault(row["ts_id"], []).append({
+                'time': Literal(row["Timestamp"], datatype=XSD.dateTime),
+                'value': Literal(row["Value"], datatype=XSD.double),
+                'id': URIRef("http://example.com/reading_{}_{}".format(
+                    quote(row["ts_id"], safe=""), quote(row["Timestamp"], safe=""))),
+                'observedProperty': Literal(row["stationparameter_longname"]),
+            })
+    for points in series.values():
+        points.sort(key=lambda p: time_key(p['time']))
+    return series
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = [function(arg, *args) for arg in ARGS_LIST]
+    return result, time.perf_counter() - start
+
+
+def main():
+    global ARGS_LIST
+    series = build_series(ARGS.csv)
+    ARGS_LIST = list(series.values())
+    arrays, array_time = timed(lambda points: json.dumps(
+        [{'time': str(p['time']), 'value': str(p['value']), 'id': str(p['id'])} for p in points]))
+    columnar, columnar_time = timed(encode_points)
+    assert None not in columnar, "a series could not be encoded"
+    ARGS_LIST = arrays
+    decoded_arrays, array_decode = timed(decode_points)
+    ARGS_LIST = columnar
+    decoded_columnar, columnar_decode = timed(decode_points)
+    assert decoded_arrays == decoded_columnar
+
+    points = sum(len(p) for p in series.values())
+    print("{} series, {} points".format(len(series), points))
+    print("{:>9} {:>12} {:>10} {:>10}".format("form", "bytes", "encode s", "decode s"))
+    print("{:>9} {:>12} {:>10.3f} {:>10.3f}".format("array", sum(map(len, arrays)), array_time, array_decode))
+    print("{:>9} {:>12} {:>10.3f} {:>10.3f}".format("columnar", sum(map(len, columnar)), columnar_time, columnar_decode))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="./WFresources/sample_data.csv")
+    ARGS = parser.parse_args()
+    ARGS_LIST = []
+    main()
@@ -0,0 +1,75 @@
+"""Times the per-sensor SPARQL queries the processor used to run against the single-pass grouping,
+on synthetic observations for a growing number of sensors and observations per sensor.
+
+Run from the RDF2TSSProcssorPy directory, e.g.
+    PYTHONPATH=src python benchmarks/grouping_benchmark.py --sensors 1 10 100 --observations 100 1000
+"""
+import argparse
+import time
+from datetime import datetime, timedelta, timezone
+
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF, XSD
+
+from RDF2TSSProcssorPy.processor import RDF2TSSProcssorPy
+
+SOSA = Namespace("http://www.w3.org/ns/sosa/")
+START = datetime(2025, 8, 12, tzinfo=timezone.utc)
+
+
+def build_graph(sensors, observations):
+    graph = Graph()
+    for sensor in range(sensors):
+        for index in range(observations):
+            subject = URIRef("http://example.com/reading_{}_{}".format(sensor, index))
+            graph.add((subject, RDF.type, SOSA.Observation))
+            graph.add((subject, SOSA.madeBySensor, Literal(str(sensor))))
+            graph.add((subject, SOSA.hasSimpleResult, Literal(str(index * 0.5), datatype=XSD.double)))
+            graph.add((subject, SOSA.observedProperty, Literal("Barometric pressure")))
+            graph.add((subject, SOSA.resultTime,
+                       Literal((START + timedelta(minutes=15 * index)).isoformat(), datatype=XSD.dateTime)))
+    return graph
+
+
+def sparql_series(graph):
+    series = {}
+    sensors = [row[0] for row in graph.query(
+        "PREFIX sosa: <http://www.w3.org/ns/sosa/> SELECT DISTINCT ?sensor WHERE { ?s sosa:madeBySensor ?sensor . }")]
+    for sensor in sensors:
+        series[sensor] = list(graph.query("""
+            PREFIX sosa: <http://www.w3.org/ns/sosa/>
+            SELECT ?READING ?TIME ?OBSERVATION ?observedProperty
+            WHERE {{
+                ?OBSERVATION a sosa:Observation ;
+                            sosa:resultTime ?TIME ;
+                            sosa:hasSimpleResult ?READING ;
+                            sosa:observedProperty ?observedProperty ;
+                            sosa:madeBySensor {} .
+            }}
+            ORDER BY ?TIME""".format(sensor.n3())))
+    return series
+
+
+def main():
+    grouper = RDF2TSSProcssorPy.__new__(RDF2TSSProcssorPy)
+    print("{:>8} {:>13} {:>10} {:>10} {:>9}".format("sensors", "obs/sensor", "sparql s", "1-pass s", "speedup"))
+    for sensors in ARGS.sensors:
+        for observations in ARGS.observations:
+            graph = build_graph(sensors, observations)
+            start = time.perf_counter()
+            expected = sparql_series(graph)
+            sparql_time = time.perf_counter() - start
+            start = time.perf_counter()
+            series = grouper.CreateSeries(graph)
+            grouping_time = time.perf_counter() - start
+            assert {s: len(p) for s, p in series.items()} == {s: len(p) for s, p in expected.items()}
+            print("{:>8} {:>13} {:>10.3f} {:>10.3f} {:>8.1f}x".format(
+                sensors, observations, sparql_time, grouping_time, sparql_time / grouping_time))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sensors", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--observations", type=int, nargs="+", default=[100, 1000])
+    ARGS = parser.parse_args()
+    main()
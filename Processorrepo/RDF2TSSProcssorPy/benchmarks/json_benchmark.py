@@ -0,0 +1,67 @@
+"""Micro-benchmark of the tss:points encoders for one sensor with many points: the str() + json.dumps
+array the processor used to build, encode_json, orjson over the same dicts and the columnar form.
+
+Run from the RDF2TSSProcssorPy directory, e.g.
+    PYTHONPATH=src python benchmarks/json_benchmark.py --points 1000000
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from urllib.parse import quote
+
+from rdflib import Literal, URIRef
+from rdflib.namespace import XSD
+
+from RDF2TSSProcssorPy.encoding import encode_json, encode_points, orjson
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+def build_points(count):
+    points = []
+    for index in range(count):
+        time_ = (START + timedelta(minutes=15 * index)).isoformat()
+        points.append({
+            'time': Literal(time_, datatype=XSD.dateTime),
+            'value': Literal(str(index % 5000 / 100), datatype=XSD.double),
+            'id': URIRef("http://example.com/reading_24002042_" + quote(time_, safe="")),
+            'observedProperty': Literal("River Stage"),
+        })
+    return points
+
+
+def dumps_array(points):
+    return json.dumps([{'time': str(p['time']), 'value': str(p['value']), 'id': str(p['id'])} for p in points])
+
+
+def orjson_array(points):
+    return orjson.dumps([{'time': p['time'], 'value': p['value'], 'id': p['id']} for p in points]).decode('utf-8')
+
+
+def main():
+    start = time.perf_counter()
+    points = build_points(ARGS.points)
+    print("{} points built in {:.1f} s".format(len(points), time.perf_counter() - start))
+    encoders = [("json.dumps", dumps_array), ("encode_json", encode_json)]
+    if orjson is not None:
+        encoders.append(("orjson", orjson_array))
+    encoders.append(("columnar", encode_points))
+    expected = None
+    for name, encoder in encoders:
+        start = time.perf_counter()
+        text = encoder(points)
+        elapsed = time.perf_counter() - start
+        if name == "json.dumps":
+            expected = text
+        elif name == "encode_json":
+            assert text == expected
+        print("{:>12} {:8.3f} s {:12d} bytes {:8.2f} M points/s".format(
+            name, elapsed, len(text), len(points) / elapsed / 1e6))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=1000000)
+    ARGS = parser.parse_args()
+    main()
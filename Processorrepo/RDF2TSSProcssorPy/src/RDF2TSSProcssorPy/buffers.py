@@ -0,0 +1,117 @@
+import os
+import pickle
+from bisect import bisect_left, bisect_right
+from heapq import merge
+from logging import getLogger, Logger
+
+from rdflib import Graph
+
+# below this many late points they are inserted one by one, above it the buffer is merged in one pass
+INSERT_LIMIT = 64
+STATE_VERSION = 2
+
+
+class SensorBuffers:
+    """Points per sensor, sorted by time, kept from one message to the next.
+
+    New points that are later than everything buffered are appended, late points are inserted at their
+    position. A point that was already received (same observation, time, value and property) is ignored,
+    as the accumulated graph would have merged its triples. Received points are remembered for seen_span
+    seconds before the sensor's latest point, an older point that is received again counts as new."""
+    logger: Logger = getLogger('rdfc.SensorBuffers')
+
+    def __init__(self, time_key, seen_span: int = 0):
+        self.time_key = time_key
+        self.seen_span = seen_span
+        self.points: dict = {}
+        self.keys: dict = {}
+        # sensor -> identity of every remembered point -> its time key
+        self.seen: dict = {}
+        # size of seen per sensor after it was last pruned
+        self.pruned: dict = {}
+        # the new points per sensor of the last add() that changed a buffer, and how many such adds there were
+        self.new: dict = {}
+        self.batches = 0
+
+    def add(self, series) -> dict:
+        """Add the grouped points of a message, returns sensor -> index of the first changed point."""
+        changed = {}
+        self.new = {}
+        for sensor, points in series.items():
+            seen = self.seen.setdefault(sensor, {})
+            new = []
+            for point in points:
+                identity = (point['id'], point['time'], point['value'], point['observedProperty'])
+                if identity not in seen:
+                    seen[identity] = self.time_key(point['time'])
+                    new.append(point)
+            if new:
+                changed[sensor] = self.merge(sensor, new)
+                self.new[sensor] = new
+                self.prune(sensor)
+        if changed:
+            self.batches += 1
+        return changed
+
+    def prune(self, sensor) -> None:
+        # only once seen has doubled since the last pruning, so the cost per point stays constant
+        seen = self.seen[sensor]
+        if not self.seen_span or len(seen) < 2 * max(self.pruned.get(sensor, 0), 1024):
+            return
+        keys = self.keys[sensor]
+        # values that are no dateTime sort after every time and are kept
+        dated = bisect_left(keys, (1,))
+        if dated:
+            oldest = (0, keys[dated - 1][1] - self.seen_span)
+            for identity in [identity for identity, key in seen.items() if key < oldest]:
+                del seen[identity]
+        self.pruned[sensor] = len(seen)
+
+    def merge(self, sensor, new) -> int:
+        # new is sorted by time, as CreateSeries returns it
+        buffer = self.points.setdefault(sensor, [])
+        keys = self.keys.setdefault(sensor, [])
+        new_keys = [self.time_key(point['time']) for point in new]
+        first = bisect_right(keys, new_keys[0])
+        if first == len(keys):
+            buffer.extend(new)
+            keys.extend(new_keys)
+        elif len(new) <= INSERT_LIMIT:
+            for key, point in zip(new_keys, new):
+                index = bisect_right(keys, key)
+                keys.insert(index, key)
+                buffer.insert(index, point)
+        else:
+            merged = list(merge(zip(keys, buffer), zip(new_keys, new), key=lambda item: item[0]))
+            keys[:] = [key for key, _ in merged]
+            buffer[:] = [point for _, point in merged]
+        self.logger.debug("{} points for sensor {}, {} new from position {}".format(
+            len(buffer), sensor, len(new), first))
+        return first
+
+    def save(self, path, pending: Graph) -> None:
+        # written next to the old state and renamed, a crash while saving keeps the previous state
+        state = {'version': STATE_VERSION, 'points': self.points, 'keys': self.keys, 'seen': self.seen,
+                 'batches': self.batches, 'pending': pending.serialize(format="nt")}
+        with open(path + ".tmp", "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + ".tmp", path)
+
+    def load(self, path) -> Graph:
+        """Restore the buffers saved at `path`, returns the triples of incomplete observations."""
+        pending = Graph()
+        if not os.path.exists(path):
+            return pending
+        with open(path, "rb") as f:
+            state = pickle.load(f)
+        if state.get('version') != STATE_VERSION:
+            self.logger.warning("Ignoring state {} of version {}".format(path, state.get('version')))
+            return pending
+        self.points = state['points']
+        self.keys = state['keys']
+        self.seen = state['seen']
+        self.batches = state['batches']
+        pending.parse(data=state['pending'], format="nt")
+        self.logger.info("Restored {} points for {} sensors from {}".format(
+            sum(len(points) for points in self.points.values()), len(self.points), path))
+        return pending
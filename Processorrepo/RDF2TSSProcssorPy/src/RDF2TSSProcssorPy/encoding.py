@@ -0,0 +1,109 @@
+import json
+import re
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# control characters, which JSON strings cannot hold unescaped
+CONTROL = bytes(range(32))
+
+# lexical forms that are valid JSON numbers are written without quotes and read back unchanged
+JSON_NUMBER = re.compile(r'-?(?:0|[1-9][0-9]*)(?:\.[0-9]+)?(?:[eE][+-]?[0-9]+)?\Z')
+
+
+def encode_json(points) -> str:
+    """The JSON array of {time, value, id} points, the same text as json.dumps gives for it.
+
+    The terms are strings holding their lexical form, so they are joined into the array as they are, without
+    converting every term and building a dict per point. When a lexical form needs escaping, the points go
+    through json.dumps, not orjson: its separators and ensure_ascii escapes are the ones of the joined text,
+    so the output does not depend on whether orjson is installed."""
+    if not points:
+        return '[]'
+    parts = ['[']
+    for point in points:
+        parts += ('{"time": "', point['time'], '", "value": "', point['value'], '", "id": "', point['id'], '"}, ')
+    parts[-1] = '"}]'
+    text = ''.join(parts)
+    # every point adds 12 quotes, more means a quote inside a lexical form
+    if text.isascii() and '\\' not in text and text.count('"') == 12 * len(points):
+        encoded = text.encode('ascii')
+        if len(encoded.translate(None, CONTROL)) == len(encoded):
+            return text
+    return json.dumps([{'time': str(p['time']), 'value': str(p['value']), 'id': str(p['id'])} for p in points])
+
+
+def dumps(value) -> str:
+    # compact JSON for the columnar form, which is read back by value: json.dumps escapes the non-ASCII characters
+    # orjson writes as they are and may write floats differently, what the text decodes to is the same
+    if orjson is not None:
+        return orjson.dumps(value).decode('utf-8')
+    return json.dumps(value, separators=(',', ':'))
+
+
+def encode_points(points) -> str | None:
+    """Columnar form of the tss:points of a snippet, or None when it would not decode to the same points.
+
+        {"start": "<first time>", "interval": <seconds> | "deltas": [<seconds>, ...],
+         "values": [<value>, ...], "id": "<template with {time}>" | "ids": [<id>, ...]}
+
+    Times are rebuilt from the start time and the offsets, {time} in the id template is the
+    percent-encoded time (as an rr:template fills it in). Numeric values keep their lexical form."""
+    times = []
+    for point in points:
+        value = point['time'].toPython()
+        if not isinstance(value, datetime):
+            return None
+        times.append(value)
+    lexical_times = [str(point['time']) for point in points]
+    deltas = [seconds(later - earlier) for earlier, later in zip(times, times[1:])]
+    rebuilt = [times[0]]
+    for delta in deltas:
+        rebuilt.append(rebuilt[-1] + timedelta(seconds=delta))
+    # every time has to come back with the same lexical form, offsets included
+    if [time.isoformat() for time in rebuilt] != lexical_times:
+        return None
+
+    encoded = ['{"start":', json.dumps(lexical_times[0])]
+    if deltas and all(delta == deltas[0] for delta in deltas):
+        encoded += [',"interval":', json.dumps(deltas[0])]
+    else:
+        encoded += [',"deltas":', dumps(deltas)]
+    encoded += [',"values":[', ','.join(encode_value(str(point['value'])) for point in points), ']']
+    ids = [str(point['id']) for point in points]
+    template = id_template(ids, lexical_times)
+    if template is not None:
+        encoded += [',"id":', json.dumps(template)]
+    else:
+        encoded += [',"ids":', dumps(ids)]
+    encoded.append('}')
+    return ''.join(encoded)
+
+
+def seconds(delta: timedelta):
+    total = delta.total_seconds()
+    return int(total) if total == int(total) else total
+
+
+def encode_value(lexical: str) -> str:
+    return lexical if JSON_NUMBER.match(lexical) else json.dumps(lexical)
+
+
+def quote_time(time: str) -> str:
+    # what quote(time, safe='') changes in the isoformat() of a datetime, without the per-character work
+    return time.replace(':', '%3A').replace('+', '%2B')
+
+
+def id_template(ids, times) -> str | None:
+    encoded = quote(times[0], safe='')
+    if encoded not in ids[0]:
+        return None
+    template = ids[0].replace(encoded, '{time}')
+    if all(template.replace('{time}', quote_time(time)) == id_ for id_, time in zip(ids, times)):
+        return template
+    return None
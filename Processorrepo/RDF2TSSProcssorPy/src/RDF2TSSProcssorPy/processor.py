@@ -8,14 +8,67 @@ from rdflib.namespace import XSD,RDF
 import pandas as pd
 import argparse
 from collections import defaultdict
-from datetime import datetime
+from datetime import datetime, timezone
+from itertools import product
 import json
+from .buffers import SensorBuffers
+from .encoding import encode_json, encode_points
 
 # --- Type Definitions ---
 @dataclass
 class TemplateArgs(ProcessorArgs):
     reader: Reader
     writer: Writer
+    incremental: bool = False
+    stateFile: str = ""
+    maxPoints: int = 0
+    maxSpan: int = 0
+    pointsEncoding: str = "json"
+    maxPendingMessages: int = 100
+    stateInterval: int = 100
+    seenSpan: int = 7 * 86400
+
+
+SOSA = Namespace('http://www.w3.org/ns/sosa/')
+prefix_tss = Namespace('https://w3id.org/tss#')
+prefix_ex  = Namespace('http://example.org/')
+prefix_sosa  = SOSA
+# the triples an observation needs before it can become a point
+POINT_PREDICATES = (SOSA.madeBySensor, SOSA.resultTime, SOSA.hasSimpleResult, SOSA.observedProperty)
+
+
+def time_key(term):
+    # the order of SPARQL ORDER BY for dateTime literals, other values sort after them by lexical form
+    value = term.toPython() if isinstance(term, Literal) else None
+    if isinstance(value, datetime):
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return (0, value.timestamp(), str(term))
+    return (1, 0, str(term))
+
+
+def split_windows(keys, max_points, max_span):
+    """(suffix, start, end) of the windows over time-sorted keys: aligned spans of max_span seconds
+    (UTC, so 86400 gives one window per day), each cut into chunks of at most max_points points."""
+    groups = [(None, 0, len(keys))]
+    if max_span:
+        groups = []
+        for index, key in enumerate(keys):
+            # values that are no dateTime come last and share one window
+            suffix = "undated" if key[0] else datetime.fromtimestamp(
+                key[1] // max_span * max_span, timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+            if groups and groups[-1][0] == suffix:
+                groups[-1][2] = index + 1
+            else:
+                groups.append([suffix, index, index + 1])
+    if not max_points:
+        return [tuple(group) for group in groups]
+    windows = []
+    for suffix, start, end in groups:
+        for chunk, chunk_start in enumerate(range(start, end, max_points)):
+            windows.append((str(chunk) if suffix is None else "{}-{}".format(suffix, chunk),
+                            chunk_start, min(chunk_start + max_points, end)))
+    return windows
 
 
 # --- Processor Implementation ---
@@ -26,131 +79,214 @@ class RDF2TSSProcssorPy(Processor[TemplateArgs]):
         super().__init__(args)
         self.finalGraph: Graph | None = None
         self.sensorSet: set = set()
+        self.buffers = SensorBuffers(time_key, self.args.seenSpan)
+        # triples of observations that are still missing a value, time, property or sensor,
+        # and the number of the message each of them was first seen in
+        self.pending = Graph()
+        self.pendingSince: dict = {}
+        self.messages = 0
+        self.windowed = bool(self.args.maxPoints or self.args.maxSpan)
         self.logger.debug(msg="Created TemplateProcessor with args: {}".format(args))
 
     async def init(self) -> None:
         self.logger.debug("Initializing TemplateProcessor with args: {}", self.args)
+        if self.args.incremental and self.args.stateFile:
+            self.pending = self.buffers.load(self.args.stateFile)
+            self.sensorSet = set(self.buffers.points)
 
     async def transform(self) -> None:
 
+        if self.args.incremental:
+            await self.transform_incremental()
+            return
+
         datagraph = Graph()
         
 
         async for msg in self.args.reader.strings():
             datagraph.parse(data=msg, format="turtle")
-            self.sensorSet = self.CreateSensorSet(datagraph)
-            self.finalGraph = self.CreateTSS(self.sensorSet,datagraph)
+            series = self.CreateSeries(datagraph)
+            self.sensorSet = set(series)
+            await self.WriteTSS(series)
 
-            await self.args.writer.string(self.finalGraph.serialize(format="turtle"))
+        await self.args.writer.close()
 
+    async def transform_incremental(self) -> None:
+        # only the observations of the message are grouped. Without windows only the new points are written,
+        # as snippets of their own, with windows the changed windows of their sensors are written again
+        async for msg in self.args.reader.strings():
+            delta = Graph()
+            delta.parse(data=msg, format="turtle")
+            changed = self.buffers.add(self.CreateDeltaSeries(delta))
+            self.sensorSet = set(self.buffers.points)
+            if changed and self.windowed:
+                await self.WriteTSS({sensor: self.buffers.points[sensor] for sensor in changed}, changed)
+            elif changed:
+                await self.WriteDeltas(self.buffers.new)
+            # saved along the way as well, a crash only loses the messages since the last save
+            if self.args.stateFile and self.args.stateInterval and self.messages % self.args.stateInterval == 0:
+                self.buffers.save(self.args.stateFile, self.pending)
+
+        if self.args.stateFile:
+            self.buffers.save(self.args.stateFile, self.pending)
         await self.args.writer.close()
 
     async def produce(self) -> None:
         pass
 
     ##################################################################################
-    def CreateSensorSet(self,graph):
-        sensor_set = set()
-        get_sensor_query = ''' 
-PREFIX sosa: <http://www.w3.org/ns/sosa/>
-
-SELECT DISTINCT ?sensor
-WHERE {
-  ?s sosa:madeBySensor ?sensor .
-}
-'''
-        print('Started identifying unique sensors')
-        # store actual RDF terms (URIRef or Literal), not stringified values
-        for sensor in graph.query(get_sensor_query):
-            sensor_term = sensor[0]   # this is an rdflib term (URIRef or Literal)
-            sensor_set.add(sensor_term)
-
-        print('Sensors identified successfully')
-        return sensor_set
-
-    def CreateTSS(self,sensor_set, graph):
-        prefix_tss = Namespace('https://w3id.org/tss#')
-        prefix_ex  = Namespace('http://example.org/')
-        prefix_sosa  = Namespace('http://www.w3.org/ns/sosa/')
-        final_graph = Graph()
-        final_graph.bind('tss', prefix_tss)
-        final_graph.bind('ex', prefix_ex)
-        final_graph.bind('sosa', prefix_sosa)
-        print('Started creating final graph')
+    def CreateSeries(self,graph):
+        # one pass over the observations instead of one SPARQL query per sensor
+        series = defaultdict(list)
+        print('Started grouping observations per sensor')
+        # one scan per predicate into a column keyed by observation, joined below without further lookups
+        columns = {}
+        for predicate in (SOSA.madeBySensor, SOSA.resultTime, SOSA.hasSimpleResult, SOSA.observedProperty):
+            column = defaultdict(list)
+            for observation, value in graph.subject_objects(predicate):
+                column[observation].append(value)
+            columns[predicate] = column
+        sensors = columns[SOSA.madeBySensor]
+        times = columns[SOSA.resultTime]
+        readings = columns[SOSA.hasSimpleResult]
+        properties = columns[SOSA.observedProperty]
+        for observation in graph.subjects(RDF.type, SOSA.Observation):
+            if observation not in sensors:
+                continue
+            # every combination of values, as the join of the SPARQL pattern would give
+            for sensor, time, reading, observed_property in product(
+                    sensors[observation], times.get(observation, ()), readings.get(observation, ()),
+                    properties.get(observation, ())):
+                series[sensor].append({
+                    'time': time,
+                    'value': reading,
+                    'id': observation,
+                    'observedProperty': observed_property
+                })
+        # every series is sorted once, by time
+        for points in series.values():
+            points.sort(key=lambda p: time_key(p['time']))
+        print('Observations grouped for {} sensors'.format(len(series)))
+        return series
 
-        for sensor in sensor_set:
-            # use sensor.n3() so SPARQL receives a proper token: <uri> or "literal"^^xsd:...
-            sensor_token = sensor.n3() if hasattr(sensor, 'n3') else f"<{str(sensor)}>"
+    def CreateDeltaSeries(self,delta):
+        # an observation may be spread over messages, its triples wait in pending until it is complete
+        # an observation still incomplete maxPendingMessages messages later is dropped, so pending stays bounded.
+        # Restored pending observations count from the first message after a restart
+        self.messages += 1
+        work = delta + self.pending if len(self.pending) else delta
+        series = self.CreateSeries(work)
+        complete = {point['id'] for points in series.values() for point in points}
+        waiting = set(work.subjects(RDF.type, SOSA.Observation))
+        for predicate in POINT_PREDICATES:
+            waiting.update(work.subjects(predicate))
+        self.pending = Graph()
+        since = {}
+        evicted = []
+        for observation in waiting - complete:
+            first = self.pendingSince.get(observation, self.messages)
+            if self.args.maxPendingMessages and self.messages - first >= self.args.maxPendingMessages:
+                evicted.append(str(observation))
+                continue
+            since[observation] = first
+            for triple in work.triples((observation, None, None)):
+                self.pending.add(triple)
+        self.pendingSince = since
+        if evicted:
+            evicted.sort()
+            shown = ", ".join(evicted[:10]) + (", ..." if len(evicted) > 10 else "")
+            self.logger.warning("Dropped {} observations still incomplete after {} messages: {}".format(
+                len(evicted), self.args.maxPendingMessages, shown))
+        return series
 
-            tss_points = []
-            tss_query = f'''
-            PREFIX sosa: <http://www.w3.org/ns/sosa/>
-
-            SELECT ?READING ?TIME ?OBSERVATION ?observedProperty
-            WHERE {{
-                ?OBSERVATION a sosa:Observation ;
-                            sosa:resultTime ?TIME ;
-                            sosa:hasSimpleResult ?READING ;
-                            sosa:observedProperty ?observedProperty ;
-                            sosa:madeBySensor {sensor_token} .
-            }}
-            ORDER BY ?TIME
-            '''
-            results = graph.query(tss_query)
-            for row in results:
-                # each row values are rdflib terms; keep them
-                data = {
-                    'time': row.TIME,
-                    'value': row.READING,
-                    'id': row.OBSERVATION,
-                    'observedProperty': row.observedProperty
-                }
-                tss_points.append(data)
+    def CreateWindows(self,series,first=None):
+        # (sensor, window suffix, points) for every snippet, from the window holding the sensor's first changed point
+        for sensor, tss_points in series.items():
+            sensor_token = sensor.n3() if hasattr(sensor, 'n3') else f"<{str(sensor)}>"
 
             if not tss_points:
                 print(f'Warning: no observations found for sensor {sensor_token}; skipping.')
                 continue  # avoid indexing into empty list
 
-            json_object = json.dumps([
-                {
-                    'time': str(p['time']),    # convert to string for JSON
-                    'value': str(p['value']),
-                    'id': str(p['id'])
-                }
-                for p in tss_points
-            ])
-
-            # choose an output subject: use the real URI if sensor is URIRef,
-            # otherwise mint an example URI for that sensor value
-            if isinstance(sensor, URIRef):
-                subject = sensor
-            else:
-                # for a Literal sensor (e.g. "24002042"), create a stable URI in ex: namespace
-                safe_id = str(sensor).replace(' ', '_')
-                subject = prefix_ex[f"sensor/{safe_id}"]
-
-            temporary_node = BNode()
-
-            final_graph.add((subject, RDF.type, prefix_tss.Snippet))
-            # store the JSON timeseries as a literal (you had RDF.JSON before; keep as plain literal or use a string)
-            final_graph.add((subject, prefix_tss.points, Literal(json_object)))
-            # Add from / to times using the original RDF time Literals
-            final_graph.add((subject, prefix_tss["from"], tss_points[0]['time']))
-            final_graph.add((subject, prefix_tss.to, tss_points[-1]['time']))
-            final_graph.add((subject, prefix_tss.pointType, prefix_sosa.Observation))
-
-            # tss context omitted as in your original comment
-
-            final_graph.add((subject, prefix_tss.about, temporary_node))
-            final_graph.add((temporary_node, RDF.type, prefix_tss.PointTemplate))
-            # madeBySensor should point to original sensor term if it was a URI, otherwise to an identifier URI
-            if isinstance(sensor, URIRef):
-                final_graph.add((temporary_node, prefix_sosa.madeBySensor, sensor))
-            else:
-                # point to an identifier URI we just created
-                final_graph.add((temporary_node, prefix_sosa.madeBySensor, subject))
-            # use observedProperty from the first point (assumes same observedProperty for sensor)
-            final_graph.add((temporary_node, prefix_sosa.observedProperty, tss_points[0]['observedProperty']))
+            if not self.windowed:
+                yield sensor, None, tss_points
+                continue
+            keys = self.buffers.keys.get(sensor) if tss_points is self.buffers.points.get(sensor) else None
+            if keys is None:
+                keys = [time_key(p['time']) for p in tss_points]
+            changed = first.get(sensor, 0) if first else 0
+            for suffix, start, end in split_windows(keys, self.args.maxPoints, self.args.maxSpan):
+                if end > changed:
+                    yield sensor, "window/" + suffix, tss_points[start:end]
 
+    def CreateTSS(self,series,first=None):
+        final_graph = self.NewGraph()
+        print('Started creating final graph')
+        for sensor, suffix, tss_points in self.CreateWindows(series, first):
+            self.AddSnippet(final_graph, sensor, suffix, tss_points)
         print('Graph created successfully')
-        return final_graph   
\ No newline at end of file
+        return final_graph
+
+    async def WriteTSS(self,series,first=None):
+        if not self.windowed:
+            self.finalGraph = self.CreateTSS(series, first)
+            await self.args.writer.string(self.finalGraph.serialize(format="turtle"))
+            return
+        # one message per window keeps the messages as small as the windows
+        for sensor, suffix, tss_points in self.CreateWindows(series, first):
+            self.finalGraph = self.NewGraph()
+            self.AddSnippet(self.finalGraph, sensor, suffix, tss_points)
+            await self.args.writer.string(self.finalGraph.serialize(format="turtle"))
+
+    async def WriteDeltas(self,new):
+        # the new points of every sensor as a snippet of their own, numbered by the batch they came in
+        self.finalGraph = self.NewGraph()
+        for sensor, tss_points in new.items():
+            self.AddSnippet(self.finalGraph, sensor, "batch/{}".format(self.buffers.batches), tss_points)
+        await self.args.writer.string(self.finalGraph.serialize(format="turtle"))
+
+    def NewGraph(self):
+        final_graph = Graph()
+        final_graph.bind('tss', prefix_tss)
+        final_graph.bind('ex', prefix_ex)
+        final_graph.bind('sosa', prefix_sosa)
+        return final_graph
+
+    def AddSnippet(self,final_graph,sensor,suffix,tss_points):
+        json_object = None
+        if self.args.pointsEncoding == "columnar":
+            # start time, interval and an id template instead of a time and id per point
+            json_object = encode_points(tss_points)
+        if json_object is None:
+            # the lexical forms of the terms are joined into the array directly
+            json_object = encode_json(tss_points)
+
+        # choose an output subject: use the real URI if sensor is URIRef,
+        # otherwise mint an example URI for that sensor value
+        if isinstance(sensor, URIRef):
+            sensor_subject = sensor
+        else:
+            # for a Literal sensor (e.g. "24002042"), create a stable URI in ex: namespace
+            safe_id = str(sensor).replace(' ', '_')
+            sensor_subject = prefix_ex[f"sensor/{safe_id}"]
+        # every window or batch of new points of a sensor is a snippet of its own
+        subject = sensor_subject if suffix is None else URIRef(f"{sensor_subject}/{suffix}")
+
+        temporary_node = BNode()
+
+        final_graph.add((subject, RDF.type, prefix_tss.Snippet))
+        # store the JSON timeseries as a literal (you had RDF.JSON before; keep as plain literal or use a string)
+        final_graph.add((subject, prefix_tss.points, Literal(json_object)))
+        # Add from / to times using the original RDF time Literals
+        final_graph.add((subject, prefix_tss["from"], tss_points[0]['time']))
+        final_graph.add((subject, prefix_tss.to, tss_points[-1]['time']))
+        final_graph.add((subject, prefix_tss.pointType, prefix_sosa.Observation))
+
+        # tss context omitted as in your original comment
+
+        final_graph.add((subject, prefix_tss.about, temporary_node))
+        final_graph.add((temporary_node, RDF.type, prefix_tss.PointTemplate))
+        # madeBySensor should point to original sensor term if it was a URI, otherwise to an identifier URI
+        final_graph.add((temporary_node, prefix_sosa.madeBySensor, sensor_subject))
+        # use observedProperty from the first point (assumes same observedProperty for sensor)
+        final_graph.add((temporary_node, prefix_sosa.observedProperty, tss_points[0]['observedProperty']))
@@ -0,0 +1,115 @@
+import json
+from unittest.mock import AsyncMock
+from urllib.parse import quote
+
+import pytest
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import XSD
+
+import RDF2TSSProcssorPy.processor as processor
+import RDF2TSSProcssorPy.encoding as encoding
+from RDF2TSSProcssorPy.encoding import encode_json, encode_points
+# the literals are read back by the decoder of the downstream processor
+from TSS2RDFProcessorPy.encoding import decode_points
+
+TSS = Namespace("https://w3id.org/tss#")
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+def make_points(times, values, ids=None):
+    return [{
+        'time': Literal(time, datatype=XSD.dateTime, normalize=False),
+        'value': value if isinstance(value, Literal) else Literal(value, datatype=XSD.double),
+        'id': URIRef(ids[index] if ids else "http://example.com/reading_24002042_" + quote(time, safe="")),
+        'observedProperty': Literal("River Stage"),
+    } for index, (time, value) in enumerate(zip(times, values))]
+
+
+def json_form(points):
+    return [{'time': str(p['time']), 'value': str(p['value']), 'id': str(p['id'])} for p in points]
+
+
+REGULAR = ["2025-08-12T12:00:00+00:00", "2025-08-12T12:15:00+00:00", "2025-08-12T12:30:00+00:00"]
+IRREGULAR = ["2025-08-12T12:00:00+02:00", "2025-08-12T12:01:00.500000+02:00", "2025-08-13T00:00:00+02:00"]
+
+
+@pytest.mark.parametrize("points", [
+    make_points(REGULAR, ["34.54", "-1.5E2", "0"]),
+    make_points(IRREGULAR, ["1.0", "2.0", "3.0"]),
+    make_points(REGULAR[:1], ["1.0"]),
+    # values that are no JSON number stay strings
+    make_points(REGULAR, [Literal("true", datatype=XSD.boolean), Literal("NaN", datatype=XSD.double),
+                          Literal("a \"quoted\" text")]),
+    # ids without the time in them are listed
+    make_points(REGULAR, ["1", "2", "3"], ids=["http://example.com/a", "http://example.com/b", "http://example.com/c"]),
+])
+def test_round_trip_against_the_json_form(points):
+    encoded = encode_points(points)
+    assert encoded is not None
+    assert decode_points(encoded) == json_form(points)
+    assert decode_points(json.dumps(json_form(points))) == json_form(points)
+
+
+def test_compact_form_of_a_regular_series():
+    encoded = json.loads(encode_points(make_points(REGULAR, ["34.54", "34.6", "34.7"])))
+    assert encoded == {"start": REGULAR[0], "interval": 900, "values": [34.54, 34.6, 34.7],
+                       "id": "http://example.com/reading_24002042_{time}"}
+
+
+def test_times_that_cannot_be_rebuilt_are_not_encoded():
+    assert encode_points(make_points(["2025-08-12T12:00:00Z", "2025-08-12T12:15:00Z"], ["1", "2"])) is None
+    mixed_offsets = ["2025-08-12T12:00:00+00:00", "2025-08-12T14:15:00+02:00"]
+    assert encode_points(make_points(mixed_offsets, ["1", "2"])) is None
+
+
+def test_json_array_is_the_json_dumps_text():
+    points = make_points(REGULAR, ["34.54", "-1.5E2", "0"])
+    assert encode_json(points) == json.dumps(json_form(points))
+    assert encode_json([]) == "[]"
+
+
+@pytest.mark.parametrize("backend", ["orjson", "json"])
+@pytest.mark.parametrize("value", ['a "quoted" text', "back\\slash", "new\nline", "caf\u00e9"])
+def test_json_array_with_escapes(monkeypatch, backend, value):
+    if backend == "json":
+        monkeypatch.setattr(encoding, "orjson", None)
+    points = make_points(REGULAR[:2], [Literal(value), Literal("1")])
+    # the same text as without escapes, whichever backend is installed
+    assert encode_json(points) == json.dumps(json_form(points))
+
+
+@pytest.mark.asyncio
+async def test_processor_writes_columnar_points():
+    data = """
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+""" + "".join("""
+<http://example.com/reading_1_{0}> a sosa:Observation ; sosa:madeBySensor "1" ;
+    sosa:hasSimpleResult "{1}"^^xsd:double ; sosa:observedProperty "Level" ; sosa:resultTime "{2}"^^xsd:dateTime .
+""".format(quote(time, safe=""), index, time) for index, time in enumerate(REGULAR)) + """
+<http://example.com/reading_1_late> a sosa:Observation ; sosa:madeBySensor "1" ;
+    sosa:hasSimpleResult "3"^^xsd:double ; sosa:observedProperty "Level" ; sosa:resultTime "unknown" .
+"""
+    outputs = {}
+    for encoding in ("json", "columnar"):
+        writer = AsyncMock()
+        proc = processor.RDF2TSSProcssorPy(processor.TemplateArgs(
+            reader=DummyReader([data]), writer=writer, maxPoints=3, pointsEncoding=encoding))
+        await proc.transform()
+        graphs = [Graph().parse(data=call.args[0], format="turtle") for call in writer.string.call_args_list]
+        outputs[encoding] = {str(s): str(o) for graph in graphs for s, o in graph.subject_objects(TSS.points)}
+    assert outputs["columnar"].keys() == outputs["json"].keys()
+    for subject, points in outputs["columnar"].items():
+        assert decode_points(points) == json.loads(outputs["json"][subject])
+    # the window with a time that is no xsd:dateTime falls back to the JSON array
+    assert sorted(points.startswith("{") for points in outputs["columnar"].values()) == [False, True]
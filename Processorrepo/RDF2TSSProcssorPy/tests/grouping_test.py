@@ -0,0 +1,94 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from rdflib import Graph, Literal, Namespace
+
+import RDF2TSSProcssorPy.processor as processor
+
+DATA = """
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.com/> .
+
+ex:a3 a sosa:Observation ; sosa:madeBySensor "1" ; sosa:hasSimpleResult "3.0"^^xsd:double ;
+    sosa:observedProperty "Pressure" ; sosa:resultTime "2025-08-12T12:45:00+00:00"^^xsd:dateTime .
+ex:a1 a sosa:Observation ; sosa:madeBySensor "1" ; sosa:hasSimpleResult "1.0"^^xsd:double ;
+    sosa:observedProperty "Pressure" ; sosa:resultTime "2025-08-12T12:15:00+00:00"^^xsd:dateTime .
+ex:a2 a sosa:Observation ; sosa:madeBySensor "1" ; sosa:hasSimpleResult "2.0"^^xsd:double ;
+    sosa:observedProperty "Pressure" ; sosa:resultTime "2025-08-12T14:30:00+02:00"^^xsd:dateTime .
+ex:b1 a sosa:Observation ; sosa:madeBySensor ex:sensorB ; sosa:hasSimpleResult "7"^^xsd:double ;
+    sosa:observedProperty "Level" ; sosa:resultTime "2025-08-12T12:00:00+00:00"^^xsd:dateTime .
+ex:c1 a sosa:Observation ; sosa:madeBySensor "3" ; sosa:observedProperty "Level" ;
+    sosa:resultTime "2025-08-12T12:00:00+00:00"^^xsd:dateTime .
+ex:d1 sosa:madeBySensor "1" ; sosa:hasSimpleResult "9"^^xsd:double ;
+    sosa:observedProperty "Pressure" ; sosa:resultTime "2025-08-12T11:00:00+00:00"^^xsd:dateTime .
+"""
+
+TSS = Namespace("https://w3id.org/tss#")
+EX = Namespace("http://example.com/")
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+def sparql_series(graph, sensor):
+    # the query the processor used to run for every sensor
+    query = """
+    PREFIX sosa: <http://www.w3.org/ns/sosa/>
+    SELECT ?READING ?TIME ?OBSERVATION ?observedProperty
+    WHERE {{
+        ?OBSERVATION a sosa:Observation ;
+                    sosa:resultTime ?TIME ;
+                    sosa:hasSimpleResult ?READING ;
+                    sosa:observedProperty ?observedProperty ;
+                    sosa:madeBySensor {} .
+    }}
+    ORDER BY ?TIME
+    """.format(sensor.n3())
+    return [{'time': row.TIME, 'value': row.READING, 'id': row.OBSERVATION, 'observedProperty': row.observedProperty}
+            for row in graph.query(query)]
+
+
+def make_processor():
+    return processor.RDF2TSSProcssorPy(processor.TemplateArgs(reader=DummyReader([]), writer=AsyncMock()))
+
+
+def test_series_match_the_per_sensor_query():
+    graph = Graph().parse(data=DATA, format="turtle")
+    series = make_processor().CreateSeries(graph)
+    assert set(series) == {Literal("1"), EX.sensorB}
+    for sensor, points in series.items():
+        assert points == sparql_series(graph, sensor)
+    # sorted on the time value, not on its lexical form
+    assert [p['id'] for p in series[Literal("1")]] == [EX.a1, EX.a2, EX.a3]
+
+
+def test_snippets_from_series():
+    graph = Graph().parse(data=DATA, format="turtle")
+    proc = make_processor()
+    tss = proc.CreateTSS(proc.CreateSeries(graph))
+    snippets = set(tss.subjects(None, TSS.Snippet))
+    assert len(snippets) == 2
+    points = json.loads(tss.value(EX.sensorB, TSS.points))
+    assert points == [{'time': "2025-08-12T12:00:00+00:00", 'value': "7.0", 'id': str(EX.b1)}]
+
+
+@pytest.mark.asyncio
+async def test_transform_writes_snippets_per_message():
+    writer = AsyncMock()
+    proc = processor.RDF2TSSProcssorPy(processor.TemplateArgs(reader=DummyReader([DATA]), writer=writer))
+    await proc.init()
+    await proc.transform()
+    output = Graph().parse(data=writer.string.call_args_list[0].args[0], format="turtle")
+    assert len(set(output.subjects(None, TSS.Snippet))) == 2
+    assert proc.sensorSet == {Literal("1"), EX.sensorB}
+    writer.close.assert_awaited_once()
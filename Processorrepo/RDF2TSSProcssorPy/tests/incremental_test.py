@@ -0,0 +1,201 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from datetime import datetime, timedelta, timezone
+
+from rdflib import Graph, Literal, Namespace
+from rdflib.namespace import XSD
+
+import RDF2TSSProcssorPy.processor as processor
+import RDF2TSSProcssorPy.buffers as buffers_module
+from RDF2TSSProcssorPy.buffers import SensorBuffers
+
+PREFIXES = """
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.com/> .
+"""
+
+TSS = Namespace("https://w3id.org/tss#")
+EX = Namespace("http://example.org/")
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+def observation(sensor, minute, value):
+    return """
+ex:r{0}_{1} a sosa:Observation ; sosa:madeBySensor "{0}" ; sosa:hasSimpleResult "{2}"^^xsd:double ;
+    sosa:observedProperty "Level" ; sosa:resultTime "2025-08-12T12:{1:02d}:00+00:00"^^xsd:dateTime .
+""".format(sensor, minute, value)
+
+
+MESSAGES = [
+    observation(1, 0, 1.0) + observation(1, 30, 3.0) + observation(2, 0, 5.0),
+    observation(1, 45, 4.0),
+    # late point for sensor 1, sensor 2 unchanged
+    observation(1, 15, 2.0),
+    # repeated observation
+    observation(1, 45, 4.0),
+]
+
+
+async def run(messages, **options):
+    writer = AsyncMock()
+    proc = processor.RDF2TSSProcssorPy(processor.TemplateArgs(
+        reader=DummyReader([PREFIXES + msg for msg in messages]), writer=writer, **options))
+    await proc.init()
+    await proc.transform()
+    return proc, [Graph().parse(data=call.args[0], format="turtle") for call in writer.string.call_args_list]
+
+
+def snippets(graph, sensor):
+    # the snippet of the sensor, or its snippets of new points
+    subject = str(EX["sensor/{}".format(sensor)])
+    return sorted((str(s), json.loads(value)) for s, value in graph.subject_objects(TSS.points)
+                  if str(s) == subject or str(s).startswith(subject + "/"))
+
+
+def points(graph, sensor):
+    found = snippets(graph, sensor)
+    return None if not found else [p['value'] for _, array in found for p in array]
+
+
+@pytest.mark.asyncio
+async def test_only_new_points_are_written():
+    proc, outputs = await run(MESSAGES, incremental=True)
+    assert len(outputs) == 3
+    assert points(outputs[0], 1) == ["1.0", "3.0"] and points(outputs[0], 2) == ["5.0"]
+    assert points(outputs[1], 1) == ["4.0"] and points(outputs[1], 2) is None
+    # the late point on its own, earlier points are not encoded again
+    assert points(outputs[2], 1) == ["2.0"] and points(outputs[2], 2) is None
+    assert [subject for subject, _ in snippets(outputs[2], 1)] == ["http://example.org/sensor/1/batch/3"]
+    assert proc.sensorSet == {Literal("1"), Literal("2")}
+
+
+@pytest.mark.asyncio
+async def test_new_points_add_up_to_the_accumulated_graph():
+    _, incremental = await run(MESSAGES, incremental=True)
+    _, accumulated = await run(MESSAGES)
+    for sensor in (1, 2):
+        received = sorted((p['time'], p['value']) for graph in incremental for _, array in snippets(graph, sensor)
+                          for p in array)
+        assert [value for _, value in received] == points(accumulated[-1], sensor)
+        subject = EX["sensor/{}".format(sensor)]
+        assert received[0][0] == str(accumulated[-1].value(subject, TSS["from"]))
+        assert received[-1][0] == str(accumulated[-1].value(subject, TSS.to))
+
+
+@pytest.mark.asyncio
+async def test_observation_split_over_messages():
+    first = """ex:r9 a sosa:Observation ; sosa:madeBySensor "9" ;
+        sosa:resultTime "2025-08-12T12:00:00+00:00"^^xsd:dateTime ."""
+    second = """ex:r9 sosa:hasSimpleResult "9.5"^^xsd:double ; sosa:observedProperty "Level" ."""
+    proc, outputs = await run([first, second], incremental=True)
+    assert len(outputs) == 1
+    assert points(outputs[0], 9) == ["9.5"]
+    assert len(proc.pending) == 0
+
+
+@pytest.mark.asyncio
+async def test_incomplete_observations_are_dropped_after_max_pending_messages(caplog):
+    incomplete = """ex:r8 a sosa:Observation ; sosa:madeBySensor "8" ."""
+    late = """ex:r9 a sosa:Observation ; sosa:madeBySensor "9" ."""
+    rest = """ex:{} sosa:hasSimpleResult "9.5"^^xsd:double ; sosa:observedProperty "Level" ;
+        sosa:resultTime "2025-08-12T12:00:00+00:00"^^xsd:dateTime ."""
+    messages = [incomplete, late, MESSAGES[0], rest.format("r9"), rest.format("r8")]
+    proc, outputs = await run(messages, incremental=True, maxPendingMessages=2)
+    # r8 waited two messages and was dropped before its values came in, r9 was completed in time
+    assert caplog.text.count("Dropped") == 1
+    assert "Dropped 1 observations still incomplete after 2 messages: http://example.com/r8" in caplog.text
+    assert points(outputs[-1], 9) == ["9.5"]
+    assert all(points(graph, 8) is None for graph in outputs)
+    # only the values of r8 that came in after it was dropped wait
+    assert len(proc.pending) == 3
+
+
+@pytest.mark.asyncio
+async def test_state_survives_a_restart(tmp_path):
+    state = str(tmp_path / "state.pickle")
+    pending = """ex:r9 a sosa:Observation ; sosa:madeBySensor "9" ."""
+    await run(MESSAGES[:2] + [pending], incremental=True, stateFile=state)
+    proc, outputs = await run(MESSAGES[2:] + ["""ex:r9 sosa:hasSimpleResult "9.5"^^xsd:double ;
+        sosa:observedProperty "Level" ; sosa:resultTime "2025-08-12T12:00:00+00:00"^^xsd:dateTime ."""],
+                              incremental=True, stateFile=state)
+    assert points(outputs[0], 1) == ["2.0"]
+    # the batches are numbered on from the previous run
+    assert [subject for subject, _ in snippets(outputs[0], 1)] == ["http://example.org/sensor/1/batch/3"]
+    assert points(outputs[-1], 9) == ["9.5"]
+    assert len(outputs) == 2
+    assert proc.sensorSet == {Literal("1"), Literal("2"), Literal("9")}
+
+
+class FailingReader(DummyReader):
+    """Yields the messages and then fails, as a crashed upstream would."""
+
+    async def strings(self):
+        async for msg in super().strings():
+            yield msg
+        raise ConnectionError("reader failed")
+
+
+@pytest.mark.asyncio
+async def test_state_is_saved_every_state_interval_messages(tmp_path):
+    state = str(tmp_path / "state.pickle")
+    proc = processor.RDF2TSSProcssorPy(processor.TemplateArgs(
+        reader=FailingReader([PREFIXES + msg for msg in MESSAGES[:3]]), writer=AsyncMock(),
+        incremental=True, stateFile=state, stateInterval=2))
+    await proc.init()
+    with pytest.raises(ConnectionError):
+        await proc.transform()
+    # saved after the second message, the third one is lost with the crash
+    restored = SensorBuffers(processor.time_key)
+    restored.load(state)
+    assert [str(p['value']) for p in restored.points[Literal("1")]] == ["1.0", "3.0", "4.0"]
+    assert restored.batches == 2
+
+
+def test_seen_points_are_forgotten_after_seen_span():
+    sensor = Literal("1")
+
+    def series(minutes):
+        start = datetime(2025, 8, 12, tzinfo=timezone.utc)
+        return {sensor: [{'time': Literal((start + timedelta(minutes=m)).isoformat(), datatype=XSD.dateTime),
+                          'value': Literal(m), 'id': EX["r{}".format(m)], 'observedProperty': Literal("Level")}
+                         for m in minutes]}
+
+    buffers = SensorBuffers(processor.time_key, seen_span=3600)
+    buffers.add(series(range(3000)))
+    # everything more than an hour before the latest point is forgotten
+    assert len(buffers.seen[sensor]) == 61
+    assert buffers.add(series([2999])) == {}
+    assert buffers.add(series([0])) == {sensor: 1}
+    assert len(buffers.points[sensor]) == 3001
+
+
+def test_late_points_are_merged_in_order(monkeypatch):
+    monkeypatch.setattr(buffers_module, "INSERT_LIMIT", 4)
+    proc = processor.RDF2TSSProcssorPy(processor.TemplateArgs(reader=DummyReader([]), writer=AsyncMock()))
+
+    def series(minutes):
+        graph = Graph().parse(data=PREFIXES + "".join(observation(1, m, m) for m in minutes), format="turtle")
+        return proc.CreateSeries(graph)
+
+    buffers = SensorBuffers(processor.time_key)
+    assert buffers.add(series(range(0, 60, 3))) == {Literal("1"): 0}
+    # inserted one by one
+    assert buffers.add(series([55, 58])) == {Literal("1"): 19}
+    # merged in one pass, more late points than the insert limit
+    late = [m for m in range(60) if m % 3 and m not in (55, 58)]
+    assert buffers.add(series(late)) == {Literal("1"): 1}
+    assert [int(float(p['value'])) for p in buffers.points[Literal("1")]] == list(range(60))
+    assert buffers.keys[Literal("1")] == sorted(buffers.keys[Literal("1")])
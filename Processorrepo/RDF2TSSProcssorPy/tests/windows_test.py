@@ -0,0 +1,101 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from rdflib import Graph, Literal, Namespace, URIRef
+
+import RDF2TSSProcssorPy.processor as processor
+
+PREFIXES = """
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.com/> .
+"""
+
+TSS = Namespace("https://w3id.org/tss#")
+SOSA = Namespace("http://www.w3.org/ns/sosa/")
+SENSOR = "http://example.org/sensor/1"
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+def observation(day, hour, value):
+    return """
+ex:r{0}_{1} a sosa:Observation ; sosa:madeBySensor "1" ; sosa:hasSimpleResult "{2}"^^xsd:double ;
+    sosa:observedProperty "Level" ; sosa:resultTime "2025-08-{0:02d}T{1:02d}:00:00+00:00"^^xsd:dateTime .
+""".format(day, hour, value)
+
+
+async def run(messages, **options):
+    writer = AsyncMock()
+    proc = processor.RDF2TSSProcssorPy(processor.TemplateArgs(
+        reader=DummyReader([PREFIXES + msg for msg in messages]), writer=writer, **options))
+    await proc.init()
+    await proc.transform()
+    return [Graph().parse(data=call.args[0], format="turtle") for call in writer.string.call_args_list]
+
+
+def snippets(graphs):
+    result = {}
+    for graph in graphs:
+        for subject in graph.subjects(None, TSS.Snippet):
+            result[str(subject)] = (str(graph.value(subject, TSS["from"])), str(graph.value(subject, TSS.to)),
+                                    [p['value'] for p in json.loads(graph.value(subject, TSS.points))])
+            template = graph.value(subject, TSS.about)
+            assert graph.value(template, SOSA.madeBySensor) == URIRef(SENSOR)
+    return result
+
+
+def keys(*times):
+    return [processor.time_key(Literal(time, datatype="http://www.w3.org/2001/XMLSchema#dateTime")) for time in times]
+
+
+def test_split_windows():
+    day = keys("2025-08-12T00:00:00Z", "2025-08-12T23:45:00+00:00", "2025-08-13T01:00:00+02:00",
+               "2025-08-13T00:00:00Z")
+    assert processor.split_windows(day, 0, 0) == [(None, 0, 4)]
+    # the third time is still the 12th in UTC
+    assert processor.split_windows(day, 0, 86400) == [("20250812T000000Z", 0, 3), ("20250813T000000Z", 3, 4)]
+    assert processor.split_windows(day, 2, 0) == [("0", 0, 2), ("1", 2, 4)]
+    assert processor.split_windows(day, 2, 86400) == [
+        ("20250812T000000Z-0", 0, 2), ("20250812T000000Z-1", 2, 3), ("20250813T000000Z-0", 3, 4)]
+
+
+@pytest.mark.asyncio
+async def test_one_snippet_per_day():
+    outputs = await run([observation(12, 0, 1) + observation(12, 12, 2) + observation(13, 6, 3)], maxSpan=86400)
+    assert len(outputs) == 2
+    assert snippets(outputs) == {
+        SENSOR + "/window/20250812T000000Z": ("2025-08-12T00:00:00+00:00", "2025-08-12T12:00:00+00:00", ["1.0", "2.0"]),
+        SENSOR + "/window/20250813T000000Z": ("2025-08-13T06:00:00+00:00", "2025-08-13T06:00:00+00:00", ["3.0"]),
+    }
+
+
+@pytest.mark.asyncio
+async def test_max_points_per_snippet():
+    outputs = await run(["".join(observation(12, hour, hour) for hour in range(5))], maxPoints=2)
+    assert [points for _, _, points in sorted(snippets(outputs).values())] == [
+        ["0.0", "1.0"], ["2.0", "3.0"], ["4.0"]]
+    assert set(snippets(outputs)) == {SENSOR + "/window/{}".format(i) for i in range(3)}
+
+
+@pytest.mark.asyncio
+async def test_incremental_writes_the_changed_windows():
+    outputs = await run([observation(12, 0, 1) + observation(13, 0, 2) + observation(14, 0, 3),
+                         observation(14, 6, 4),
+                         observation(13, 6, 5)], maxSpan=86400, incremental=True)
+    assert [sorted(snippets([graph])) for graph in outputs] == [
+        [SENSOR + "/window/20250812T000000Z"], [SENSOR + "/window/20250813T000000Z"],
+        [SENSOR + "/window/20250814T000000Z"],
+        [SENSOR + "/window/20250814T000000Z"],
+        [SENSOR + "/window/20250813T000000Z"], [SENSOR + "/window/20250814T000000Z"]]
+    assert snippets([outputs[4]])[SENSOR + "/window/20250813T000000Z"][2] == ["2.0", "5.0"]
@@ -0,0 +1,81 @@
+import be.ugent.idlab.knows.functions.agent.Agent;
+import be.ugent.idlab.knows.functions.agent.AgentFactory;
+import be.ugent.rml.Executor;
+import be.ugent.rml.records.RecordsFactory;
+import be.ugent.rml.store.Quad;
+import be.ugent.rml.store.QuadStore;
+import be.ugent.rml.store.QuadStoreFactory;
+import be.ugent.rml.store.RDF4JStore;
+import be.ugent.rml.term.Literal;
+import be.ugent.rml.term.NamedNode;
+
+import java.io.BufferedOutputStream;
+import java.io.BufferedReader;
+import java.io.File;
+import java.io.FileInputStream;
+import java.io.InputStream;
+import java.io.InputStreamReader;
+import java.io.OutputStream;
+import java.io.StringWriter;
+import java.nio.charset.StandardCharsets;
+import java.util.List;
+
+/**
+ * Long-lived RMLMapper worker used by RmlProcessor2Py.
+ *
+ * Run with the rmlmapper jar on the classpath (java -cp rmlmapper.jar MapperWorker.java mapping.ttl).
+ * The mapping is parsed once; afterwards every line on stdin is the path of a CSV file to map.
+ * Each job is answered on stdout with a header line "OK|ERR <bytes> <millis>" followed by
+ * exactly <bytes> bytes of N-Quads (or the error message).
+ */
+public class MapperWorker {
+    private static final NamedNode RML_SOURCE = new NamedNode("http://semweb.mmlab.be/ns/rml#source");
+    private static final String BASE_IRI = "http://example.com/";
+
+    public static void main(String[] args) throws Exception {
+        // Keep stdout for the job protocol, the mapper logs go to stderr
+        OutputStream out = new BufferedOutputStream(System.out);
+        System.setOut(System.err);
+
+        File mappingFile = new File(args[0]);
+        QuadStore rmlStore;
+        try (InputStream in = new FileInputStream(mappingFile)) {
+            rmlStore = QuadStoreFactory.read(in);
+        }
+        String basePath = System.getProperty("user.dir");
+        String mappingDir = mappingFile.getAbsoluteFile().getParent();
+        Agent functionAgent = AgentFactory.createFromFnO(
+                "fno/functions_idlab.ttl", "fno/functions_idlab_classes_java_mapping.ttl",
+                "functions_grel.ttl", "grel_java_mapping.ttl");
+        List<Quad> sources = rmlStore.getQuads(null, RML_SOURCE, null);
+
+        BufferedReader jobs = new BufferedReader(new InputStreamReader(System.in, StandardCharsets.UTF_8));
+        String csvPath;
+        while ((csvPath = jobs.readLine()) != null) {
+            long start = System.nanoTime();
+            String status = "OK";
+            byte[] body;
+            try {
+                // Point every logical source at the CSV of this job
+                for (Quad source : sources) {
+                    rmlStore.removeQuads(source.getSubject(), RML_SOURCE, null);
+                    rmlStore.addQuad(source.getSubject(), RML_SOURCE, new Literal(csvPath));
+                }
+                // A fresh records factory per job, it caches the records it has read
+                RecordsFactory factory = new RecordsFactory(basePath, mappingDir);
+                Executor executor = new Executor(rmlStore, factory, new RDF4JStore(), BASE_IRI, functionAgent);
+                QuadStore result = executor.execute(null).get(new NamedNode("rmlmapper://default.store"));
+                StringWriter writer = new StringWriter();
+                result.write(writer, "nquads");
+                body = writer.toString().getBytes(StandardCharsets.UTF_8);
+            } catch (Exception e) {
+                status = "ERR";
+                body = String.valueOf(e).getBytes(StandardCharsets.UTF_8);
+            }
+            long millis = (System.nanoTime() - start) / 1_000_000;
+            out.write((status + " " + body.length + " " + millis + "\n").getBytes(StandardCharsets.UTF_8));
+            out.write(body);
+            out.flush();
+        }
+    }
+}
@@ -0,0 +1,87 @@
+import hashlib
+import os
+import tempfile
+from logging import getLogger, Logger
+
+
+class MappingCache:
+    """On-disk cache of mapping results, keyed by a hash of the mapping and the mapped input.
+
+    Entries are plain files named after their key. The modification time of an entry is
+    refreshed on every hit, so evicting the oldest files first gives an LRU policy that
+    keeps the directory under max_bytes."""
+    logger: Logger = getLogger('rdfc.MappingCache')
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        os.makedirs(directory, exist_ok=True)
+        self.sizes: dict[str, int] = {}
+        for name in os.listdir(directory):
+            if name.endswith(".nq"):
+                self.sizes[name] = os.path.getsize(os.path.join(directory, name))
+        self.total_bytes = sum(self.sizes.values())
+
+    @staticmethod
+    def key(*parts: bytes) -> str:
+        digest = hashlib.sha256()
+        for part in parts:
+            # length prefix so that different splits of the same bytes give different keys
+            digest.update(len(part).to_bytes(8, "big"))
+            digest.update(part)
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        path = os.path.join(self.directory, key + ".nq")
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = f.read()
+            os.utime(path)
+        except FileNotFoundError:
+            self.misses += 1
+            self.logger.debug("Mapping cache miss {} ({} hits, {} misses)".format(key[:12], self.hits, self.misses))
+            return None
+        self.hits += 1
+        self.logger.debug("Mapping cache hit {} ({} hits, {} misses)".format(key[:12], self.hits, self.misses))
+        return data
+
+    def put(self, key: str, data: str) -> None:
+        encoded = data.encode("utf-8")
+        if len(encoded) > self.max_bytes:
+            self.logger.debug("Not caching {}: {} bytes is larger than the cache".format(key[:12], len(encoded)))
+            return
+        name = key + ".nq"
+        # write to a temp file first so that readers never see a partial entry
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(encoded)
+        os.replace(tmp_path, os.path.join(self.directory, name))
+        self.total_bytes += len(encoded) - self.sizes.get(name, 0)
+        self.sizes[name] = len(encoded)
+        self.evict()
+
+    def evict(self) -> None:
+        if self.total_bytes <= self.max_bytes:
+            return
+        entries = []
+        for name in self.sizes:
+            try:
+                entries.append((os.path.getmtime(os.path.join(self.directory, name)), name))
+            except FileNotFoundError:
+                entries.append((0, name))
+        for _, name in sorted(entries):
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except FileNotFoundError:
+                pass
+            self.total_bytes -= self.sizes.pop(name)
+            self.evictions += 1
+
+    def log_stats(self) -> None:
+        self.logger.info("Mapping cache: {} hits, {} misses, {} evictions, {} bytes in {} entries".format(
+            self.hits, self.misses, self.evictions, self.total_bytes, len(self.sizes)))
@@ -0,0 +1,235 @@
+import io
+import re
+import string
+from urllib.parse import quote
+
+import numpy as np
+import pandas as pd
+from rdflib import Graph, URIRef, Literal, BNode
+from rdflib.namespace import Namespace, RDF
+
+from .worker import MapperError
+
+RR = Namespace("http://www.w3.org/ns/r2rml#")
+RML = Namespace("http://semweb.mmlab.be/ns/rml#")
+QL = Namespace("http://semweb.mmlab.be/ns/ql#")
+
+# Term map properties the compiler knows how to handle, anything else falls back to the JVM mapper
+SUBJECT_MAP_KEYS = {RR.template, RR.constant, RML.reference, RR["class"], RR.termType}
+OBJECT_MAP_KEYS = {RR.template, RR.constant, RML.reference, RR.datatype, RR.language, RR.termType}
+POM_KEYS = {RR.predicate, RR.predicateMap, RR.objectMap, RR.object}
+
+IRI_SAFE = set(string.ascii_letters + string.digits + "-._~")
+LITERAL_ESCAPES = [("\\", "\\\\"), ('"', '\\"'), ("\n", "\\n"), ("\r", "\\r")]
+TEMPLATE_PART = re.compile(r"(?<!\\)\{([^{}]*)\}")
+
+
+class UnsupportedMapping(Exception):
+    """Raised when a mapping uses features the in-process engine cannot compile."""
+
+
+class CompiledMapping:
+    """A flat CSV triples map compiled into column-wise operations on a DataFrame.
+
+    Every term map becomes a function from the frame to a Series of N-Triples terms,
+    with missing values (empty cells) as NA so that the triple is skipped."""
+
+    def __init__(self, subject, poms):
+        self.subject = subject
+        self.poms = poms
+
+    def map_frame(self, df: pd.DataFrame) -> str:
+        """Return the N-Triples for every row of the frame, grouped per subject, each triple once."""
+        if df.empty:
+            return ''
+        df = df.fillna("").astype(str)
+        subject = _series(self.subject(df), df)
+        lines = []
+        for predicate, object_map in self.poms:
+            lines.append((subject + (" " + predicate + " ") + object_map(df) + " .\n").to_numpy(dtype=object))
+        # row-major order keeps the triples of one subject together
+        block = np.column_stack(lines).ravel()
+        # rmlmapper writes a set of triples, so repeated rows and maps only give their first line
+        return "".join(pd.unique(block[pd.notna(block)]))
+
+    def map_csv(self, csv_text: str) -> str:
+        """Return the N-Triples of a CSV message, or raise MapperError when it cannot be mapped."""
+        try:
+            df = pd.read_csv(io.StringIO(csv_text), dtype=str, keep_default_na=False)
+        except ValueError as e:
+            raise MapperError("could not read the CSV message: {}".format(e)) from e
+        return self.map_frame(df)
+
+
+def compile_mapping(mapping_file: str) -> CompiledMapping:
+    """Compile a mapping with a single CSV triples map, or raise UnsupportedMapping."""
+    graph = Graph()
+    graph.parse(mapping_file, format="turtle")
+
+    triples_maps = set(graph.subjects(RDF.type, RR.TriplesMap)) | set(graph.subjects(RML.logicalSource, None))
+    if len(triples_maps) != 1:
+        raise UnsupportedMapping("expected exactly one triples map, found {}".format(len(triples_maps)))
+    triples_map = triples_maps.pop()
+
+    source = graph.value(triples_map, RML.logicalSource)
+    if source is None or graph.value(source, RML.referenceFormulation) != QL.CSV:
+        raise UnsupportedMapping("only CSV logical sources are supported")
+    if graph.value(source, RML.iterator) is not None:
+        raise UnsupportedMapping("rml:iterator is not supported")
+
+    subject_map = graph.value(triples_map, RR.subjectMap)
+    if subject_map is None:
+        subject_iri = graph.value(triples_map, RR.subject)
+        if subject_iri is None:
+            raise UnsupportedMapping("triples map has no subject map")
+        subject = _constant(subject_iri)
+        classes = []
+    else:
+        _check_keys(graph, subject_map, SUBJECT_MAP_KEYS, "subject map")
+        if graph.value(subject_map, RR.termType) not in (None, RR.IRI):
+            raise UnsupportedMapping("only IRI subjects are supported")
+        subject = _term_map(graph, subject_map, RR.IRI)
+        classes = list(graph.objects(subject_map, RR["class"]))
+
+    poms = [(RDF.type.n3(), _constant(cls)) for cls in classes]
+    for pom in graph.objects(triples_map, RR.predicateObjectMap):
+        _check_keys(graph, pom, POM_KEYS, "predicate-object map")
+        predicates = list(graph.objects(pom, RR.predicate))
+        for predicate_map in graph.objects(pom, RR.predicateMap):
+            constant = graph.value(predicate_map, RR.constant)
+            if constant is None or len(set(graph.predicates(predicate_map, None))) != 1:
+                raise UnsupportedMapping("only constant predicate maps are supported")
+            predicates.append(constant)
+        objects = [_constant(o) for o in graph.objects(pom, RR.object)]
+        for object_map in graph.objects(pom, RR.objectMap):
+            _check_keys(graph, object_map, OBJECT_MAP_KEYS, "object map")
+            objects.append(_object_map(graph, object_map))
+        if not predicates or not objects:
+            raise UnsupportedMapping("predicate-object map without predicate or object")
+        for predicate in predicates:
+            if not isinstance(predicate, URIRef):
+                raise UnsupportedMapping("predicates must be IRIs")
+            for object_map in objects:
+                poms.append((predicate.n3(), object_map))
+    return CompiledMapping(subject, poms)
+
+
+def _check_keys(graph, node, allowed, what):
+    if isinstance(node, Literal):
+        raise UnsupportedMapping("{} must be a resource".format(what))
+    unsupported = set(graph.predicates(node, None)) - allowed - {RDF.type}
+    if unsupported:
+        raise UnsupportedMapping("{} uses unsupported properties: {}".format(
+            what, ", ".join(sorted(str(p) for p in unsupported))))
+
+
+def _object_map(graph, object_map):
+    datatype = graph.value(object_map, RR.datatype)
+    language = graph.value(object_map, RR.language)
+    term_type = graph.value(object_map, RR.termType)
+    if term_type is None:
+        # R2RML default: references and languages/datatypes give literals, templates give IRIs
+        is_literal = (graph.value(object_map, RML.reference) is not None
+                      or datatype is not None or language is not None)
+        term_type = RR.Literal if is_literal else RR.IRI
+    if term_type not in (RR.IRI, RR.Literal):
+        raise UnsupportedMapping("blank node objects are not supported")
+    if term_type == RR.IRI and (datatype is not None or language is not None):
+        raise UnsupportedMapping("IRI object maps cannot have a datatype or language")
+
+    lexical = _term_map(graph, object_map, term_type)
+    if term_type == RR.IRI or graph.value(object_map, RR.constant) is not None:
+        return lexical
+    if datatype is not None:
+        suffix = "^^" + URIRef(datatype).n3()
+    elif language is not None:
+        suffix = "@" + str(language)
+    else:
+        suffix = ""
+    return lambda df: lexical(df) + suffix
+
+
+def _term_map(graph, term_map, term_type):
+    """Return a function producing the N-Triples term (IRI) or the quoted lexical form (literal)."""
+    constant = graph.value(term_map, RR.constant)
+    reference = graph.value(term_map, RML.reference)
+    template = graph.value(term_map, RR.template)
+    if sum(x is not None for x in (constant, reference, template)) != 1:
+        raise UnsupportedMapping("term map needs exactly one of rr:constant, rml:reference, rr:template")
+    if constant is not None:
+        return _constant(constant)
+
+    as_iri = term_type == RR.IRI
+    if reference is not None:
+        column = str(reference)
+        parts = [lambda df: _column(df, column, False)]
+    else:
+        parts = _template_parts(str(template), as_iri)
+    if as_iri:
+        return lambda df: "<" + _concat(df, parts) + ">"
+    return lambda df: '"' + _escape_literal(_concat(df, parts)) + '"'
+
+
+def _template_parts(template, encode):
+    parts = []
+    position = 0
+    for match in TEMPLATE_PART.finditer(template):
+        text = _unescape_template(template[position:match.start()])
+        if text:
+            parts.append(text)
+        column = _unescape_template(match.group(1))
+        parts.append(lambda df, column=column: _column(df, column, encode))
+        position = match.end()
+    text = _unescape_template(template[position:])
+    if text:
+        parts.append(text)
+    return parts
+
+
+def _unescape_template(text):
+    return text.replace("\\{", "{").replace("\\}", "}")
+
+
+def _concat(df, parts):
+    result = None
+    for part in parts:
+        value = part(df) if callable(part) else part
+        result = value if result is None else result + value
+    return _series(result, df)
+
+
+def _series(value, df):
+    if isinstance(value, str):
+        return pd.Series(value, index=df.index, dtype=object)
+    return value
+
+
+def _column(df, column, encode):
+    if column not in df.columns:
+        raise MapperError("column {!r} referenced by the mapping is missing from the CSV".format(column))
+    values = df[column].astype(object)
+    values = values.where(values != "")
+    if encode:
+        # percent-encode one character at a time over the whole column, '%' first
+        for char in sorted(_characters(values) - IRI_SAFE, key=lambda c: c != "%"):
+            values = values.str.replace(char, quote(char, safe=""), regex=False)
+    return values
+
+
+def _escape_literal(values):
+    present = _characters(values)
+    for char, escaped in LITERAL_ESCAPES:
+        if char in present:
+            values = values.str.replace(char, escaped, regex=False)
+    return values
+
+
+def _characters(values):
+    return set("".join(values.dropna().unique()))
+
+
+def _constant(term):
+    if isinstance(term, BNode):
+        raise UnsupportedMapping("blank node constants are not supported")
+    n3 = term.n3()
+    return lambda df: n3
@@ -3,9 +3,15 @@ from dataclasses import dataclass
 from logging import getLogger, Logger
 import asyncio
 import os
+import subprocess
+import tempfile
 import aiofiles
 from rdfc_runner import Processor, ProcessorArgs, Reader, Writer
-import subprocess
+from rdflib import Graph, Literal, URIRef
+from .worker import MapperWorker, MapperError
+from .engine import CompiledMapping, UnsupportedMapping, compile_mapping
+from .cache import MappingCache
+from .streaming import stream_mapper
 
 # --- Type Definitions ---
 @dataclass
@@ -13,6 +19,18 @@ class TemplateArgs(ProcessorArgs):
     reader: Reader
     writer: Writer
     mappingFile: str
+    persistentWorker: bool = False
+    workerTimeout: float = 300.0
+    engine: str = "jvm"
+    incremental: bool = False
+    maxConcurrency: int = 1
+    cacheDir: str = ""
+    cacheMaxBytes: int = 256 * 1024 * 1024
+    streamBatchSize: int = 0
+
+# placeholder for rml:source in the per-job copies of the mapping
+SOURCE_PLACEHOLDER = "__RmlProcessor2Py_job_source__"
+RML_SOURCE = "http://semweb.mmlab.be/ns/rml#source"
 
 
 # --- Processor Implementation --- 
@@ -21,19 +39,96 @@ class RmlProcessor2Py(Processor[TemplateArgs]):
 
     def __init__(self, args: TemplateArgs):
         super().__init__(args)
-        self.clear_temp_CSV_file()
         self.finalGraph = ''
+        self.workers: list[MapperWorker] = []
+        self.idle_workers: asyncio.Queue[MapperWorker] = asyncio.Queue()
+        self.compiled: CompiledMapping | None = None
+        self.header: str | None = None
+        self.job_mapping = ''
+        self.slots = asyncio.Semaphore(max(1, self.args.maxConcurrency))
+        self.cache: MappingCache | None = None
+        self.mapping_bytes = b''
 
     async def init(self) -> None:
 
         self.logger.debug("Initializing RmlProcessorPy with args: {}", self.args)
+        if self.args.engine == "python":
+            # compile the mapping once, messages are then mapped in-process without java or temp files
+            try:
+                self.compiled = compile_mapping(self.args.mappingFile)
+            except UnsupportedMapping as e:
+                self.logger.warning("Cannot compile {} in-process ({}), using rmlmapper".format(self.args.mappingFile, e))
+        if self.compiled is not None:
+            return
+        if self.args.cacheDir:
+            # mapped output is reused for identical mapping + input, e.g. after a pipeline restart
+            self.cache = MappingCache(self.args.cacheDir, self.args.cacheMaxBytes)
+            with open(self.args.mappingFile, "rb") as f:
+                self.mapping_bytes = f.read()
+        if self.args.persistentWorker:
+            # long-lived JVMs for the lifetime of the processor instead of one per message
+            for _ in range(max(1, self.args.maxConcurrency)):
+                worker = MapperWorker(self.args.mappingFile, timeout=self.args.workerTimeout)
+                await worker.start()
+                self.workers.append(worker)
+                self.idle_workers.put_nowait(worker)
+        if self.args.maxConcurrency > 1:
+            if not self.args.incremental:
+                # concurrent jobs cannot map everything received so far, every message is mapped on its own
+                self.logger.warning("maxConcurrency > 1 maps every message on its own, as with incremental true")
+            # every job gets its own workspace, so the mapping is pointed at the job's CSV
+            self.job_mapping = self.create_job_mapping()
+        else:
+            self.clear_temp_CSV_file()
 
     async def transform(self) -> None:    
+        if self.compiled is None and self.args.maxConcurrency > 1:
+            await self.transform_concurrent()
+            return
         async for msg in self.args.reader.strings():
-            self.write_temp_CSV_file(msg)
-            process = self.mapdata()
+            if self.compiled:
+                try:
+                    self.finalGraph = self.compiled.map_csv(self.with_header(msg))
+                except MapperError as e:
+                    # as with the JVM mapper, a message that cannot be mapped is written as an error
+                    self.logger.error("in-process mapping failed: {}".format(e))
+                    await self.args.writer.string('error')
+                    continue
+                await self.args.writer.string(self.finalGraph)
+                continue
+            if self.args.incremental:
+                # only the rows of this message are mapped, not everything received so far
+                self.write_temp_CSV_file(self.with_header(msg), mode="w")
+            else:
+                self.write_temp_CSV_file(self.without_repeated_header(msg))
+            cache_key = None
+            if self.cache:
+                cache_key = self.cache.key(self.mapping_bytes, self.read_temp_CSV_file())
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    self.finalGraph = cached
+                    await self.args.writer.string(self.finalGraph)
+                    continue
+            if self.workers:
+                try:
+                    self.finalGraph = await self.workers[0].map("./WFresources/temp_data.csv")
+                    self.cache_result(cache_key, self.finalGraph)
+                    await self.args.writer.string(self.finalGraph)
+                except MapperError as e:
+                    self.logger.error("mapping worker failed: {}".format(e))
+                    await self.args.writer.string('error')
+                continue
+            if self.args.streamBatchSize > 0:
+                # forward the triples while the mapper is still producing them
+                process = await self.mapdata_streaming(self.args.writer.string, cache_key)
+                if process.returncode != 0:
+                    print("mapping process returned negative code")
+                    await self.args.writer.string('error')
+                continue
+            process = await self.mapdata()
             if process.returncode == 0:
                 self.finalGraph = self.read_temp_RDF_file()
+                self.cache_result(cache_key, self.finalGraph)
                 print("mapping process returned positive code")
                 await self.args.writer.string(self.finalGraph)
 
@@ -43,25 +138,163 @@ class RmlProcessor2Py(Processor[TemplateArgs]):
 
         #self.delete_temp_CSV_file()
         #self.delete_temp_RDF_file()
+        if self.cache:
+            self.cache.log_stats()
+        await self.close_workers()
         await self.args.writer.close()
 
+    async def transform_concurrent(self) -> None:
+        # Jobs run in parallel but their results are written in message order
+        pending: asyncio.Queue[asyncio.Task | None] = asyncio.Queue(maxsize=self.args.maxConcurrency)
 
+        async def emit_in_order():
+            while (job := await pending.get()) is not None:
+                try:
+                    self.finalGraph = await job
+                except Exception as e:
+                    # any failed job, not only a mapper error, is written as the error marker of the sequential path
+                    self.logger.error("mapping job failed: {!r}".format(e))
+                    await self.args.writer.string('error')
+                    continue
+                await self.args.writer.string(self.finalGraph)
+
+        async def enqueue(item):
+            # the queue is bounded, so a put must not wait for an emitter that has stopped
+            put = asyncio.create_task(pending.put(item))
+            await asyncio.wait({put, emitter}, return_when=asyncio.FIRST_COMPLETED)
+            if not put.done():
+                put.cancel()
+                while not pending.empty():
+                    job = pending.get_nowait()
+                    if job is not None:
+                        job.cancel()
+                if isinstance(item, asyncio.Task):
+                    item.cancel()
+                await emitter
+                raise RuntimeError("the emitter of the mapped messages stopped early")
+
+        emitter = asyncio.create_task(emit_in_order())
+        async for msg in self.args.reader.strings():
+            await enqueue(asyncio.create_task(self.map_job(self.with_header(msg))))
+        await enqueue(None)
+        await emitter
+
+        if self.cache:
+            self.cache.log_stats()
+        await self.close_workers()
+        await self.args.writer.close()
 
     async def produce(self) -> None:
 
         pass
 ###############################################################################################################
-    def mapdata(self):
-        command = ["java", "-jar", "rmlmapper.jar", "-m", self.args.mappingFile, "-o", "./WFresources/generatedRDF.ttl"] #newMapping.rml.ttl
-        # Run the process synchronously
-        process = subprocess.run(command, capture_output=True, text=True)
+    async def mapdata(self, mappingFile=None, outputFile="./WFresources/generatedRDF.ttl"):
+        command = ["java", "-jar", "rmlmapper.jar", "-m", mappingFile or self.args.mappingFile, "-o", outputFile] #newMapping.rml.ttl
+        # Run the process without blocking the other processors in the runner
+        process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate()
+        return subprocess.CompletedProcess(command, process.returncode, stdout, stderr)
+
+    async def mapdata_streaming(self, send, cache_key=None):
+        # the output is cached when it fits in the cache, without holding on to it past that
+        command = ["java", "-jar", "rmlmapper.jar", "-m", self.args.mappingFile]
+        process, output = await stream_mapper(command, send, self.args.streamBatchSize,
+                                              self.cache.max_bytes if self.cache and cache_key else 0)
+        if output is not None:
+            self.cache_result(cache_key, output)
         return process
 
-    def write_temp_CSV_file(self,msg) -> None:
+    async def map_job(self, csv_text) -> str:
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.key(self.mapping_bytes, csv_text.encode("utf-8"))
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+        result = await self.map_job_isolated(csv_text)
+        self.cache_result(cache_key, result)
+        return result
+
+    async def map_job_isolated(self, csv_text) -> str:
+        # Map one chunk in a private temp directory, at most maxConcurrency at a time
+        async with self.slots:
+            with tempfile.TemporaryDirectory(prefix="rmlprocessor2py-") as workdir:
+                csv_path = os.path.join(workdir, "data.csv")
+                async with aiofiles.open(csv_path, "w", encoding="utf-8") as f:
+                    await f.write(csv_text)
+
+                if self.workers:
+                    worker = await self.idle_workers.get()
+                    try:
+                        return await worker.map(csv_path)
+                    finally:
+                        self.idle_workers.put_nowait(worker)
+
+                mapping_path = os.path.join(workdir, "mapping.rml.ttl")
+                output_path = os.path.join(workdir, "generatedRDF.nt")
+                escaped_path = csv_path.replace("\\", "\\\\").replace('"', '\\"')
+                async with aiofiles.open(mapping_path, "w", encoding="utf-8") as f:
+                    await f.write(self.job_mapping.replace(SOURCE_PLACEHOLDER, escaped_path))
+
+                process = await self.mapdata(mapping_path, output_path)
+                if process.returncode != 0:
+                    raise MapperError(process.stderr.decode("utf-8", errors="replace"))
+                async with aiofiles.open(output_path, "r", encoding="utf-8") as f:
+                    return await f.read()
+
+    def create_job_mapping(self) -> str:
+        # Serialize the mapping once with a placeholder source, filled in per job
+        graph = Graph()
+        graph.parse(self.args.mappingFile, format="turtle")
+        source = URIRef(RML_SOURCE)
+        for logical_source in set(graph.subjects(source, None)):
+            graph.set((logical_source, source, Literal(SOURCE_PLACEHOLDER)))
+        return graph.serialize(format="turtle")
+
+    def cache_result(self, cache_key, result) -> None:
+        if self.cache and cache_key:
+            self.cache.put(cache_key, result)
+
+    async def close_workers(self) -> None:
+        for worker in self.workers:
+            await worker.close()
+
+    def write_temp_CSV_file(self,msg,mode="a") -> None:
         # Open the destination file
-        with open("./WFresources/temp_data.csv", "a", encoding="utf-8") as outfile:
+        with open("./WFresources/temp_data.csv", mode, encoding="utf-8") as outfile:
             outfile.write(msg)
 
+    def split_header(self,msg):
+        # Remember the header of the first chunk, later chunks may repeat it or leave it out
+        first_line, _, rest = msg.partition("\n")
+        if self.header is None:
+            self.header = first_line.rstrip("\r")
+            return rest
+        if first_line.rstrip("\r") == self.header:
+            return rest
+        return msg
+
+    def with_header(self,msg) -> str:
+        rows = self.split_header(msg)
+        if rows and not rows.endswith("\n"):
+            rows += "\n"
+        return self.header + "\n" + rows
+
+    def without_repeated_header(self,msg) -> str:
+        first_chunk = self.header is None
+        rows = self.split_header(msg)
+        if rows and not rows.endswith("\n"):
+            rows += "\n"
+        return self.header + "\n" + rows if first_chunk else rows
+
+    def read_temp_CSV_file(self) -> bytes:
+        with open("./WFresources/temp_data.csv", "rb") as file:
+            return file.read()
+
     def clear_temp_CSV_file(self) -> None:
         with open("./WFresources/temp_data.csv", "w", encoding="utf-8") as outfile:
             pass
@@ -0,0 +1,108 @@
+import asyncio
+import os
+import time
+from logging import getLogger, Logger
+
+WORKER_SOURCE = os.path.join(os.path.dirname(__file__), "MapperWorker.java")
+
+
+class MapperError(Exception):
+    """Raised when the mapper worker could not map a job."""
+
+
+# how a worker that exited shows up while a job is sent or read
+WORKER_DIED = (BrokenPipeError, ConnectionResetError, asyncio.IncompleteReadError)
+
+
+class MapperWorker:
+    """Long-lived rmlmapper JVM that keeps the mapping loaded between messages.
+
+    Jobs are sent as one CSV path per line on stdin, see MapperWorker.java for the protocol.
+    The JVM is started lazily and restarted when it has died. A job that takes longer than timeout
+    seconds kills the worker. Every failure to map a job is raised as MapperError."""
+    logger: Logger = getLogger('rdfc.RmlProcessor2Py.worker')
+
+    def __init__(self, mapping_file: str, jar: str = "rmlmapper.jar", timeout: float = 300.0):
+        self.mapping_file = mapping_file
+        self.jar = jar
+        self.timeout = timeout
+        self.process: asyncio.subprocess.Process | None = None
+        self.lock = asyncio.Lock()
+        self.jobs_since_start = 0
+
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
+    async def start(self) -> None:
+        command = ["java", "-cp", self.jar, WORKER_SOURCE, self.mapping_file]
+        try:
+            self.process = await asyncio.create_subprocess_exec(
+                *command,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+            )
+        except OSError as e:
+            raise MapperError("could not start the mapper worker: {}".format(e)) from e
+        self.jobs_since_start = 0
+        self.logger.info("Started mapper worker (pid {})".format(self.process.pid))
+
+    async def map(self, csv_path: str) -> str:
+        """Map one CSV file and return the generated N-Quads.
+        A worker that died is restarted and the job is retried once."""
+        async with self.lock:
+            try:
+                return await self._run_job_in_time(csv_path)
+            except WORKER_DIED as e:
+                self.logger.warning("Mapper worker died ({}), restarting".format(e))
+                await self._kill()
+            try:
+                return await self._run_job_in_time(csv_path)
+            except WORKER_DIED as e:
+                await self._kill()
+                raise MapperError("mapper worker died twice on {}: {!r}".format(csv_path, e)) from e
+
+    async def _run_job_in_time(self, csv_path: str) -> str:
+        try:
+            return await asyncio.wait_for(self._run_job(csv_path), self.timeout)
+        except asyncio.TimeoutError:
+            # the reply may still come, so the worker cannot take the next job
+            await self._kill()
+            raise MapperError("mapper worker did not answer {} within {} s".format(csv_path, self.timeout))
+
+    async def _run_job(self, csv_path: str) -> str:
+        if not self.alive():
+            await self.start()
+        cold = self.jobs_since_start == 0
+        start = time.perf_counter()
+
+        self.process.stdin.write((csv_path + "\n").encode("utf-8"))
+        await self.process.stdin.drain()
+        header = await self.process.stdout.readline()
+        if not header:
+            raise ConnectionResetError("mapper worker exited")
+        status, size, worker_ms = header.decode("utf-8").split()
+        body = (await self.process.stdout.readexactly(int(size))).decode("utf-8")
+        self.jobs_since_start += 1
+
+        self.logger.info("Mapping job {} took {:.1f} ms ({} ms in mapper, {})".format(
+            csv_path, (time.perf_counter() - start) * 1000, worker_ms, "cold" if cold else "warm"))
+        if status != "OK":
+            raise MapperError(body)
+        return body
+
+    async def _kill(self) -> None:
+        if self.alive():
+            self.process.kill()
+        if self.process is not None:
+            await self.process.wait()
+        self.process = None
+
+    async def close(self) -> None:
+        if self.alive():
+            self.process.stdin.close()
+            try:
+                await asyncio.wait_for(self.process.wait(), timeout=10)
+            except asyncio.TimeoutError:
+                await self._kill()
+        self.process = None
@@ -0,0 +1,39 @@
+import os
+import time
+
+from RmlProcessor2Py.cache import MappingCache
+
+
+def test_cache_hits_and_misses(tmp_path):
+    cache = MappingCache(str(tmp_path), max_bytes=1024)
+    key = MappingCache.key(b"mapping", b"a,b\n1,2\n")
+
+    assert cache.get(key) is None
+    cache.put(key, "<a> <b> <c> .\n")
+    assert cache.get(key) == "<a> <b> <c> .\n"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+    # the key depends on both the mapping and the input
+    assert MappingCache.key(b"mapping", b"a,b\n1,3\n") != key
+    assert MappingCache.key(b"mappin", b"ga,b\n1,2\n") != key
+
+    # entries survive a restart
+    assert MappingCache(str(tmp_path), max_bytes=1024).get(key) == "<a> <b> <c> .\n"
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = MappingCache(str(tmp_path), max_bytes=250)
+    keys = [MappingCache.key(str(i).encode()) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, "x" * 100)
+        os.utime(tmp_path / (key + ".nq"), (time.time() - 100 + i, time.time() - 100 + i))
+
+    # reading the oldest entry makes the other one least recently used
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], "x" * 100)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.total_bytes <= 250
+    assert cache.evictions == 1
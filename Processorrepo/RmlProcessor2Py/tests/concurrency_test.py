@@ -0,0 +1,123 @@
+import asyncio
+import os
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+import RmlProcessor2Py.processor as processor
+
+MAPPING = """
+@prefix rr:  <http://www.w3.org/ns/r2rml#> .
+@prefix rml: <http://semweb.mmlab.be/ns/rml#> .
+@prefix ql:  <http://semweb.mmlab.be/ns/ql#> .
+
+<http://example.com/#Mapping> a rr:TriplesMap ;
+  rml:logicalSource [ rml:source "./WFresources/temp_data.csv" ; rml:referenceFormulation ql:CSV ] ;
+  rr:subjectMap [ rr:template "http://example.com/{id}" ] .
+"""
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+@pytest.mark.asyncio
+async def test_concurrent_jobs_are_isolated_and_ordered(tmp_path):
+    mapping_file = tmp_path / "mapping.rml.ttl"
+    mapping_file.write_text(MAPPING, encoding="utf-8")
+    messages = ["id\n{}\n".format(i) for i in range(8)]
+    writer = AsyncMock()
+    args = processor.TemplateArgs(reader=DummyReader(messages), writer=writer,
+                                  mappingFile=str(mapping_file), maxConcurrency=3)
+    proc = processor.RmlProcessor2Py(args)
+
+    running = 0
+    peak = 0
+    workdirs = set()
+
+    async def fake_mapdata(mappingFile=None, outputFile=None):
+        nonlocal running, peak
+        workdir = os.path.dirname(mappingFile)
+        workdirs.add(workdir)
+        csv_path = os.path.join(workdir, "data.csv")
+        # the job mapping reads the job's own CSV
+        with open(mappingFile, encoding="utf-8") as f:
+            assert csv_path in f.read()
+        with open(csv_path, encoding="utf-8") as f:
+            row = f.read().splitlines()[1]
+
+        running += 1
+        peak = max(peak, running)
+        # later messages finish first
+        await asyncio.sleep(0.01 * (10 - int(row)))
+        running -= 1
+
+        with open(outputFile, "w", encoding="utf-8") as f:
+            f.write("<http://example.com/{}> .\n".format(row))
+        return SimpleNamespace(returncode=0)
+
+    proc.mapdata = fake_mapdata
+    await proc.init()
+    await proc.transform()
+
+    emitted = [call.args[0] for call in writer.string.await_args_list]
+    assert emitted == ["<http://example.com/{}> .\n".format(i) for i in range(8)]
+    assert 1 < peak <= 3
+    assert len(workdirs) == 8
+    assert not any(os.path.exists(workdir) for workdir in workdirs)
+    writer.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failing_jobs_are_written_as_errors(tmp_path):
+    mapping_file = tmp_path / "mapping.rml.ttl"
+    mapping_file.write_text(MAPPING, encoding="utf-8")
+    messages = ["id\n{}\n".format(i) for i in range(6)]
+    writer = AsyncMock()
+    args = processor.TemplateArgs(reader=DummyReader(messages), writer=writer,
+                                  mappingFile=str(mapping_file), maxConcurrency=2)
+    proc = processor.RmlProcessor2Py(args)
+
+    async def fake_map_job(csv_text):
+        row = int(csv_text.splitlines()[1])
+        if row % 2:
+            # not a MapperError, e.g. java or the output file missing
+            raise FileNotFoundError("java")
+        return "<http://example.com/{}> .\n".format(row)
+
+    proc.map_job = fake_map_job
+    await proc.init()
+    await asyncio.wait_for(proc.transform(), timeout=5)
+
+    emitted = [call.args[0] for call in writer.string.await_args_list]
+    assert emitted == ["<http://example.com/0> .\n", "error", "<http://example.com/2> .\n", "error",
+                       "<http://example.com/4> .\n", "error"]
+    writer.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_stopped_emitter_does_not_block_the_reader(tmp_path):
+    mapping_file = tmp_path / "mapping.rml.ttl"
+    mapping_file.write_text(MAPPING, encoding="utf-8")
+    messages = ["id\n{}\n".format(i) for i in range(10)]
+    writer = AsyncMock()
+    writer.string.side_effect = OSError("channel closed")
+    args = processor.TemplateArgs(reader=DummyReader(messages), writer=writer,
+                                  mappingFile=str(mapping_file), maxConcurrency=2)
+    proc = processor.RmlProcessor2Py(args)
+
+    async def fake_map_job(csv_text):
+        return "<http://example.com/s> .\n"
+
+    proc.map_job = fake_map_job
+    await proc.init()
+    with pytest.raises(OSError, match="channel closed"):
+        await asyncio.wait_for(proc.transform(), timeout=5)
@@ -0,0 +1,109 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF, XSD
+
+import RmlProcessor2Py.processor as processor
+from RmlProcessor2Py.engine import UnsupportedMapping, compile_mapping
+from RmlProcessor2Py.worker import MapperError
+
+MAPPING = """
+@prefix rr:  <http://www.w3.org/ns/r2rml#> .
+@prefix rml: <http://semweb.mmlab.be/ns/rml#> .
+@prefix ql:  <http://semweb.mmlab.be/ns/ql#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+
+<#SensorMapping> a rr:TriplesMap ;
+  rml:logicalSource [ rml:source "data.csv" ; rml:referenceFormulation ql:CSV ] ;
+  rr:subjectMap [ rr:template "http://example.com/reading_{ts_id}_{Timestamp}" ] ;
+  rr:predicateObjectMap [ rr:predicate rdf:type ; rr:objectMap [ rr:constant sosa:Observation ] ] ;
+  rr:predicateObjectMap [ rr:predicate sosa:madeBySensor ; rr:objectMap [ rml:reference "ts_id" ] ] ;
+  rr:predicateObjectMap [
+    rr:predicate sosa:hasSimpleResult ;
+    rr:objectMap [ rml:reference "Value" ; rr:datatype xsd:double ]
+  ] .
+"""
+
+CSV = """Timestamp,Value,ts_id
+2025-08-12T12:15:00+00:00,1010.49,78124042
+2025-08-12T12:30:00+00:00,,78124042
+"""
+
+
+def write_mapping(tmp_path, text):
+    path = tmp_path / "mapping.rml.ttl"
+    path.write_text(text, encoding="utf-8")
+    return str(path)
+
+
+def test_compiled_mapping_produces_ntriples(tmp_path):
+    mapping = compile_mapping(write_mapping(tmp_path, MAPPING))
+    graph = Graph().parse(data=mapping.map_csv(CSV), format="nt")
+
+    first = URIRef("http://example.com/reading_78124042_2025-08-12T12%3A15%3A00%2B00%3A00")
+    second = URIRef("http://example.com/reading_78124042_2025-08-12T12%3A30%3A00%2B00%3A00")
+    sosa = "http://www.w3.org/ns/sosa/"
+    assert (first, RDF.type, URIRef(sosa + "Observation")) in graph
+    assert (first, URIRef(sosa + "madeBySensor"), Literal("78124042")) in graph
+    assert (first, URIRef(sosa + "hasSimpleResult"), Literal("1010.49", datatype=XSD.double)) in graph
+    # empty cells do not produce triples
+    assert graph.value(second, URIRef(sosa + "hasSimpleResult")) is None
+    assert len(graph) == 5
+
+
+def test_repeated_triples_are_written_once(tmp_path):
+    # the second sensor map gives the madeBySensor triple again, the last row repeats the first one
+    mapping = MAPPING.replace(
+        'rr:predicateObjectMap [ rr:predicate sosa:madeBySensor ; rr:objectMap [ rml:reference "ts_id" ] ] ;',
+        'rr:predicateObjectMap [ rr:predicate sosa:madeBySensor ; rr:objectMap [ rml:reference "ts_id" ] ] ;\n'
+        '  rr:predicateObjectMap [ rr:predicate sosa:madeBySensor ; rr:objectMap [ rml:reference "ts_id" ] ] ;')
+    mapping = compile_mapping(write_mapping(tmp_path, mapping))
+    text = mapping.map_csv(CSV + "2025-08-12T12:15:00+00:00,1010.49,78124042\n")
+    lines = text.splitlines()
+    assert len(lines) == len(set(lines)) == 5
+    assert len(Graph().parse(data=text, format="nt")) == 5
+
+
+def test_unsupported_mapping_is_rejected(tmp_path):
+    mapping = MAPPING.replace(
+        'rr:objectMap [ rml:reference "ts_id" ]',
+        'rr:objectMap [ rr:parentTriplesMap <#SensorMapping> ]')
+    with pytest.raises(UnsupportedMapping):
+        compile_mapping(write_mapping(tmp_path, mapping))
+
+
+def test_missing_column_is_a_mapper_error(tmp_path):
+    mapping = compile_mapping(write_mapping(tmp_path, MAPPING))
+    with pytest.raises(MapperError, match="'ts_id'"):
+        mapping.map_csv("Timestamp,Value\n2025-08-12T12:15:00+00:00,1\n")
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+@pytest.mark.asyncio
+async def test_unmappable_message_is_written_as_error(tmp_path):
+    writer = AsyncMock()
+    # the first message fixes the header, so the second one misses ts_id as well
+    messages = ["Timestamp,Value\n2025-08-12T12:15:00+00:00,1\n", "2025-08-12T12:30:00+00:00,2\n"]
+    args = processor.TemplateArgs(reader=DummyReader(messages), writer=writer,
+                                  mappingFile=write_mapping(tmp_path, MAPPING), engine="python")
+    proc = processor.RmlProcessor2Py(args)
+    await proc.init()
+    await proc.transform()
+
+    emitted = [call.args[0] for call in writer.string.await_args_list]
+    # the processor keeps going after a message without a ts_id column
+    assert emitted == ['error', 'error']
+    writer.close.assert_awaited_once()
@@ -0,0 +1,60 @@
+from types import SimpleNamespace
+from unittest.mock import AsyncMock
+
+import pytest
+
+import RmlProcessor2Py.processor as processor
+
+HEADER = "Timestamp,Value,ts_id"
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+def chunk(index, rows, header):
+    lines = ["2025-08-12T{:02d}:{:02d}:00,{},78124042".format(index, row, row) for row in range(rows)]
+    return "\n".join(([HEADER] if header else []) + lines) + "\n"
+
+
+@pytest.mark.asyncio
+async def test_incremental_mode_maps_each_row_once(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "WFresources").mkdir()
+
+    # the first chunk carries the header, later chunks repeat it or leave it out
+    messages = [chunk(i, 10, header=(i % 2 == 0)) for i in range(20)]
+    writer = AsyncMock()
+    args = processor.TemplateArgs(reader=DummyReader(messages), writer=writer,
+                                  mappingFile="mapping.rml.ttl", incremental=True)
+    proc = processor.RmlProcessor2Py(args)
+
+    mapped_rows = []
+
+    async def fake_mapdata():
+        with open("./WFresources/temp_data.csv", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        assert lines[0] == HEADER
+        assert HEADER not in lines[1:]
+        mapped_rows.append(len(lines) - 1)
+        with open("./WFresources/generatedRDF.ttl", "w", encoding="utf-8") as f:
+            f.write("\n".join(lines[1:]))
+        return SimpleNamespace(returncode=0)
+
+    monkeypatch.setattr(proc, "mapdata", fake_mapdata)
+    await proc.init()
+    await proc.transform()
+
+    # total work is linear in the number of messages: every row is mapped exactly once
+    assert mapped_rows == [10] * len(messages)
+    emitted = [call.args[0] for call in writer.string.await_args_list]
+    assert len(emitted) == len(messages)
+    assert len(set(line for out in emitted for line in out.splitlines())) == 10 * len(messages)
+    writer.close.assert_awaited_once()
@@ -0,0 +1,61 @@
+import os
+import stat
+from unittest.mock import AsyncMock
+
+import pytest
+
+import RmlProcessor2Py.processor as processor
+from RmlProcessor2Py.cache import MappingCache
+
+FAKE_MAPPER = """#!/usr/bin/env python3
+import sys
+for i in range(100):
+    sys.stdout.write('<http://example.com/{}> <http://example.com/p> "{}" .\\n'.format(i, i))
+"""
+
+
+@pytest.mark.asyncio
+async def test_streaming_forwards_bounded_batches_of_complete_lines(tmp_path, monkeypatch):
+    java = tmp_path / "java"
+    java.write_text(FAKE_MAPPER, encoding="utf-8")
+    java.chmod(java.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    args = processor.TemplateArgs(reader=None, writer=AsyncMock(),
+                                  mappingFile="mapping.rml.ttl", streamBatchSize=500)
+    proc = processor.RmlProcessor2Py(args)
+    send = AsyncMock()
+
+    process = await proc.mapdata_streaming(send)
+
+    assert process.returncode == 0
+    batches = [call.args[0] for call in send.await_args_list]
+    assert len(batches) > 1
+    line_length = max(len(line) + 1 for batch in batches for line in batch.splitlines())
+    for batch in batches:
+        assert batch.endswith(" .\n")
+        assert len(batch.encode("utf-8")) < 500 + line_length
+    lines = "".join(batches).splitlines()
+    assert lines == ['<http://example.com/{}> <http://example.com/p> "{}" .'.format(i, i) for i in range(100)]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_bytes, cached", [(100000, True), (2000, False)])
+async def test_streamed_output_is_cached_only_within_the_cache_size(tmp_path, monkeypatch, max_bytes, cached):
+    java = tmp_path / "java"
+    java.write_text(FAKE_MAPPER, encoding="utf-8")
+    java.chmod(java.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+    args = processor.TemplateArgs(reader=None, writer=AsyncMock(), mappingFile="mapping.rml.ttl",
+                                  streamBatchSize=500, cacheDir=str(tmp_path / "cache"), cacheMaxBytes=max_bytes)
+    proc = processor.RmlProcessor2Py(args)
+    proc.cache = MappingCache(args.cacheDir, args.cacheMaxBytes)
+    send = AsyncMock()
+
+    process = await proc.mapdata_streaming(send, "key")
+
+    assert process.returncode == 0
+    streamed = "".join(call.args[0] for call in send.await_args_list)
+    # past the cache size the output is not kept, so streaming memory stays bounded by the batches
+    assert proc.cache.get("key") == (streamed if cached else None)
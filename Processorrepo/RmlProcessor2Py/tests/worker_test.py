@@ -0,0 +1,125 @@
+import os
+import stat
+
+import pytest
+
+from RmlProcessor2Py.worker import MapperError, MapperWorker
+
+# answers every job as MapperWorker.java does: "OK|ERR <bytes> <millis>" and the body,
+# exits without answering a "crash" job once and a "fatal" job every time, never answers a "hang" job,
+# and counts its starts in starts.log
+FAKE_WORKER = """#!/usr/bin/env python3
+import os
+import sys
+import time
+here = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(here, "starts.log"), "a") as log:
+    log.write(sys.argv[-1] + "\\n")
+for line in sys.stdin:
+    path = line.rstrip("\\n")
+    if "fatal" in path:
+        sys.exit(1)
+    if "hang" in path:
+        time.sleep(60)
+    marker = os.path.join(here, "crashed")
+    if "crash" in path and not os.path.exists(marker):
+        open(marker, "w").close()
+        sys.exit(1)
+    if "bad" in path:
+        status, body = "ERR", "cannot read {}".format(path)
+    else:
+        status, body = "OK", "<http://example.com/{}> <http://example.com/p> \\"é\\" .\\n".format(os.path.basename(path))
+    data = body.encode("utf-8")
+    sys.stdout.write("{} {} 3\\n".format(status, len(data)))
+    sys.stdout.flush()
+    sys.stdout.buffer.write(data)
+    sys.stdout.buffer.flush()
+"""
+
+
+@pytest.fixture
+def fake_java(tmp_path, monkeypatch):
+    java = tmp_path / "java"
+    java.write_text(FAKE_WORKER, encoding="utf-8")
+    java.chmod(java.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+    return tmp_path
+
+
+def starts(tmp_path):
+    return (tmp_path / "starts.log").read_text(encoding="utf-8").splitlines()
+
+
+@pytest.mark.asyncio
+async def test_replies_are_read_by_their_byte_length(fake_java):
+    worker = MapperWorker("mapping.rml.ttl")
+    try:
+        # the body holds a non-ASCII character, its length is counted in bytes
+        assert await worker.map("/jobs/a.csv") == '<http://example.com/a.csv> <http://example.com/p> "é" .\n'
+        assert await worker.map("/jobs/b.csv") == '<http://example.com/b.csv> <http://example.com/p> "é" .\n'
+    finally:
+        await worker.close()
+    # one JVM for both jobs, started with the mapping
+    assert starts(fake_java) == ["mapping.rml.ttl"]
+
+
+@pytest.mark.asyncio
+async def test_error_reply_raises_and_the_worker_stays_up(fake_java):
+    worker = MapperWorker("mapping.rml.ttl")
+    try:
+        with pytest.raises(MapperError, match="cannot read /jobs/bad.csv"):
+            await worker.map("/jobs/bad.csv")
+        assert worker.alive()
+        assert await worker.map("/jobs/c.csv") == '<http://example.com/c.csv> <http://example.com/p> "é" .\n'
+    finally:
+        await worker.close()
+    assert len(starts(fake_java)) == 1
+
+
+@pytest.mark.asyncio
+async def test_crashed_worker_is_restarted_and_the_job_retried(fake_java):
+    worker = MapperWorker("mapping.rml.ttl")
+    try:
+        await worker.map("/jobs/a.csv")
+        # the worker exits without answering, the job is run again on a new one
+        assert await worker.map("/jobs/crash.csv") == '<http://example.com/crash.csv> <http://example.com/p> "é" .\n'
+        assert worker.alive()
+    finally:
+        await worker.close()
+    assert len(starts(fake_java)) == 2
+    assert not worker.alive()
+
+
+@pytest.mark.asyncio
+async def test_worker_dying_twice_is_a_mapper_error(fake_java):
+    worker = MapperWorker("mapping.rml.ttl")
+    try:
+        with pytest.raises(MapperError, match="died twice on /jobs/fatal.csv"):
+            await worker.map("/jobs/fatal.csv")
+        # the next job gets a new worker
+        assert await worker.map("/jobs/a.csv") == '<http://example.com/a.csv> <http://example.com/p> "é" .\n'
+    finally:
+        await worker.close()
+    assert len(starts(fake_java)) == 3
+
+
+@pytest.mark.asyncio
+async def test_hung_worker_is_killed_after_the_timeout(fake_java):
+    worker = MapperWorker("mapping.rml.ttl", timeout=0.5)
+    try:
+        with pytest.raises(MapperError, match="did not answer /jobs/hang.csv within 0.5 s"):
+            await worker.map("/jobs/hang.csv")
+        assert not worker.alive()
+        assert await worker.map("/jobs/a.csv") == '<http://example.com/a.csv> <http://example.com/p> "é" .\n'
+    finally:
+        await worker.close()
+    assert len(starts(fake_java)) == 2
+
+
+@pytest.mark.asyncio
+async def test_missing_java_is_a_mapper_error(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path))
+    worker = MapperWorker("mapping.rml.ttl")
+    with pytest.raises(MapperError, match="could not start the mapper worker"):
+        await worker.map("/jobs/a.csv")
+    await worker.close()
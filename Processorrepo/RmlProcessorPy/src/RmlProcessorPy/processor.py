@@ -6,6 +6,9 @@ import os
 import aiofiles
 from rdfc_runner import Processor, ProcessorArgs, Reader, Writer
 import subprocess
+from rdflib import Graph, URIRef
+from .cache import MappingCache
+from .streaming import stream_mapper
 
 # --- Type Definitions ---
 @dataclass
@@ -13,6 +16,9 @@ class TemplateArgs(ProcessorArgs):
     reader: Reader
     writer: Writer
     mappingFile: str
+    cacheDir: str = ""
+    cacheMaxBytes: int = 256 * 1024 * 1024
+    streamBatchSize: int = 0
 
 
 # --- Processor Implementation ---
@@ -21,12 +27,15 @@ class RmlProcessorPy(Processor[TemplateArgs]):
 
     def __init__(self, args: TemplateArgs):
         super().__init__(args)
+        self.cache: MappingCache | None = None
         self.logger.debug(msg="Created TemplateProcessor with args: {}".format(args))
 
     async def init(self) -> None:
         """This is the first function that is called (and awaited) when creating a processor.
         This is the perfect location to start things like database connections."""
         self.logger.debug("Initializing RmlProcessorPy with args: {}", self.args)
+        if self.args.cacheDir:
+            self.cache = MappingCache(self.args.cacheDir, self.args.cacheMaxBytes)
 
     async def transform(self) -> None:
 
@@ -42,20 +51,33 @@ class RmlProcessorPy(Processor[TemplateArgs]):
         #     if self.args.writer:
         #         await self.args.writer.string(file_output)
         
-        command = ["java", "-jar", "rmlmapper.jar", "-m", self.args.mappingFile, "-o", "temp.ttl"]
-        process = await asyncio.create_subprocess_exec(
-        *command,
-        stdout=asyncio.subprocess.PIPE,
-        stderr=asyncio.subprocess.PIPE
-    )
-        stdout, stderr = await process.communicate()
-        file_output = ''
+        cache_key = self.cache_key() if self.cache else None
+        file_output = self.cache.get(cache_key) if cache_key else None
 
-        if process.returncode == 0:
-        # Async file read (better in async functions)
-            async with aiofiles.open('temp.ttl', 'r') as f:
-                file_output = await f.read()
-        if self.args.writer:
+        if file_output is None and self.args.streamBatchSize > 0:
+            # forward the triples while the mapper is still producing them
+            if not await self.stream_mapping(cache_key):
+                # a failing mapper is still answered with an empty string, as without streaming
+                file_output = ''
+        elif file_output is None:
+            command = ["java", "-jar", "rmlmapper.jar", "-m", self.args.mappingFile, "-o", "temp.ttl"]
+            process = await asyncio.create_subprocess_exec(
+            *command,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+            stdout, stderr = await process.communicate()
+            file_output = ''
+
+            if process.returncode == 0:
+            # Async file read (better in async functions)
+                async with aiofiles.open('temp.ttl', 'r') as f:
+                    file_output = await f.read()
+                if cache_key:
+                    self.cache.put(cache_key, file_output)
+        if self.cache:
+            self.cache.log_stats()
+        if self.args.writer and file_output is not None:
             await self.args.writer.string(file_output)
 
         # Close the writer after processing all messages
@@ -66,4 +88,36 @@ class RmlProcessorPy(Processor[TemplateArgs]):
     async def produce(self) -> None:
         """Function to start the production of data, starting the pipeline.
         This function is called after all processors are completely set up."""
-        pass
\ No newline at end of file
+        pass
+
+    async def stream_mapping(self, cache_key=None) -> bool:
+        # forward the batches while the mapper runs, the output is cached when it fits in the cache
+        command = ["java", "-jar", "rmlmapper.jar", "-m", self.args.mappingFile]
+        process, output = await stream_mapper(command, self.send_batch, self.args.streamBatchSize,
+                                              self.cache.max_bytes if cache_key else 0)
+        if process.returncode != 0:
+            self.logger.error("rmlmapper exited with code {}".format(process.returncode))
+            return False
+        if output is not None:
+            self.cache.put(cache_key, output)
+        return True
+
+    async def send_batch(self, text) -> None:
+        if self.args.writer:
+            await self.args.writer.string(text)
+
+    def cache_key(self) -> str | None:
+        """Hash of the mapping file and every local file it reads, None if a source is not a local file."""
+        with open(self.args.mappingFile, "rb") as f:
+            parts = [f.read()]
+        graph = Graph()
+        graph.parse(self.args.mappingFile, format="turtle")
+        sources = sorted(str(o) for o in graph.objects(None, URIRef("http://semweb.mmlab.be/ns/rml#source")))
+        for source in sources:
+            if not os.path.isfile(source):
+                self.logger.debug("Not caching, source {} is not a local file".format(source))
+                return None
+            with open(source, "rb") as f:
+                parts.append(source.encode("utf-8"))
+                parts.append(f.read())
+        return MappingCache.key(*parts)
@@ -0,0 +1,54 @@
+import asyncio
+import subprocess
+from logging import getLogger, Logger
+
+# longest single N-Quads line accepted from the mapper's stdout
+STREAM_LINE_LIMIT = 16 * 1024 * 1024
+
+logger: Logger = getLogger('rdfc.MapperStream')
+
+
+async def stream_mapper(command, send, batch_size: int, keep_bytes: int = 0):
+    """Run the mapper and send its stdout on in batches of complete lines of at least batch_size bytes.
+
+    Without -o rmlmapper writes N-Quads to stdout, one complete statement per line. The output is also
+    kept, to be cached, while it stays within keep_bytes: past that it is dropped, so memory stays bounded
+    by the batch size. Returns the CompletedProcess and the kept output, or None when nothing was kept."""
+    process = await asyncio.create_subprocess_exec(
+        *command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        limit=STREAM_LINE_LIMIT
+    )
+    stderr_task = asyncio.create_task(process.stderr.read())
+    batch: list[bytes] = []
+    batch_size_now = 0
+    kept: list[bytes] | None = [] if keep_bytes > 0 else None
+    kept_size = 0
+    async for line in process.stdout:
+        batch.append(line)
+        batch_size_now += len(line)
+        if batch_size_now >= batch_size:
+            await send(b"".join(batch).decode("utf-8"))
+            if kept is not None:
+                kept_size += batch_size_now
+                kept = keep(kept, batch, kept_size, keep_bytes)
+            batch = []
+            batch_size_now = 0
+    if batch:
+        await send(b"".join(batch).decode("utf-8"))
+        if kept is not None:
+            kept_size += batch_size_now
+            kept = keep(kept, batch, kept_size, keep_bytes)
+    await process.wait()
+    stderr = await stderr_task
+    output = b"".join(kept).decode("utf-8") if kept is not None and process.returncode == 0 else None
+    return subprocess.CompletedProcess(command, process.returncode, None, stderr), output
+
+
+def keep(kept, batch, kept_size, keep_bytes):
+    if kept_size > keep_bytes:
+        logger.debug("Not keeping the streamed output for the cache, it is larger than {} bytes".format(keep_bytes))
+        return None
+    kept.extend(batch)
+    return kept
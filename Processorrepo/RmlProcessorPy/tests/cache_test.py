@@ -0,0 +1,104 @@
+import os
+import stat
+import time
+from unittest.mock import AsyncMock
+
+import pytest
+
+import RmlProcessorPy.processor as processor
+from RmlProcessorPy.cache import MappingCache
+
+# writes one triple to the file after -o and counts its runs in runs.log
+FAKE_MAPPER = """#!/usr/bin/env python3
+import os
+import sys
+here = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(here, "runs.log"), "a") as log:
+    log.write("run\\n")
+with open(sys.argv[sys.argv.index("-o") + 1], "w") as out:
+    out.write("<http://example.com/s> <http://example.com/p> <http://example.com/o> .\\n")
+"""
+
+
+def test_cache_hits_and_misses(tmp_path):
+    cache = MappingCache(str(tmp_path), max_bytes=1024)
+    key = MappingCache.key(b"mapping", b"a,b\n1,2\n")
+
+    assert cache.get(key) is None
+    cache.put(key, "<a> <b> <c> .\n")
+    assert cache.get(key) == "<a> <b> <c> .\n"
+    assert (cache.hits, cache.misses) == (1, 1)
+    # entries survive a restart
+    assert MappingCache(str(tmp_path), max_bytes=1024).get(key) == "<a> <b> <c> .\n"
+
+
+def test_cache_evicts_least_recently_used(tmp_path):
+    cache = MappingCache(str(tmp_path), max_bytes=250)
+    keys = [MappingCache.key(str(i).encode()) for i in range(3)]
+    for i, key in enumerate(keys[:2]):
+        cache.put(key, "x" * 100)
+        os.utime(tmp_path / (key + ".nq"), (time.time() - 100 + i, time.time() - 100 + i))
+
+    # reading the oldest entry makes the other one least recently used
+    assert cache.get(keys[0]) is not None
+    cache.put(keys[2], "x" * 100)
+
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.total_bytes <= 250
+
+
+def mapping(tmp_path, source):
+    path = tmp_path / "mapping.rml.ttl"
+    path.write_text("""
+@prefix rml: <http://semweb.mmlab.be/ns/rml#> .
+<http://example.com/#Map> rml:logicalSource [ rml:source "{}" ] .
+""".format(source), encoding="utf-8")
+    return str(path)
+
+
+async def run(tmp_path, mapping_file):
+    writer = AsyncMock()
+    args = processor.TemplateArgs(reader=None, writer=writer, mappingFile=mapping_file,
+                                  cacheDir=str(tmp_path / "cache"))
+    proc = processor.RmlProcessorPy(args)
+    await proc.init()
+    await proc.transform()
+    return [call.args[0] for call in writer.string.await_args_list]
+
+
+@pytest.fixture
+def fake_java(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    java = bin_dir / "java"
+    java.write_text(FAKE_MAPPER, encoding="utf-8")
+    java.chmod(java.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(bin_dir) + os.pathsep + os.environ["PATH"])
+    monkeypatch.chdir(tmp_path)
+    return bin_dir / "runs.log"
+
+
+@pytest.mark.asyncio
+async def test_unchanged_mapping_and_sources_are_not_mapped_again(tmp_path, fake_java):
+    source = tmp_path / "data.csv"
+    source.write_text("a,b\n1,2\n", encoding="utf-8")
+    mapping_file = mapping(tmp_path, source)
+
+    first = await run(tmp_path, mapping_file)
+    second = await run(tmp_path, mapping_file)
+    assert first == second == ["<http://example.com/s> <http://example.com/p> <http://example.com/o> .\n"]
+    assert fake_java.read_text().count("run") == 1
+
+    # a changed source is a new key
+    source.write_text("a,b\n1,3\n", encoding="utf-8")
+    await run(tmp_path, mapping_file)
+    assert fake_java.read_text().count("run") == 2
+
+
+@pytest.mark.asyncio
+async def test_remote_sources_are_not_cached(tmp_path, fake_java):
+    mapping_file = mapping(tmp_path, "http://example.com/data.csv")
+    await run(tmp_path, mapping_file)
+    await run(tmp_path, mapping_file)
+    assert fake_java.read_text().count("run") == 2
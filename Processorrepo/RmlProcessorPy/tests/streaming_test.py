@@ -0,0 +1,69 @@
+import os
+import stat
+from unittest.mock import AsyncMock
+
+import pytest
+
+import RmlProcessorPy.processor as processor
+from RmlProcessorPy.cache import MappingCache
+
+FAKE_MAPPER = """#!/usr/bin/env python3
+import sys
+for i in range(100):
+    sys.stdout.write('<http://example.com/{}> <http://example.com/p> "{}" .\\n'.format(i, i))
+sys.exit(int(sys.argv[-1] == "failing.rml.ttl"))
+"""
+
+
+@pytest.fixture(autouse=True)
+def fake_java(tmp_path, monkeypatch):
+    java = tmp_path / "java"
+    java.write_text(FAKE_MAPPER, encoding="utf-8")
+    java.chmod(java.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", str(tmp_path) + os.pathsep + os.environ["PATH"])
+
+
+@pytest.mark.asyncio
+async def test_streaming_forwards_bounded_batches_of_complete_lines():
+    writer = AsyncMock()
+    args = processor.TemplateArgs(reader=None, writer=writer, mappingFile="mapping.rml.ttl", streamBatchSize=500)
+    proc = processor.RmlProcessorPy(args)
+    await proc.init()
+    await proc.transform()
+
+    batches = [call.args[0] for call in writer.string.await_args_list]
+    assert len(batches) > 1
+    line_length = max(len(line) + 1 for batch in batches for line in batch.splitlines())
+    for batch in batches:
+        assert batch.endswith(" .\n")
+        assert len(batch.encode("utf-8")) < 500 + line_length
+    lines = "".join(batches).splitlines()
+    assert lines == ['<http://example.com/{}> <http://example.com/p> "{}" .'.format(i, i) for i in range(100)]
+    writer.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_failing_mapper_still_writes_an_empty_string():
+    writer = AsyncMock()
+    args = processor.TemplateArgs(reader=None, writer=writer, mappingFile="failing.rml.ttl", streamBatchSize=100000)
+    proc = processor.RmlProcessorPy(args)
+    await proc.init()
+    await proc.transform()
+
+    # the output came in one batch, then the exit code tells it failed
+    assert [call.args[0] for call in writer.string.await_args_list][-1] == ''
+    writer.close.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("max_bytes, cached", [(100000, True), (2000, False)])
+async def test_streamed_output_is_cached_only_within_the_cache_size(tmp_path, max_bytes, cached):
+    writer = AsyncMock()
+    args = processor.TemplateArgs(reader=None, writer=writer, mappingFile="mapping.rml.ttl", streamBatchSize=500,
+                                  cacheDir=str(tmp_path / "cache"), cacheMaxBytes=max_bytes)
+    proc = processor.RmlProcessorPy(args)
+    proc.cache = MappingCache(args.cacheDir, args.cacheMaxBytes)
+
+    assert await proc.stream_mapping("key")
+    streamed = "".join(call.args[0] for call in writer.string.await_args_list)
+    assert proc.cache.get("key") == (streamed if cached else None)
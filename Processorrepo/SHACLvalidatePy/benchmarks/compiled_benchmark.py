@@ -0,0 +1,66 @@
+"""Times pyshacl and the compiled validator on RDF built from sample_data.csv with the NewMapping.rml.ttl terms.
+
+Run from the pipeline directory, e.g.
+    python ../Processorrepo/SHACLvalidatePy/benchmarks/compiled_benchmark.py --copies 1
+"""
+import argparse
+import csv
+import time
+from urllib.parse import quote
+
+from pyshacl import validate
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF, XSD
+
+from SHACLvalidatePy.compiled import compile_shapes
+
+SOSA = Namespace("http://www.w3.org/ns/sosa/")
+
+
+def build_graph(csv_path, copies):
+    graph = Graph()
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for copy in range(copies):
+        for row in rows:
+            subject = URIRef("http://example.com/reading_{}_{}".format(
+                quote(row["ts_id"], safe=""), quote(row["Timestamp"] + ("_{}".format(copy) if copy else ""), safe="")))
+            graph.add((subject, RDF.type, SOSA.Observation))
+            graph.add((subject, SOSA.madeBySensor, Literal(row["ts_id"])))
+            if row["Value"]:
+                graph.add((subject, SOSA.hasSimpleResult, Literal(row["Value"], datatype=XSD.double)))
+            graph.add((subject, SOSA.observedProperty, Literal(row["stationparameter_longname"])))
+            graph.add((subject, SOSA.resultTime, Literal(row["Timestamp"], datatype=XSD.dateTime)))
+    return graph
+
+
+def main():
+    data = build_graph(ARGS.csv, ARGS.copies)
+    shapes = Graph().parse(ARGS.shapes, format="turtle")
+    print("{} triples".format(len(data)))
+
+    start = time.perf_counter()
+    expected = validate(data, shacl_graph=shapes, inference='rdfs', abort_on_error=False, meta_shacl=False, debug=False)
+    pyshacl_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    compiled = compile_shapes(shapes)
+    compile_time = time.perf_counter() - start
+    start = time.perf_counter()
+    assert compiled.applicable(data)
+    result = compiled.validate(data)
+    compiled_time = time.perf_counter() - start
+
+    assert result[0] == expected[0] and result[2] == expected[2]
+    print("pyshacl:  {:8.3f} s  conforms={}".format(pyshacl_time, expected[0]))
+    print("compiled: {:8.3f} s  (+{:.4f} s compile)  speedup {:.1f}x".format(
+        compiled_time, compile_time, pyshacl_time / compiled_time))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="./WFresources/sample_data.csv")
+    parser.add_argument("--shapes", default="./WFresources/shape.ttl")
+    parser.add_argument("--copies", type=int, default=1)
+    ARGS = parser.parse_args()
+    main()
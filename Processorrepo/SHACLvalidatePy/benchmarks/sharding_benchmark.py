@@ -0,0 +1,57 @@
+"""Times SHACLvalidatePy validation of sample_data.csv-derived RDF for 1..N shards.
+
+Run from the pipeline directory, e.g.
+    python ../Processorrepo/SHACLvalidatePy/benchmarks/sharding_benchmark.py --copies 4 --max-shards 8 --pyshacl
+"""
+import argparse
+import asyncio
+import time
+
+import SHACLvalidatePy.processor as processor
+from compiled_benchmark import build_graph
+
+
+async def run(data, shards):
+    args = processor.TemplateArgs(datareader=None, datawriter=None, loc=ARGS.shapes, shaclwriter=None, shards=shards)
+    proc = processor.SHACLvalidatePy(args)
+    await proc.init()
+    if ARGS.pyshacl:
+        proc.shutdown_pool()
+        proc.compiled = None
+        if shards > 1:
+            proc.start_pool()
+    if proc.pool:
+        # start the worker processes before timing
+        await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(proc.pool, time.sleep, 0.1)
+                               for _ in range(shards)))
+    start = time.perf_counter()
+    conforms, _, report_text = await proc.validate_graph(data)
+    elapsed = time.perf_counter() - start
+    proc.shutdown_pool()
+    return elapsed, conforms, report_text
+
+
+def main():
+    data = build_graph(ARGS.csv, ARGS.copies)
+    print("{} triples".format(len(data)))
+    baseline = None
+    expected = None
+    shards = 1
+    while shards <= ARGS.max_shards:
+        elapsed, conforms, report_text = asyncio.run(run(data, shards))
+        baseline = baseline or elapsed
+        expected = expected or report_text
+        assert report_text == expected
+        print("{:>3} shards: {:8.2f} s  conforms={}  speedup {:.2f}x".format(shards, elapsed, conforms, baseline / elapsed))
+        shards *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--csv", default="./WFresources/sample_data.csv")
+    parser.add_argument("--shapes", default="./WFresources/shape.ttl")
+    parser.add_argument("--copies", type=int, default=1)
+    parser.add_argument("--max-shards", type=int, default=8)
+    parser.add_argument("--pyshacl", action="store_true", help="validate the shards with pyshacl instead of the compiled checker")
+    ARGS = parser.parse_args()
+    main()
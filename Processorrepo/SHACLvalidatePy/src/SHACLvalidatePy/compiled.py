@@ -0,0 +1,257 @@
+from datetime import date, datetime, time
+from decimal import Decimal
+from logging import getLogger, Logger
+
+from pyshacl.rdfutil import stringify_node
+from pyshacl.validator import Validator
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import OWL, RDF, RDFS, XSD
+
+from .shapes import SH
+
+# everything a compiled node shape may say, anything else in the sh: namespace goes to pyshacl
+NODE_SHAPE_KEYS = {RDF.type, SH.targetClass, SH.targetNode, SH.property, SH.name, SH.description,
+                   RDFS.label, RDFS.comment}
+PROPERTY_SHAPE_KEYS = {RDF.type, SH.path, SH.minCount, SH.maxCount, SH.datatype, SH.severity, SH.message,
+                       SH.name, SH.description, SH.order, SH.group, RDFS.label, RDFS.comment}
+# with inference on, triples using these predicates in the data graph change which nodes are targeted
+SCHEMA_PREDICATES = (RDFS.subClassOf, RDFS.subPropertyOf, RDFS.domain, RDFS.range)
+# paths that RDFS inference adds values for on its own
+INFERRED_PATHS = {RDF.type, RDFS.member, *SCHEMA_PREDICATES}
+
+MIN_COUNT = SH.MinCountConstraintComponent
+MAX_COUNT = SH.MaxCountConstraintComponent
+DATATYPE = SH.DatatypeConstraintComponent
+
+
+class UnsupportedShapes(Exception):
+    """The shapes graph uses SHACL features the compiled validator does not implement."""
+
+
+class PropertyCheck:
+    def __init__(self, node_shape, shape, path, min_count, max_count, datatype, severity, messages):
+        self.node_shape = node_shape
+        self.shape = shape
+        self.path = path
+        self.min_count = min_count
+        self.max_count = max_count
+        self.datatype = datatype
+        self.severity = severity
+        self.messages = messages
+
+
+class CompiledShapes:
+    """Single-pass validator for node shapes with sh:targetClass / sh:targetNode whose property shapes
+    use sh:minCount, sh:maxCount and sh:datatype on plain predicate paths.
+
+    One scan over the data graph collects the targeted nodes, counts the values per (subject, path) and
+    checks every value against the datatype of its path. Results and report text are built the way
+    pyshacl builds them, so the output of validate() can be used in place of pyshacl.validate()."""
+    logger: Logger = getLogger('rdfc.CompiledShapes')
+
+    def __init__(self, shapes: Graph, checks: list[PropertyCheck], targets: dict, target_nodes: dict,
+                 inference: str = "rdfs"):
+        self.shapes = shapes
+        self.inference = inference
+        self.checks = checks
+        # node shape -> target classes / explicit target nodes
+        self.targets = targets
+        self.target_nodes = target_nodes
+        self.target_classes = {c for classes in targets.values() for c in classes}
+        self.by_path: dict[URIRef, list[int]] = {}
+        for index, check in enumerate(checks):
+            self.by_path.setdefault(check.path, []).append(index)
+        self.sg = _ShapesGraph(shapes)
+
+    def applicable(self, data: Graph) -> bool:
+        # RDFS inference only adds triples that matter here when the data carries its own schema,
+        # without inference SHACL still counts instances of sub-classes as instances of the target class
+        predicates = (RDFS.subClassOf,) if self.inference == "none" else SCHEMA_PREDICATES
+        return not any((None, predicate, None) in data for predicate in predicates)
+
+    def validate(self, data: Graph):
+        """Returns (conforms, report graph, report text), or None when only pyshacl can produce the report."""
+        focus: dict[URIRef, set] = {c: set() for c in self.target_classes}
+        counts: dict[tuple, int] = {}
+        bad_values: dict[tuple, list] = {}
+        for s, p, o in data:
+            if p == RDF.type and o in focus:
+                focus[o].add(s)
+            checks = self.by_path.get(p)
+            if checks is None:
+                continue
+            counts[(s, p)] = counts.get((s, p), 0) + 1
+            for index in checks:
+                datatype = self.checks[index].datatype
+                if datatype is not None and not datatype_matches(o, datatype):
+                    bad_values.setdefault((index, s), []).append(o)
+
+        violations = []
+        for index, check in enumerate(self.checks):
+            nodes = set(self.target_nodes.get(check.node_shape, ()))
+            for target_class in self.targets.get(check.node_shape, ()):
+                nodes |= focus[target_class]
+            for node in nodes:
+                count = counts.get((node, check.path), 0)
+                if check.min_count is not None and count < check.min_count:
+                    violations.append((check, MIN_COUNT, node, None))
+                if check.max_count is not None and count > check.max_count:
+                    violations.append((check, MAX_COUNT, node, None))
+                for value in bad_values.get((index, node), ()):
+                    violations.append((check, DATATYPE, node, value))
+
+        if self.inference != "none" and any(
+                isinstance(node, BNode) or isinstance(value, BNode) for _, _, node, value in violations):
+            # blank nodes are reported with their triples, which include the ones inferred by pyshacl
+            return None
+        results = [self.result(data, *violation) for violation in violations]
+        # like pyshacl without allow_warnings, results of any severity make the data non-conformant
+        conforms = not results
+        report_graph, report_text = Validator.create_validation_report(self.sg, conforms, results)
+        return conforms, report_graph, report_text
+
+    def result(self, data, check, component, focus_node, value_node):
+        sg = self.shapes
+        r_node = BNode()
+        r_triples = [
+            (r_node, RDF.type, SH.ValidationResult),
+            (r_node, SH.sourceConstraintComponent, (sg, component)),
+            (r_node, SH.sourceShape, (sg, check.shape)),
+            (r_node, SH.resultSeverity, check.severity),
+            (r_node, SH.focusNode, (data, focus_node)),
+        ]
+        if value_node is not None:
+            r_triples.append((r_node, SH.value, (data, value_node)))
+        r_triples.append((r_node, SH.resultPath, (sg, check.path)))
+        messages = check.messages or [Literal(self.generic_message(data, check, component, focus_node))]
+        for message in messages:
+            r_triples.append((r_node, SH.resultMessage, message))
+
+        desc = "{} in {} ({}):\n\tSeverity: {}\n\tSource Shape: {}\n\tFocus Node: {}\n".format(
+            "Constraint Violation" if check.severity == SH.Violation else "Validation Result",
+            component[len(SH):], str(component), stringify_node(sg, check.severity),
+            stringify_node(sg, check.shape), stringify_node(data, focus_node))
+        if value_node is not None:
+            desc += "\tValue Node: {}\n".format(stringify_node(data, value_node))
+        desc += "\tResult Path: {}\n".format(stringify_node(sg, check.path))
+        for message in sorted(messages, key=str):
+            desc += "\tMessage: {}\n".format(str(message.value) if isinstance(message, Literal) else str(message))
+        return desc, r_node, r_triples
+
+    def generic_message(self, data, check, component, focus_node) -> str:
+        path = stringify_node(self.shapes, check.path)
+        if component == MIN_COUNT:
+            return "Less than {} values on {}->{}".format(check.min_count, stringify_node(data, focus_node), path)
+        if component == MAX_COUNT:
+            return "More than {} values on {}->{}".format(check.max_count, stringify_node(data, focus_node), path)
+        return "Value is not Literal with datatype {}".format(stringify_node(self.shapes, check.datatype))
+
+
+class _ShapesGraph:
+    # create_validation_report only reads the graph of the shapes graph wrapper
+    def __init__(self, graph: Graph):
+        self.graph = graph
+
+
+def compile_shapes(shapes: Graph, inference: str = "rdfs") -> CompiledShapes:
+    """Compile for validation with pyshacl's inference option "none" or "rdfs"."""
+    if inference not in ("none", "rdfs"):
+        raise UnsupportedShapes("inference {} is not supported".format(inference))
+    property_shapes = set(shapes.objects(None, SH.property))
+    node_shapes = set(shapes.subjects(RDF.type, SH.NodeShape)) | set(shapes.subjects(SH.property, None))
+    node_shapes |= set(shapes.subjects(SH.targetClass, None)) | set(shapes.subjects(SH.targetNode, None))
+    for s, p, _ in shapes:
+        if str(p).startswith(str(SH)) and s not in node_shapes and s not in property_shapes:
+            raise UnsupportedShapes("shape {} is not attached to a node shape".format(s))
+
+    checks = []
+    targets = {}
+    target_nodes = {}
+    for node_shape in node_shapes:
+        if node_shape in property_shapes:
+            raise UnsupportedShapes("{} is used as node and property shape".format(node_shape))
+        unsupported_keys(shapes, node_shape, NODE_SHAPE_KEYS)
+        if {RDFS.Class, OWL.Class} & set(shapes.objects(node_shape, RDF.type)):
+            raise UnsupportedShapes("implicit class target on {}".format(node_shape))
+        classes = set(shapes.objects(node_shape, SH.targetClass))
+        for target_class in classes:
+            if inference == "rdfs" and str(target_class).startswith((str(RDF), str(RDFS))):
+                raise UnsupportedShapes("target class {} is affected by inference".format(target_class))
+        targets[node_shape] = classes
+        target_nodes[node_shape] = set(shapes.objects(node_shape, SH.targetNode))
+        for property_shape in shapes.objects(node_shape, SH.property):
+            checks.append(compile_property(shapes, node_shape, property_shape, inference))
+    return CompiledShapes(shapes, checks, targets, target_nodes, inference)
+
+
+def compile_property(shapes: Graph, node_shape, shape, inference) -> PropertyCheck:
+    unsupported_keys(shapes, shape, PROPERTY_SHAPE_KEYS)
+    path = single(shapes, shape, SH.path)
+    if not isinstance(path, URIRef):
+        raise UnsupportedShapes("path of {} is not a predicate".format(shape))
+    if inference == "rdfs" and path in INFERRED_PATHS:
+        raise UnsupportedShapes("path {} is affected by inference".format(path))
+    min_count = single(shapes, shape, SH.minCount)
+    max_count = single(shapes, shape, SH.maxCount)
+    for count in (min_count, max_count):
+        if count is not None and not (isinstance(count, Literal) and isinstance(count.value, int)):
+            raise UnsupportedShapes("count on {} is not an integer".format(shape))
+    return PropertyCheck(
+        node_shape, shape, path,
+        None if min_count is None else min_count.value,
+        None if max_count is None else max_count.value,
+        single(shapes, shape, SH.datatype),
+        single(shapes, shape, SH.severity) or SH.Violation,
+        list(set(shapes.objects(shape, SH.message))),
+    )
+
+
+def unsupported_keys(shapes: Graph, shape, supported) -> None:
+    for predicate in set(shapes.predicates(shape, None)):
+        if predicate not in supported:
+            raise UnsupportedShapes("{} on {} is not supported".format(predicate, shape))
+
+
+def single(shapes: Graph, shape, predicate):
+    values = list(shapes.objects(shape, predicate))
+    if len(values) > 1:
+        raise UnsupportedShapes("{} has more than one {}".format(shape, predicate))
+    return values[0] if values else None
+
+
+def datatype_matches(value, datatype) -> bool:
+    # the sh:datatype rules of pyshacl's DatatypeConstraintComponent
+    if not isinstance(value, Literal):
+        return False
+    if value.datatype == datatype:
+        return getattr(value, "ill_typed", None) is not True and lexical_matches(value, datatype)
+    if datatype == RDFS.Literal:
+        return True
+    if datatype == RDFS.Datatype and value.datatype:
+        return True
+    if value.datatype is None and value.language is None and datatype == XSD.string:
+        return lexical_matches(value, datatype)
+    if datatype == RDF.langString and value.language:
+        return lexical_matches(value, datatype)
+    return False
+
+
+def lexical_matches(value: Literal, datatype) -> bool:
+    python_value = value.value
+    if datatype in (XSD.string, RDF.langString):
+        return isinstance(python_value, (str, bytes))
+    if datatype == XSD.integer:
+        return isinstance(python_value, int)
+    if datatype == XSD.float:
+        return isinstance(python_value, float)
+    if datatype == XSD.decimal:
+        return isinstance(python_value, Decimal)
+    if datatype == XSD.boolean:
+        return isinstance(python_value, bool)
+    if datatype == XSD.date:
+        return isinstance(python_value, date)
+    if datatype == XSD.time:
+        return isinstance(python_value, time)
+    if datatype == XSD.dateTime:
+        return isinstance(python_value, datetime)
+    return True
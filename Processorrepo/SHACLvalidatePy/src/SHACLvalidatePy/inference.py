@@ -0,0 +1,64 @@
+from logging import getLogger, Logger
+
+from rdflib import Graph, Literal
+from rdflib.namespace import RDF, RDFS
+
+SCHEMA_PREDICATES = (RDFS.subClassOf, RDFS.subPropertyOf, RDFS.domain, RDFS.range)
+
+
+class IncrementalRDFS:
+    """Keeps a graph closed under the RDFS rules that derive instance data: rdfs2 (domain), rdfs3 (range),
+    rdfs5/rdfs7 (sub-properties) and rdfs9/rdfs11 (sub-classes).
+
+    Only the consequences of newly added triples are derived, so the cost per message follows the
+    message size. A new schema triple can change what earlier data entails, in that case the whole
+    graph is chained again. The RDFS axiomatic triples (rdfs:Resource, rdf:Property, ...) are not added."""
+    logger: Logger = getLogger('rdfc.IncrementalRDFS')
+
+    def __init__(self, graph: Graph):
+        self.graph = graph
+        self.load_schema()
+
+    def load_schema(self) -> None:
+        self.super_classes = self.index(RDFS.subClassOf)
+        self.super_properties = self.index(RDFS.subPropertyOf)
+        self.domains = self.index(RDFS.domain)
+        self.ranges = self.index(RDFS.range)
+
+    def index(self, predicate) -> dict:
+        index: dict = {}
+        for s, o in self.graph.subject_objects(predicate):
+            index.setdefault(s, set()).add(o)
+        return index
+
+    def add(self, triples) -> list:
+        """Add the triples to the graph and return the triples inferred from them."""
+        new = [triple for triple in triples if triple not in self.graph]
+        for triple in new:
+            self.graph.add(triple)
+        if any(p in SCHEMA_PREDICATES for _, p, _ in new):
+            self.load_schema()
+            self.logger.debug("Schema changed, chaining the whole graph again")
+            return self.chain(list(self.graph))
+        return self.chain(new)
+
+    def chain(self, agenda: list) -> list:
+        inferred = []
+        while agenda:
+            s, p, o = agenda.pop()
+            derived = [(s, sp, o) for sp in self.super_properties.get(p, ())]
+            derived.extend((s, RDF.type, c) for c in self.domains.get(p, ()))
+            if not isinstance(o, Literal):
+                derived.extend((o, RDF.type, c) for c in self.ranges.get(p, ()))
+            if p == RDF.type:
+                derived.extend((s, RDF.type, c) for c in self.super_classes.get(o, ()))
+            elif p == RDFS.subClassOf:
+                derived.extend((s, RDFS.subClassOf, c) for c in self.super_classes.get(o, ()))
+            elif p == RDFS.subPropertyOf:
+                derived.extend((s, RDFS.subPropertyOf, sp) for sp in self.super_properties.get(o, ()))
+            for triple in derived:
+                if triple not in self.graph:
+                    self.graph.add(triple)
+                    inferred.append(triple)
+                    agenda.append(triple)
+        return inferred
@@ -2,11 +2,20 @@ import logging
 from dataclasses import dataclass
 from logging import getLogger, Logger
 import aiofiles
+import asyncio
+import time
+import zlib
+from contextlib import contextmanager
+from concurrent.futures import ProcessPoolExecutor
 
 from rdfc_runner import Processor, ProcessorArgs, Reader, Writer
 
-from rdflib import Graph
-from pyshacl import validate
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import OWL, RDF
+from .shapes import SH, ShapesValidator, focus_local
+from .compiled import SCHEMA_PREDICATES, CompiledShapes, UnsupportedShapes, compile_shapes
+from .inference import IncrementalRDFS
+from .report import ReportSummary, format_summary, format_total, to_json_line
 
 # --- Type Definitions ---
 @dataclass
@@ -15,6 +24,53 @@ class TemplateArgs(ProcessorArgs):
     datawriter: Writer
     loc: str
     shaclwriter: Writer
+    incremental: bool = False
+    shards: int = 1
+    inference: str = "rdfs"
+    incrementalInference: bool = False
+    reportFormat: str = "text"
+    reportSamples: int = 10
+
+
+PHASES = ("parse", "inference", "validation", "serialization")
+
+
+def validate_data(datagraph, validator, compiled, **options):
+    if compiled and not options and compiled.applicable(datagraph):
+        result = compiled.validate(datagraph)
+        if result is not None:
+            return result
+    return validator.validate(datagraph, **options)
+
+
+def is_schema(predicate) -> bool:
+    # schema triples in the data decide which nodes are targeted, for other subjects than their own
+    return predicate in SCHEMA_PREDICATES or predicate.startswith(OWL)
+
+
+def carries_schema(datagraph) -> bool:
+    return any(is_schema(predicate) for predicate in datagraph.predicates(unique=True))
+
+
+# shapes loaded once in every process of the pool
+_worker_shapes = None
+
+
+def _init_worker(shapes, compiled, inference):
+    # the shapes graph is passed as is, its blank nodes keep the same ids in every worker
+    global _worker_shapes
+    _worker_shapes = (ShapesValidator(shapes, inference), compiled)
+
+
+def _validate_shard(triples, namespaces):
+    shard = Graph()
+    # the report names nodes with the prefixes of the data
+    for prefix, namespace in namespaces:
+        shard.bind(prefix, namespace)
+    for triple in triples:
+        shard.add(triple)
+    conforms, report_graph, report_text = validate_data(shard, *_worker_shapes)
+    return conforms, report_graph.serialize(format="nt"), report_text
 
 
 # --- Processor Implementation ---
@@ -25,31 +81,238 @@ class SHACLvalidatePy(Processor[TemplateArgs]):
         super().__init__(args)
         self.logger.debug(msg="Created TemplateProcessor with args: {}".format(args))
         self.shaclfile: Graph | None = None 
+        self.compiled: CompiledShapes | None = None
+        self.validator: ShapesValidator | None = None
+        self.summary: ReportSummary | None = None
+        self.pool: ProcessPoolExecutor | None = None
+        # without the incremental closure, the schema triples received so far go into every context graph
+        self.schema = Graph()
+        self.timings = dict.fromkeys(PHASES, 0.0)
+        # on request the RDFS entailments are kept up to date per message and pyshacl validates without inference.
+        # The closure leaves out the RDFS axiomatic triples, so shapes on rdfs:Resource or rdf:Property
+        # can report differently than pyshacl's own RDFS inference
+        self.pre_inference = self.args.inference == "rdfs" and self.args.incrementalInference
+        self.validation_inference = "none" if self.pre_inference else self.args.inference
 
     async def init(self) -> None:
         self.logger.debug("Initializing TemplaSHACLvalidatePy Processor with args: {}", self.args)
         async with aiofiles.open(self.args.loc, mode='r') as f:
             ttl_data = await f.read()
-        g = Graph()
-        g.parse(data=ttl_data, format='ttl')
+        with self.timed("parse"):
+            g = Graph()
+            g.parse(data=ttl_data, format='ttl')
         self.shaclfile = g
+        # the shapes are analysed once, not by every pyshacl run
+        self.validator = ShapesValidator(g, self.validation_inference)
+        if self.args.reportFormat != "text":
+            # counters instead of the full report text, the report channel stays the same size per message
+            self.summary = ReportSummary(g, self.args.reportSamples)
+        # when the shapes only look at the focus node's own triples, the rest of the data graph is not needed
+        self.local_shapes = focus_local(g)
+        try:
+            # simple count and datatype shapes are checked in one scan instead of by the general engine
+            self.compiled = compile_shapes(g, self.validation_inference)
+        except UnsupportedShapes as e:
+            self.logger.info("Validating with pyshacl, the shapes cannot be compiled: {}".format(e))
+        if self.args.shards > 1:
+            if self.local_shapes:
+                self.start_pool()
+            else:
+                self.logger.warning("Shapes look past the focus node's own triples, validating in a single process")
+        if self.args.inference != "none" and not self.pre_inference:
+            self.logger.info("{} inference is not incremental, pyshacl infers on every validation".format(self.args.inference))
+        if self.args.incrementalInference and self.args.inference != "rdfs":
+            self.logger.warning("incrementalInference is only used with rdfs inference")
 
     async def transform(self) -> None:
 
+        if self.args.incremental:
+            await self.transform_incremental()
+            return
+
         datagraph = Graph()
-       
+        # asserted and inferred triples, only the asserted ones are passed on
+        closure = Graph() if self.pre_inference else datagraph
+        reasoner = IncrementalRDFS(closure) if self.pre_inference else None
+
         async for msg in self.args.datareader.strings():
-            datagraph.parse(data=msg, format="turtle")
-            conforms, report_graph, report_text = validate(datagraph,shacl_graph=self.shaclfile,inference='rdfs',abort_on_error=False,meta_shacl=False,debug=False)
+            with self.timed("parse"):
+                delta = Graph()
+                delta.parse(data=msg, format="turtle")
+                datagraph += delta
+            if reasoner:
+                with self.timed("inference"):
+                    reasoner.add(delta)
+            with self.timed("validation"):
+                conforms, report_graph, report_text = await self.validate_graph(closure)
+            with self.timed("serialization"):
+                data = datagraph.serialize(format="turtle")
+                report_text = self.format_report(conforms, report_graph, report_text, closure)
             await self.args.shaclwriter.string(report_text)
-            await self.args.datawriter.string(datagraph.serialize(format="turtle"))
-
+            await self.args.datawriter.string(data)
 
+        self.log_timings()
+        self.shutdown_pool()
         await self.args.datawriter.close()
         await self.args.shaclwriter.close()
         
 
 
+    async def transform_incremental(self) -> None:
+        # every message is validated for the subjects it contains, only the new data and its report are emitted
+        datagraph = Graph()
+        reasoner = IncrementalRDFS(datagraph) if self.pre_inference else None
+
+        async for msg in self.args.datareader.strings():
+            with self.timed("parse"):
+                delta = Graph()
+                delta.parse(data=msg, format="turtle")
+            inferred = []
+            if reasoner:
+                with self.timed("inference"):
+                    inferred = reasoner.add(delta)
+            else:
+                datagraph += delta
+            # nodes typed by a range declaration are new focus nodes as well
+            focus_nodes = set(delta.subjects()) | {s for s, _, _ in inferred}
+            if not reasoner:
+                schema = [triple for triple in delta if is_schema(triple[1])]
+                if schema:
+                    # the new schema can target nodes that arrived earlier
+                    focus_nodes = set(datagraph.subjects())
+                    for triple in schema:
+                        self.schema.add(triple)
+            with self.timed("validation"):
+                conforms, report_graph, report_text = await self.validate_delta(datagraph, focus_nodes)
+            with self.timed("serialization"):
+                data = delta.serialize(format="turtle")
+                report_text = self.format_report(conforms, report_graph, report_text, datagraph)
+            await self.args.shaclwriter.string(report_text)
+            await self.args.datawriter.string(data)
+
+        if self.summary:
+            # every message only reported its own results, the total covers the whole stream
+            total = self.summary.total()
+            await self.args.shaclwriter.string(to_json_line(total) if self.args.reportFormat == "jsonl" else format_total(total))
+        self.log_timings()
+        self.shutdown_pool()
+        await self.args.datawriter.close()
+        await self.args.shaclwriter.close()
+
+    async def validate_delta(self, datagraph, focus_nodes):
+        if self.local_shapes or not focus_nodes:
+            # the focus nodes with everything received for them so far, earlier triples included
+            context = Graph()
+            if not self.pre_inference:
+                context += self.schema
+            for node in focus_nodes:
+                for triple in datagraph.triples((node, None, None)):
+                    context.add(triple)
+            return await self.validate_graph(context)
+        if all(isinstance(node, URIRef) for node in focus_nodes):
+            # pyshacl follows the paths into the accumulated graph, starting only from the new subjects
+            return self.run_validation(datagraph, focus_nodes=list(focus_nodes))
+        self.logger.debug("Blank node subjects with non-local shapes, validating the whole graph")
+        return self.run_validation(datagraph)
+
+    async def validate_graph(self, datagraph):
+        if self.pool and len(datagraph) >= self.args.shards:
+            # blank node values may carry triples of their own, which could end up in another shard,
+            # and schema triples would only reach the shard of their subject. With rdfs the closure
+            # already holds the types the schema implies.
+            if self.pre_inference or not carries_schema(datagraph):
+                if not any(isinstance(o, BNode) for o in datagraph.objects()):
+                    return await self.validate_sharded(datagraph)
+            else:
+                self.logger.debug("The data carries schema triples, validating in a single process")
+        return self.run_validation(datagraph)
+
+    def run_validation(self, datagraph, **options):
+        return validate_data(datagraph, self.validator, self.compiled, **options)
+
+    async def validate_sharded(self, datagraph):
+        # subjects are hash-partitioned, so all triples of a focus node are validated by the same worker
+        loop = asyncio.get_running_loop()
+        shards = self.partition(datagraph)
+        namespaces = list(datagraph.namespaces())
+        results = await asyncio.gather(*(loop.run_in_executor(self.pool, _validate_shard, shard, namespaces)
+                                         for shard in shards))
+        return self.merge_reports(results)
+
+    def partition(self, datagraph) -> list:
+        shards = [[] for _ in range(self.args.shards)]
+        for triple in datagraph:
+            shards[zlib.crc32(str(triple[0]).encode("utf-8")) % self.args.shards].append(triple)
+        return [shard for shard in shards if shard]
+
+    def merge_reports(self, results):
+        # one report node with the results of all shards, the text sorted the way pyshacl sorts it
+        conforms = all(result[0] for result in results)
+        report_graph = Graph(bind_namespaces='core')
+        for prefix, namespace in self.shaclfile.namespace_manager.namespaces():
+            report_graph.namespace_manager.bind(prefix, namespace)
+        # parsed as one document so that the copies of a blank node shape from different shards coincide
+        report_graph.parse(data="".join(result[1] for result in results), format="nt")
+        descriptions = []
+        for _, _, report_text in results:
+            descriptions.extend(self.split_report_text(report_text))
+        report = BNode()
+        for shard_report in list(report_graph.subjects(RDF.type, SH.ValidationReport)):
+            for result in report_graph.objects(shard_report, SH.result):
+                report_graph.add((report, SH.result, result))
+            report_graph.remove((shard_report, None, None))
+        report_graph.add((report, RDF.type, SH.ValidationReport))
+        report_graph.add((report, SH.conforms, Literal(conforms)))
+        report_text = "Validation Report\nConforms: {}\n".format(conforms)
+        if descriptions:
+            report_text += "Results ({}):\n".format(len(descriptions))
+        report_text += "".join(sorted(descriptions))
+        return conforms, report_graph, report_text
+
+    def split_report_text(self, report_text) -> list:
+        # every result starts on an unindented line, its details follow on lines starting with a tab
+        lines = report_text.splitlines(keepends=True)
+        descriptions = []
+        for line in lines[2:]:
+            if line.startswith("Results ("):
+                continue
+            if line.startswith("\t") and descriptions:
+                descriptions[-1] += line
+            else:
+                descriptions.append(line)
+        return descriptions
+
+    def start_pool(self) -> None:
+        # every worker process receives the shapes once when it starts
+        self.pool = ProcessPoolExecutor(max_workers=self.args.shards,
+                                        initializer=_init_worker,
+                                        initargs=(self.shaclfile, self.compiled, self.validation_inference))
+
+    def format_report(self, conforms, report_graph, report_text, datagraph) -> str:
+        if not self.summary:
+            return report_text
+        summary = self.summary.summarize(conforms, report_graph, datagraph)
+        if self.args.reportFormat == "jsonl":
+            return to_json_line(summary)
+        return format_summary(summary)
+
+    @contextmanager
+    def timed(self, phase):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] += time.perf_counter() - start
+
+    def log_timings(self) -> None:
+        self.logger.info("SHACL validation time per phase: {}".format(
+            ", ".join("{} {:.3f}s".format(phase, self.timings[phase]) for phase in PHASES)))
+
+    def shutdown_pool(self) -> None:
+        if self.pool:
+            self.pool.shutdown()
+            self.pool = None
+
     async def produce(self) -> None:
         """Function to start the production of data, starting the pipeline.
         This function is called after all processors are completely set up."""
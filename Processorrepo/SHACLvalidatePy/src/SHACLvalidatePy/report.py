@@ -0,0 +1,127 @@
+import json
+from collections import Counter
+
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+
+from .shapes import SH
+
+SOSA = Namespace("http://www.w3.org/ns/sosa/")
+
+
+class ReportSummary:
+    """Condenses validation report graphs into counts per shape, constraint component and sensor
+    (sosa:madeBySensor of the focus node) plus at most `samples` example results.
+
+    The size of a summary depends on the number of shapes, components and sensors, not on the number
+    of results, so the report channel stays small for long streams."""
+
+    def __init__(self, shapes: Graph, samples: int):
+        self.shapes = shapes
+        self.samples = samples
+        self.messages = 0
+        self.totals = {"results": 0, "byShape": Counter(), "byComponent": Counter(), "bySensor": Counter()}
+
+    def summarize(self, conforms: bool, report_graph: Graph, datagraph: Graph) -> dict:
+        self.messages += 1
+        by_shape = Counter()
+        by_component = Counter()
+        by_sensor = Counter()
+        samples = []
+        results = list(report_graph.objects(None, SH.result))
+        for result in results:
+            focus_node = report_graph.value(result, SH.focusNode)
+            shape = self.shape_label(report_graph, result)
+            component = self.label(report_graph.value(result, SH.sourceConstraintComponent))
+            sensor = self.label(datagraph.value(focus_node, SOSA.madeBySensor)) if focus_node is not None else None
+            by_shape[shape] += 1
+            by_component[component] += 1
+            by_sensor[sensor or "unknown"] += 1
+            if len(samples) < self.samples:
+                samples.append({
+                    "focusNode": self.label(focus_node),
+                    "shape": shape,
+                    "component": component,
+                    "severity": self.label(report_graph.value(result, SH.resultSeverity)),
+                    "value": self.label(report_graph.value(result, SH.value)),
+                    "message": self.label(report_graph.value(result, SH.resultMessage)),
+                })
+        self.totals["results"] += len(results)
+        self.totals["byShape"].update(by_shape)
+        self.totals["byComponent"].update(by_component)
+        self.totals["bySensor"].update(by_sensor)
+        return {
+            "message": self.messages,
+            "conforms": conforms,
+            "results": len(results),
+            "byShape": dict(by_shape.most_common()),
+            "byComponent": dict(by_component.most_common()),
+            "bySensor": dict(by_sensor.most_common()),
+            "samples": samples,
+        }
+
+    def total(self) -> dict:
+        return {
+            "messages": self.messages,
+            "results": self.totals["results"],
+            "byShape": dict(self.totals["byShape"].most_common()),
+            "byComponent": dict(self.totals["byComponent"].most_common()),
+            "bySensor": dict(self.totals["bySensor"].most_common()),
+        }
+
+    def shape_label(self, report_graph: Graph, result) -> str:
+        shape = report_graph.value(result, SH.sourceShape)
+        if isinstance(shape, BNode):
+            # anonymous property shapes are named after sh:name or their path
+            name = report_graph.value(shape, SH.name) or self.shapes.value(shape, SH.name)
+            if name is not None:
+                return str(name)
+            path = report_graph.value(result, SH.resultPath)
+            if path is not None:
+                return self.label(path)
+        return self.label(shape)
+
+    def label(self, node) -> str | None:
+        if node is None:
+            return None
+        if isinstance(node, URIRef):
+            if node.startswith(str(SH)):
+                return node[len(SH):]
+            try:
+                return self.shapes.namespace_manager.normalizeUri(node)
+            except Exception:
+                return str(node)
+        if isinstance(node, Literal):
+            return str(node)
+        return node.n3()
+
+
+def format_summary(summary: dict) -> str:
+    lines = ["Validation Summary (message {})".format(summary["message"]),
+             "Conforms: {}".format(summary["conforms"]),
+             "Results: {}".format(summary["results"])]
+    lines.extend(format_counts(summary))
+    if summary["samples"]:
+        lines.append("Samples ({} of {}):".format(len(summary["samples"]), summary["results"]))
+        for sample in summary["samples"]:
+            lines.append("\t{} {} {}: {}".format(sample["focusNode"], sample["shape"], sample["component"],
+                                                sample["message"] or sample["value"]))
+    return "\n".join(lines) + "\n"
+
+
+def format_total(total: dict) -> str:
+    lines = ["Validation Total ({} messages)".format(total["messages"]), "Results: {}".format(total["results"])]
+    lines.extend(format_counts(total))
+    return "\n".join(lines) + "\n"
+
+
+def format_counts(summary: dict) -> list:
+    lines = []
+    for key, title in (("byShape", "By shape"), ("byComponent", "By constraint component"), ("bySensor", "By sensor")):
+        if summary[key]:
+            lines.append(title + ":")
+            lines.extend("\t{}: {}".format(name, count) for name, count in summary[key].items())
+    return lines
+
+
+def to_json_line(record: dict) -> str:
+    return json.dumps(record, ensure_ascii=False) + "\n"
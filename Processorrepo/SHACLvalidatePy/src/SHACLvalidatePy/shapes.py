@@ -0,0 +1,50 @@
+from pyshacl import ShapesGraph, Validator
+from pyshacl.errors import ValidationFailure
+from pyshacl.graph_abstraction import DataGraph
+from rdflib import Graph, Namespace, URIRef
+
+SH = Namespace("http://www.w3.org/ns/shacl#")
+
+# constraints and targets that look past the focus node and its own outgoing triples
+NON_LOCAL = (
+    SH.node, SH["class"], SH.qualifiedValueShape, SH.sparql, SH.target,
+    SH["and"], SH["or"], SH["not"], SH.xone, SH.targetObjectsOf,
+)
+
+
+def focus_local(shapes: Graph) -> bool:
+    """True when every shape only needs the focus node's own outgoing triples, i.e. all
+    paths are single predicates and no constraint follows a value node to other triples."""
+    for predicate in NON_LOCAL:
+        if (None, predicate, None) in shapes:
+            return False
+    for property_shape, path in shapes.subject_objects(SH.path):
+        if not isinstance(path, URIRef):
+            return False
+        # nested property shapes constrain the triples of the value nodes
+        if (property_shape, SH.property, None) in shapes:
+            return False
+    return True
+
+
+class ShapesValidator:
+    """pyshacl validation with the shapes analysed once.
+
+    pyshacl.validate() wraps the shapes in a new ShapesGraph on every call, which harvests and parses every
+    shape again. Here one ShapesGraph is kept and handed to a Validator per data graph, with the options
+    validate() is called with otherwise."""
+
+    def __init__(self, shapes: Graph, inference: str):
+        self.shapes_graph = ShapesGraph(shapes)
+        self.inference = inference
+        # harvested here, not during the first validation
+        self.shapes_graph.shapes
+
+    def validate(self, data: Graph, **options):
+        validator = Validator(DataGraph.from_rdflib(data), shacl_graph=self.shapes_graph.graph,
+                              options={"inference": self.inference, **options})
+        validator.shacl_graph = self.shapes_graph
+        try:
+            return validator.run()
+        except ValidationFailure as e:
+            return False, e, "Validation Failure - {}".format(e.message)
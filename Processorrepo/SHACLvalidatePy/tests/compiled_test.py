@@ -0,0 +1,91 @@
+import pytest
+from pyshacl import validate
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from SHACLvalidatePy.compiled import UnsupportedShapes, compile_shapes
+
+PREFIXES = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.com/> .
+"""
+
+# the shape of WFresources/shape.ttl
+SHAPES = PREFIXES + """
+ex:ObservationShape a sh:NodeShape ;
+    sh:targetClass sosa:Observation ;
+    sh:property [ sh:path sosa:madeBySensor ; sh:minCount 1 ; sh:maxCount 1 ] ;
+    sh:property [ sh:path sosa:hasSimpleResult ; sh:minCount 1 ; sh:datatype xsd:double ] ;
+    sh:property [ sh:path sosa:observedProperty ; sh:minCount 1 ; sh:maxCount 1 ] ;
+    sh:property [ sh:path sosa:resultTime ; sh:datatype xsd:dateTime ; sh:minCount 1 ; sh:maxCount 1 ] .
+"""
+
+EXTRA_SHAPES = SHAPES + """
+ex:SensorShape a sh:NodeShape ;
+    sh:targetNode ex:s1, ex:missing ;
+    sh:property [ sh:path rdfs:label ; sh:minCount 1 ; sh:datatype xsd:string ] ;
+    sh:property [ sh:path ex:code ; sh:maxCount 0 ; sh:severity sh:Warning ; sh:message "no codes" ] ;
+    sh:property [ sh:path ex:count ; sh:datatype xsd:integer ; sh:name "count" ] .
+"""
+
+VALID = PREFIXES + """
+ex:a a sosa:Observation ; sosa:madeBySensor "1" ; sosa:hasSimpleResult "1.5"^^xsd:double ;
+    sosa:observedProperty "Barometric pressure" ; sosa:resultTime "2025-08-12T12:15:00+00:00"^^xsd:dateTime .
+"""
+
+INVALID = VALID + """
+ex:b a sosa:Observation ; sosa:madeBySensor "1", "2" ; sosa:hasSimpleResult "abc"^^xsd:double, "2", ex:c ;
+    sosa:resultTime "2025-08-12"^^xsd:dateTime .
+ex:c a sosa:Observation, ex:Other .
+ex:d sosa:madeBySensor "not targeted", "twice" .
+"""
+
+SENSORS = INVALID + """
+ex:s1 rdfs:label "sensor" ; ex:code "x" ; ex:count "3"^^xsd:integer, "3.5"^^xsd:decimal, "many" .
+"""
+
+CASES = [
+    (SHAPES, PREFIXES),
+    (SHAPES, VALID),
+    (SHAPES, INVALID),
+    (EXTRA_SHAPES, VALID),
+    (EXTRA_SHAPES, SENSORS),
+]
+
+
+@pytest.mark.parametrize("shapes_text,data_text", CASES)
+def test_compiled_validator_matches_pyshacl(shapes_text, data_text):
+    shapes = Graph().parse(data=shapes_text, format="turtle")
+    data = Graph().parse(data=data_text, format="turtle")
+    compiled = compile_shapes(shapes)
+    assert compiled.applicable(data)
+
+    conforms, report_graph, report_text = compiled.validate(data)
+    expected = validate(data, shacl_graph=shapes, inference='rdfs', abort_on_error=False,
+                        meta_shacl=False, debug=False)
+
+    assert conforms == expected[0]
+    assert report_text == expected[2]
+    assert isomorphic(report_graph, expected[1])
+
+
+def test_reports_that_depend_on_inference_are_left_to_pyshacl():
+    compiled = compile_shapes(Graph().parse(data=SHAPES, format="turtle"))
+    schema = Graph().parse(data=VALID + "ex:Reading rdfs:subClassOf sosa:Observation .", format="turtle")
+    assert not compiled.applicable(schema)
+    blank = Graph().parse(data=PREFIXES + "[] a sosa:Observation .", format="turtle")
+    assert compiled.validate(blank) is None
+
+
+@pytest.mark.parametrize("constraint", [
+    "sh:class sosa:Sensor",
+    'sh:pattern "^[0-9]+$"',
+    "sh:node ex:OtherShape",
+])
+def test_unsupported_shapes_are_rejected(constraint):
+    shapes = SHAPES.replace("sh:path sosa:madeBySensor ;", "sh:path sosa:madeBySensor ; {} ;".format(constraint))
+    with pytest.raises(UnsupportedShapes):
+        compile_shapes(Graph().parse(data=shapes, format="turtle"))
@@ -0,0 +1,115 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from rdflib import Graph, Namespace
+
+import SHACLvalidatePy.processor as processor
+from SHACLvalidatePy.shapes import focus_local
+
+SHAPES = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.com/> .
+
+ex:ObservationShape a sh:NodeShape ;
+    sh:targetClass sosa:Observation ;
+    sh:property [ sh:path sosa:madeBySensor ; sh:minCount 1 ; sh:maxCount 1 ] ;
+    sh:property [ sh:path sosa:hasSimpleResult ; sh:minCount 1 ; sh:datatype xsd:double ] .
+"""
+
+PREFIXES = """
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.com/> .
+"""
+
+EX = Namespace("http://example.com/")
+SH = Namespace("http://www.w3.org/ns/shacl#")
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+async def run(tmp_path, shapes, messages, **options):
+    shape_file = tmp_path / "shape.ttl"
+    shape_file.write_text(shapes, encoding="utf-8")
+    datawriter = AsyncMock()
+    shaclwriter = AsyncMock()
+    proc = processor.SHACLvalidatePy(processor.TemplateArgs(
+        datareader=DummyReader([PREFIXES + msg for msg in messages]), datawriter=datawriter,
+        loc=str(shape_file), shaclwriter=shaclwriter, incremental=True, **options))
+    await proc.init()
+    await proc.transform()
+    datawriter.close.assert_awaited_once()
+    shaclwriter.close.assert_awaited_once()
+    data = [call.args[0] for call in datawriter.string.await_args_list]
+    reports = [call.args[0] for call in shaclwriter.string.await_args_list]
+    return proc, data, reports
+
+
+@pytest.mark.asyncio
+async def test_only_new_focus_nodes_are_reported(tmp_path):
+    messages = [
+        'ex:a a sosa:Observation ; sosa:madeBySensor "1" ; sosa:hasSimpleResult "1.0"^^xsd:double .\n'
+        'ex:b a sosa:Observation ; sosa:hasSimpleResult "2.0"^^xsd:double .\n',
+        'ex:c a sosa:Observation ; sosa:madeBySensor "1" ; sosa:hasSimpleResult "3.0"^^xsd:double .\n',
+        # the missing sensor of ex:b arrives later, ex:b is validated again with its earlier triples
+        'ex:b sosa:madeBySensor "2" .\n',
+    ]
+    proc, data, reports = await run(tmp_path, SHAPES, messages)
+
+    assert proc.local_shapes
+    assert "Conforms: False" in reports[0] and "example.com/b" in reports[0]
+    assert "Conforms: True" in reports[1]
+    assert "Conforms: True" in reports[2]
+    # only the triples of each message are passed on
+    assert [len(Graph().parse(data=out, format="turtle")) for out in data] == [5, 3, 1]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("inference", ["none", "rdfs", "owlrl"])
+@pytest.mark.parametrize("schema_first", [True, False])
+async def test_schema_in_the_data_applies_to_every_message(tmp_path, inference, schema_first):
+    schema = 'ex:Reading rdfs:subClassOf sosa:Observation .\n'
+    # a reading without a sensor
+    reading = 'ex:r a ex:Reading ; sosa:hasSimpleResult "1.0"^^xsd:double .\n'
+    messages = [schema, reading] if schema_first else [reading, schema]
+    _, _, reports = await run(tmp_path, SHAPES, messages, inference=inference)
+
+    assert "Conforms: True" in reports[0]
+    assert "Conforms: False" in reports[1] and "example.com/r" in reports[1]
+
+
+@pytest.mark.asyncio
+async def test_shapes_that_follow_value_nodes_use_the_accumulated_graph(tmp_path):
+    shapes = SHAPES.replace("sh:minCount 1 ; sh:maxCount 1 ]",
+                            "sh:minCount 1 ; sh:maxCount 1 ; sh:class sosa:Sensor ]")
+    messages = [
+        'ex:s1 a sosa:Sensor .\n',
+        'ex:a a sosa:Observation ; sosa:madeBySensor ex:s1 ; sosa:hasSimpleResult "1.0"^^xsd:double .\n'
+        'ex:b a sosa:Observation ; sosa:madeBySensor ex:s2 ; sosa:hasSimpleResult "2.0"^^xsd:double .\n',
+    ]
+    proc, data, reports = await run(tmp_path, shapes, messages)
+
+    assert not proc.local_shapes
+    assert "Conforms: True" in reports[0]
+    # ex:s1 was typed in an earlier message, only ex:b points at an unknown sensor
+    assert "example.com/b" in reports[1] and "example.com/a>" not in reports[1]
+    assert reports[1].count("Constraint Violation") == 1
+
+
+def test_focus_local_rejects_paths_past_the_focus_node():
+    graph = Graph().parse(data=SHAPES, format="turtle")
+    assert focus_local(graph)
+    inverse = SHAPES.replace("sh:path sosa:madeBySensor", "sh:path [ sh:inversePath sosa:madeBySensor ]")
+    assert not focus_local(Graph().parse(data=inverse, format="turtle"))
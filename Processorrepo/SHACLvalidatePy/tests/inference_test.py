@@ -0,0 +1,122 @@
+from unittest.mock import AsyncMock
+
+import pytest
+from pyshacl import validate
+from rdflib import Graph, Namespace
+from rdflib.namespace import RDF
+
+import SHACLvalidatePy.processor as processor
+from SHACLvalidatePy.inference import IncrementalRDFS
+from SHACLvalidatePy.shapes import SH
+
+PREFIXES = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.com/> .
+"""
+
+SHAPES = PREFIXES + """
+ex:ObservationShape a sh:NodeShape ;
+    sh:targetClass sosa:Observation ;
+    sh:property [ sh:path sosa:madeBySensor ; sh:minCount 1 ; sh:maxCount 1 ] ;
+    sh:property [ sh:path sosa:hasSimpleResult ; sh:minCount 1 ; sh:datatype xsd:double ] .
+"""
+
+MESSAGES = [
+    'ex:a a ex:Reading ; sosa:madeBySensor "1" .\n',
+    # the schema arrives after the data it applies to
+    'ex:Reading rdfs:subClassOf ex:Measurement . ex:Measurement rdfs:subClassOf sosa:Observation .\n',
+    'ex:b ex:resultOf ex:c ; sosa:hasSimpleResult "1.0"^^xsd:double .\n'
+    'ex:resultOf rdfs:range sosa:Observation ; rdfs:domain ex:Result .\n',
+    'ex:d a ex:Reading ; sosa:madeBySensor "4" ; sosa:hasSimpleResult "4.0"^^xsd:double .\n',
+]
+
+EX = Namespace("http://example.com/")
+SOSA = Namespace("http://www.w3.org/ns/sosa/")
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+def parse(*messages):
+    graph = Graph()
+    for msg in messages:
+        graph.parse(data=PREFIXES + msg, format="turtle")
+    return graph
+
+
+def results(report_graph):
+    return {(report_graph.value(r, SH.focusNode), report_graph.value(r, SH.sourceConstraintComponent))
+            for r in report_graph.objects(None, SH.result)}
+
+
+def test_closure_is_extended_with_the_new_triples_only():
+    graph = Graph()
+    reasoner = IncrementalRDFS(graph)
+    assert reasoner.add(parse(MESSAGES[0])) == []
+    reasoner.add(parse(MESSAGES[1]))
+    assert (EX.a, RDF.type, SOSA.Observation) in graph
+    inferred = reasoner.add(parse(MESSAGES[2]))
+    assert set(inferred) == {(EX.c, RDF.type, SOSA.Observation), (EX.b, RDF.type, EX.Result)}
+    inferred = reasoner.add(parse(MESSAGES[3]))
+    assert set(inferred) == {(EX.d, RDF.type, EX.Measurement), (EX.d, RDF.type, SOSA.Observation)}
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("inference,incremental", [("none", False), ("rdfs", False), ("rdfs", True), ("owlrl", False)])
+async def test_incremental_closure_matches_pyshacl_inference(tmp_path, inference, incremental):
+    shape_file = tmp_path / "shape.ttl"
+    shape_file.write_text(SHAPES, encoding="utf-8")
+    shaclwriter = AsyncMock()
+    proc = processor.SHACLvalidatePy(processor.TemplateArgs(
+        datareader=DummyReader([PREFIXES + msg for msg in MESSAGES]), datawriter=AsyncMock(),
+        loc=str(shape_file), shaclwriter=shaclwriter, inference=inference, incrementalInference=incremental))
+    await proc.init()
+
+    reports = []
+    validate_graph = proc.validate_graph
+
+    async def record(datagraph):
+        report = await validate_graph(datagraph)
+        reports.append(report)
+        return report
+
+    proc.validate_graph = record
+    await proc.transform()
+
+    for count, (conforms, report_graph, _) in enumerate(reports, start=1):
+        expected = validate(parse(*MESSAGES[:count]), shacl_graph=proc.shaclfile, inference=inference)
+        assert conforms == expected[0]
+        assert results(report_graph) == results(expected[1])
+    assert proc.timings["validation"] > 0
+    assert (proc.timings["inference"] > 0) == incremental
+
+
+@pytest.mark.asyncio
+async def test_rdfs_inference_is_pyshacl_by_default(tmp_path):
+    # every node is an rdfs:Resource through the RDFS axioms, which the incremental closure leaves out
+    shapes = PREFIXES + """
+ex:ResourceShape a sh:NodeShape ; sh:targetClass rdfs:Resource ;
+    sh:property [ sh:path rdf:type ; sh:maxCount 1 ] .
+"""
+    shape_file = tmp_path / "shape.ttl"
+    shape_file.write_text(shapes, encoding="utf-8")
+    proc = processor.SHACLvalidatePy(processor.TemplateArgs(
+        datareader=None, datawriter=None, loc=str(shape_file), shaclwriter=None))
+    await proc.init()
+    data = parse(MESSAGES[0], MESSAGES[3])
+    conforms, report_graph, _ = await proc.validate_graph(data)
+    expected = validate(data, shacl_graph=proc.shaclfile, inference="rdfs")
+    assert conforms == expected[0] is False
+    assert results(report_graph) == results(expected[1])
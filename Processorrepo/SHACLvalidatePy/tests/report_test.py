@@ -0,0 +1,82 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+
+import SHACLvalidatePy.processor as processor
+
+PREFIXES = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.com/> .
+"""
+
+SHAPES = PREFIXES + """
+ex:ObservationShape a sh:NodeShape ;
+    sh:targetClass sosa:Observation ;
+    sh:property [ sh:path sosa:madeBySensor ; sh:minCount 1 ; sh:maxCount 1 ] ;
+    sh:property [ sh:path sosa:hasSimpleResult ; sh:minCount 1 ; sh:datatype xsd:double ] .
+"""
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+def message(index, observations):
+    lines = []
+    for i in range(observations):
+        subject = "ex:o{}_{}".format(index, i)
+        # every observation has a result that is not a double, sensor 2 also reports a second sensor
+        lines.append('{} a sosa:Observation ; sosa:madeBySensor "{}" ; sosa:hasSimpleResult "{}" .'.format(
+            subject, i % 3, i))
+        if i % 3 == 2:
+            lines.append('{} sosa:madeBySensor "extra" .'.format(subject))
+    return PREFIXES + "\n".join(lines)
+
+
+async def run(tmp_path, messages, report_format):
+    shape_file = tmp_path / "shape.ttl"
+    shape_file.write_text(SHAPES, encoding="utf-8")
+    shaclwriter = AsyncMock()
+    proc = processor.SHACLvalidatePy(processor.TemplateArgs(
+        datareader=DummyReader(messages), datawriter=AsyncMock(), loc=str(shape_file),
+        shaclwriter=shaclwriter, incremental=True, reportFormat=report_format, reportSamples=3))
+    await proc.init()
+    await proc.transform()
+    return [call.args[0] for call in shaclwriter.string.await_args_list]
+
+
+@pytest.mark.asyncio
+async def test_jsonl_reports_count_results_per_shape_component_and_sensor(tmp_path):
+    reports = await run(tmp_path, [message(0, 9), message(1, 9)], "jsonl")
+
+    records = [json.loads(line) for line in reports]
+    assert len(records) == 3
+    first = records[0]
+    assert first["conforms"] is False
+    # 9 wrong datatypes and 3 observations with two sensors
+    assert first["results"] == 12
+    assert first["byComponent"] == {"DatatypeConstraintComponent": 9, "MaxCountConstraintComponent": 3}
+    assert first["byShape"] == {"sosa:hasSimpleResult": 9, "sosa:madeBySensor": 3}
+    assert sum(first["bySensor"].values()) == 12
+    assert len(first["samples"]) == 3
+    total = records[-1]
+    assert total["messages"] == 2 and total["results"] == 24
+
+
+@pytest.mark.asyncio
+async def test_summary_size_does_not_grow_with_the_number_of_results(tmp_path):
+    small = await run(tmp_path, [message(0, 9)], "summary")
+    large = await run(tmp_path, [message(0, 300)], "summary")
+
+    assert "Results: 400" in large[0]
+    assert len(large[0]) < len(small[0]) + 50
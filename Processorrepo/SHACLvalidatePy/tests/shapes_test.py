@@ -0,0 +1,48 @@
+import pyshacl.shapes_graph
+import pytest
+from pyshacl import validate
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+from SHACLvalidatePy.shapes import ShapesValidator
+
+PREFIXES = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix ex: <http://example.com/> .
+"""
+
+# sh:pattern and sh:class are left to pyshacl by the compiled validator
+SHAPES = PREFIXES + """
+ex:ObservationShape a sh:NodeShape ;
+    sh:targetClass sosa:Observation ;
+    sh:property [ sh:path sosa:madeBySensor ; sh:minCount 1 ; sh:pattern "^[0-9]+$" ] ;
+    sh:property [ sh:path sosa:hasFeatureOfInterest ; sh:class ex:Feature ] .
+"""
+
+DATA = [
+    'ex:a a sosa:Observation ; sosa:madeBySensor "1" ; sosa:hasFeatureOfInterest ex:f .\nex:f a ex:Feature .\n',
+    'ex:b a sosa:Observation ; sosa:madeBySensor "x" ; sosa:hasFeatureOfInterest ex:g .\n',
+    'ex:Reading rdfs:subClassOf sosa:Observation .\nex:c a ex:Reading .\n',
+]
+
+
+@pytest.mark.parametrize("inference", ["none", "rdfs"])
+def test_reused_shapes_give_the_reports_of_pyshacl(monkeypatch, inference):
+    harvests = []
+    build = pyshacl.shapes_graph.ShapesGraph._build_node_shape_cache
+    monkeypatch.setattr(pyshacl.shapes_graph.ShapesGraph, "_build_node_shape_cache",
+                        lambda self: harvests.append(self) or build(self))
+    shapes = Graph().parse(data=SHAPES, format="turtle")
+    validator = ShapesValidator(shapes, inference)
+    for text in DATA:
+        data = Graph().parse(data=PREFIXES + text, format="turtle")
+        conforms, report_graph, report_text = validator.validate(data)
+        expected = validate(data, shacl_graph=shapes, inference=inference)
+        assert conforms == expected[0]
+        assert report_text == expected[2]
+        assert isomorphic(report_graph, expected[1])
+    # once for the validator, once for every pyshacl.validate call
+    assert len(harvests) == 1 + len(DATA)
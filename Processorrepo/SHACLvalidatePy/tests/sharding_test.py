@@ -0,0 +1,90 @@
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+import SHACLvalidatePy.processor as processor
+
+PREFIXES = """
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+@prefix ex: <http://example.com/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+"""
+
+SHAPES = PREFIXES + """
+ex:ObservationShape a sh:NodeShape ;
+    sh:targetClass sosa:Observation ;
+    sh:property [ sh:path sosa:madeBySensor ; sh:minCount 1 ; sh:maxCount 1 ] ;
+    sh:property [ sh:path sosa:hasSimpleResult ; sh:minCount 1 ; sh:datatype xsd:double ] .
+"""
+
+
+def observations(count):
+    lines = []
+    for i in range(count):
+        lines.append('ex:o{} a sosa:Observation ; sosa:madeBySensor "{}" .'.format(i, i % 3))
+        # every third observation has no result, every fifth a result that is not a double
+        if i % 3:
+            lines.append('ex:o{} sosa:hasSimpleResult "{}"{} .'.format(i, i, "" if i % 5 == 0 else "^^xsd:double"))
+    return PREFIXES + "\n".join(lines)
+
+
+async def sharded_and_single(tmp_path, shapes, shards=3):
+    shape_file = tmp_path / "shape.ttl"
+    shape_file.write_text(shapes, encoding="utf-8")
+    proc = processor.SHACLvalidatePy(processor.TemplateArgs(
+        datareader=None, datawriter=None, loc=str(shape_file), shaclwriter=None, shards=shards))
+    await proc.init()
+    data = Graph().parse(data=observations(40), format="turtle")
+    sharded = proc.pool is not None
+    try:
+        return sharded, await proc.validate_graph(data), proc.run_validation(data)
+    finally:
+        proc.shutdown_pool()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("shapes", [
+    SHAPES,
+    # sh:pattern is not compiled, the shards are validated by pyshacl
+    SHAPES.replace("sh:maxCount 1 ]", 'sh:maxCount 1 ; sh:pattern "^[0-9]$" ]'),
+])
+async def test_sharded_report_matches_single_process(tmp_path, shapes):
+    pooled, sharded, single = await sharded_and_single(tmp_path, shapes)
+
+    assert pooled
+    assert sharded[0] == single[0] is False
+    assert sharded[2] == single[2]
+    assert isomorphic(sharded[1], single[1])
+
+
+@pytest.mark.asyncio
+async def test_cross_node_shapes_are_not_sharded(tmp_path):
+    shapes = SHAPES.replace("sh:maxCount 1 ]", "sh:maxCount 1 ; sh:class sosa:Sensor ]")
+    pooled, sharded, single = await sharded_and_single(tmp_path, shapes)
+
+    assert not pooled
+    assert sharded[2] == single[2]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("inference", ["none", "rdfs", "owlrl"])
+async def test_schema_in_the_data_is_seen_by_every_focus_node(tmp_path, inference):
+    shape_file = tmp_path / "shape.ttl"
+    shape_file.write_text(SHAPES, encoding="utf-8")
+    proc = processor.SHACLvalidatePy(processor.TemplateArgs(
+        datareader=None, datawriter=None, loc=str(shape_file), shaclwriter=None, shards=4, inference=inference))
+    await proc.init()
+    # the readings are observations through the class hierarchy in the data, none has a sensor
+    data = Graph().parse(data=PREFIXES + "ex:Reading rdfs:subClassOf sosa:Observation .\n" + "\n".join(
+        'ex:r{0} a ex:Reading ; sosa:hasSimpleResult "{0}"^^xsd:double .'.format(i) for i in range(20)),
+        format="turtle")
+    try:
+        sharded = await proc.validate_graph(data)
+        single = proc.run_validation(data)
+    finally:
+        proc.shutdown_pool()
+
+    assert "Results (20):" in single[2]
+    assert sharded[2] == single[2]
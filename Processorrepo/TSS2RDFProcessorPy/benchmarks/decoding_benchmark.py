@@ -0,0 +1,89 @@
+"""Times CreateRDF on snippet graphs with a growing number of sensors and points per sensor, and, for the
+smaller sizes, the SPARQL-row decoder it replaced, whose cost grew with about rows times all points.
+
+Run from the TSS2RDFProcessorPy directory, e.g.
+    PYTHONPATH=src python benchmarks/decoding_benchmark.py --sensors 10 100 --points 100 1000 --compare 20000
+"""
+import argparse
+import json
+import time
+from unittest.mock import AsyncMock
+
+from rdflib import BNode, Graph, Literal, Namespace, URIRef
+from rdflib.namespace import RDF, XSD
+
+from TSS2RDFProcessorPy.processor import TemplateArgs, TSS2RDFProcessorPy
+
+SOSA = Namespace("http://www.w3.org/ns/sosa/")
+TSS = Namespace("https://w3id.org/tss#")
+
+
+def build_graph(sensors, points):
+    graph = Graph()
+    for sensor in range(sensors):
+        subject = URIRef("http://example.org/sensor/{}".format(sensor))
+        array = [{"time": "2025-08-12T00:00:00+00:00", "value": str(index * 0.5),
+                  "id": "http://example.com/reading_{}_{}".format(sensor, index)} for index in range(points)]
+        template = BNode()
+        graph.add((subject, RDF.type, TSS.Snippet))
+        graph.add((subject, TSS.points, Literal(json.dumps(array))))
+        graph.add((subject, TSS["from"], Literal("2025-08-12T00:00:00+00:00", datatype=XSD.dateTime)))
+        graph.add((subject, TSS.to, Literal("2025-08-12T00:00:00+00:00", datatype=XSD.dateTime)))
+        graph.add((subject, TSS.pointType, SOSA.Observation))
+        graph.add((subject, TSS.about, template))
+        graph.add((template, RDF.type, TSS.PointTemplate))
+        graph.add((template, SOSA.madeBySensor, subject))
+        graph.add((template, SOSA.observedProperty, Literal("River Stage")))
+    return graph
+
+
+def sparql_create_rdf(graph):
+    result = Graph()
+    snippet_id_dic = {}
+    for subj, pred, obj, about, aboutP, aboutO in graph.query("""
+            PREFIX tss: <https://w3id.org/tss#>
+            SELECT ?snippet ?P ?O ?about ?aboutP ?aboutO
+            WHERE { ?snippet a tss:Snippet . ?snippet ?P ?O .
+                    OPTIONAL { ?snippet tss:about ?about . ?about ?aboutP ?aboutO . } }"""):
+        if pred == TSS.points:
+            for point in json.loads(str(obj)):
+                snippet_id_dic[URIRef(point['id'])] = subj
+                result.add((URIRef(point['id']), RDF.type, SOSA.Observation))
+                result.add((URIRef(point['id']), SOSA.resultTime, Literal(point['time'], datatype=XSD.dateTime)))
+                result.add((URIRef(point['id']), SOSA.hasSimpleResult,
+                            Literal(float(point['value']), datatype=XSD.decimal)))
+        if about and aboutP and aboutO and aboutO != TSS.PointTemplate:
+            for key, value in snippet_id_dic.items():
+                if subj == value:
+                    result.add((key, aboutP, aboutO))
+    return result
+
+
+def main():
+    proc = TSS2RDFProcessorPy(TemplateArgs(reader=None, writer=AsyncMock()))
+    print("{:>8} {:>8} {:>10} {:>12} {:>12} {:>12}".format(
+        "sensors", "points", "total", "indexed s", "points/s", "rows s"))
+    for sensors in ARGS.sensors:
+        for points in ARGS.points:
+            graph = build_graph(sensors, points)
+            start = time.perf_counter()
+            result = proc.CreateRDF(graph)
+            indexed = time.perf_counter() - start
+            rows = "-"
+            if sensors * points <= ARGS.compare:
+                start = time.perf_counter()
+                expected = sparql_create_rdf(graph)
+                rows = "{:.3f}".format(time.perf_counter() - start)
+                assert len(expected) == len(result)
+            print("{:>8} {:>8} {:>10} {:>12.3f} {:>12.0f} {:>12}".format(
+                sensors, points, sensors * points, indexed, sensors * points / indexed, rows))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sensors", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--points", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--compare", type=int, default=20000,
+                        help="also time the SPARQL-row decoder up to this many points")
+    ARGS = parser.parse_args()
+    main()
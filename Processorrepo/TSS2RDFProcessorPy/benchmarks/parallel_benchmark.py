@@ -0,0 +1,88 @@
+"""Times the streaming expansion of one message with many snippets for 1..N worker processes, and how often
+another coroutine got to run on the event loop meanwhile.
+
+Run from the TSS2RDFProcessorPy directory, e.g.
+    PYTHONPATH=src python benchmarks/parallel_benchmark.py --sensors 200 --points 1000 --max-workers 8
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from unittest.mock import AsyncMock
+
+from rdflib import Literal
+
+import TSS2RDFProcessorPy.processor as processor
+from TSS2RDFProcessorPy.literals import parse_message
+
+PREFIXES = """
+@prefix tss: <https://w3id.org/tss#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+"""
+
+
+def build_message(sensors, points):
+    parts = [PREFIXES]
+    for sensor in range(sensors):
+        array = [{"time": "2025-08-12T00:00:00+00:00", "value": str(index % 100 * 0.5),
+                  "id": "http://example.com/reading_{}_{}".format(sensor, index)} for index in range(points)]
+        parts.append("""
+<http://example.org/sensor/{0}> a tss:Snippet ;
+    tss:points {1} ;
+    tss:about [ a tss:PointTemplate ; sosa:madeBySensor <http://example.org/sensor/{0}> ;
+                sosa:observedProperty "River Stage" ] .
+""".format(sensor, Literal(json.dumps(array)).n3()))
+    return "".join(parts)
+
+
+async def run(graph, workers):
+    args = processor.TemplateArgs(reader=None, writer=AsyncMock(), streaming=True, workers=workers)
+    proc = processor.TSS2RDFProcessorPy(args)
+    await proc.init()
+    ticks = 0
+    done = False
+
+    async def ticker():
+        nonlocal ticks
+        while not done:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    if proc.pool:
+        # warm up the pool so that process start is not timed
+        await asyncio.gather(*(asyncio.get_running_loop().run_in_executor(proc.pool, processor._expand_snippet,
+                                                                          "[]", [], 1)
+                               for _ in range(workers)))
+    task = asyncio.create_task(ticker())
+    start = time.perf_counter()
+    if proc.pool:
+        await proc.stream_parallel(graph)
+        proc.pool.shutdown()
+    else:
+        for lines, count in proc.StreamRDF(graph):
+            pass
+    elapsed = time.perf_counter() - start
+    done = True
+    await task
+    return elapsed, ticks
+
+
+def main():
+    graph = parse_message(build_message(ARGS.sensors, ARGS.points))
+    print("{} sensors x {} points, {} CPUs".format(ARGS.sensors, ARGS.points, os.cpu_count()))
+    print("{:>8} {:>10} {:>14} {:>8}".format("workers", "seconds", "points/s", "ticks"))
+    workers = 1
+    while workers <= ARGS.max_workers:
+        elapsed, ticks = asyncio.run(run(graph, workers))
+        print("{:>8} {:>10.3f} {:>14.0f} {:>8}".format(workers, elapsed, ARGS.sensors * ARGS.points / elapsed, ticks))
+        workers *= 2
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sensors", type=int, default=200)
+    parser.add_argument("--points", type=int, default=1000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count())
+    ARGS = parser.parse_args()
+    main()
@@ -0,0 +1,84 @@
+"""Expands one long snippet with the graph mode and the streaming mode, reporting time and peak memory.
+The writer only counts what it receives.
+
+Run from the TSS2RDFProcessorPy directory, e.g.
+    PYTHONPATH=src python benchmarks/streaming_benchmark.py --points 100000
+"""
+import argparse
+import asyncio
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+from rdflib import Literal
+
+from TSS2RDFProcessorPy.processor import TemplateArgs, TSS2RDFProcessorPy
+
+START = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+
+class Reader:
+    def __init__(self, message):
+        self.message = message
+
+    async def strings(self):
+        yield self.message
+
+
+class Writer:
+    def __init__(self):
+        self.messages = 0
+        self.size = 0
+
+    async def string(self, text):
+        self.messages += 1
+        self.size += len(text)
+
+    async def close(self):
+        pass
+
+
+def build_message(points):
+    array = [{"time": (START + timedelta(minutes=15 * index)).isoformat(), "value": str(index % 5000 / 100),
+              "id": "http://example.com/reading_24002042_{}".format(index)} for index in range(points)]
+    return """
+@prefix tss: <https://w3id.org/tss#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+<http://example.org/sensor/24002042> a tss:Snippet ;
+    tss:points {} ;
+    tss:about [ a tss:PointTemplate ; sosa:madeBySensor <http://example.org/sensor/24002042> ;
+                sosa:observedProperty "River Stage" ] .
+""".format(Literal(json.dumps(array)).n3())
+
+
+def run(message, **options):
+    writer = Writer()
+    proc = TSS2RDFProcessorPy(TemplateArgs(reader=Reader(message), writer=writer, **options))
+    tracemalloc.start()
+    start = time.perf_counter()
+    asyncio.run(proc.transform())
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, writer
+
+
+def main():
+    message = build_message(ARGS.points)
+    print("{} points, message of {:.1f} MB".format(ARGS.points, len(message) / 1e6))
+    modes = {"graph": {}, "streaming": {"streaming": True, "batchTriples": ARGS.batch}}
+    for name in ARGS.modes:
+        options = modes[name]
+        elapsed, peak, writer = run(message, **options)
+        print("{:>10} {:8.2f} s  peak {:8.1f} MB  {} messages, {:.1f} MB written".format(
+            name, elapsed, peak / 2 ** 20, writer.messages, writer.size / 1e6))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, default=100000)
+    parser.add_argument("--batch", type=int, default=10000)
+    parser.add_argument("--modes", nargs="+", default=["graph", "streaming"], choices=["graph", "streaming"])
+    ARGS = parser.parse_args()
+    main()
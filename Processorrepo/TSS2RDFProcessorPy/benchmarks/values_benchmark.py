@@ -0,0 +1,49 @@
+"""Times the typing of a value column value by value (value_literal, value_nt) and as a whole (value_literals,
+value_nts) for numeric, string and mixed columns.
+
+Run from the TSS2RDFProcessorPy directory, e.g.
+    PYTHONPATH=src python benchmarks/values_benchmark.py --points 100000 1000000 --distinct 1000
+"""
+import argparse
+import random
+import time
+
+from TSS2RDFProcessorPy.values import value_literal, value_literals, value_nt, value_nts
+
+
+def columns(points, distinct):
+    generator = random.Random(0)
+    numbers = [str(round(generator.uniform(-100, 100), 2)) for _ in range(distinct)]
+    strings = ["state {}".format(index) for index in range(distinct)]
+    mixed = numbers[:distinct // 2] + strings[:distinct // 2] + ["true", "false", "", "nan"]
+    for name, pool in (("numeric", numbers), ("string", strings), ("mixed", mixed)):
+        yield name, [generator.choice(pool) for _ in range(points)]
+
+
+def timed(function, values):
+    start = time.perf_counter()
+    result = function(values)
+    return time.perf_counter() - start, result
+
+
+def main():
+    print("{:>10} {:>8} {:>12} {:>12} {:>12} {:>12}".format(
+        "points", "column", "literal s", "literals s", "nt s", "nts s"))
+    for points in ARGS.points:
+        for name, values in columns(points, ARGS.distinct):
+            single, expected = timed(lambda column: [value_literal(value) for value in column], values)
+            column, result = timed(value_literals, values)
+            assert result == expected
+            single_nt, expected = timed(lambda column: [value_nt(value) for value in column], values)
+            column_nt, result = timed(value_nts, values)
+            assert result == expected
+            print("{:>10} {:>8} {:>12.3f} {:>12.3f} {:>12.3f} {:>12.3f}".format(
+                points, name, single, column, single_nt, column_nt))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--points", type=int, nargs="+", default=[100000, 1000000])
+    parser.add_argument("--distinct", type=int, default=1000, help="distinct values in a column")
+    ARGS = parser.parse_args()
+    main()
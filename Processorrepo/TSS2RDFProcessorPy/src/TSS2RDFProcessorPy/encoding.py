@@ -0,0 +1,58 @@
+import json
+import re
+from datetime import datetime, timedelta
+
+# what percent-encoding (quote with safe="") changes in the isoformat() of a datetime
+ISO_QUOTE = str.maketrans({':': '%3A', '+': '%2B'})
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+
+
+def decode_points(text) -> list:
+    """The points of a tss:points literal as {time, value, id} strings. Besides the JSON array of points this reads
+    the columnar form written by RDF2TSSProcssorPy with pointsEncoding "columnar":
+
+        {"start": "<first time>", "interval": <seconds> | "deltas": [<seconds>, ...],
+         "values": [<value>, ...], "id": "<template with {time}>" | "ids": [<id>, ...]}
+
+    {time} in the id template is the percent-encoded time, numbers are read back in their lexical form."""
+    parsed = json.loads(text, parse_float=str, parse_int=str)
+    if isinstance(parsed, list):
+        return parsed
+    return list(columnar_points(parsed))
+
+
+def iter_points(text):
+    """The points of decode_points one at a time: a JSON array is decoded point by point instead of as a whole,
+    the times and ids of the columnar form are built as the points are consumed."""
+    decoder = json.JSONDecoder(parse_float=str, parse_int=str)
+    index = WHITESPACE.match(text).end()
+    if not text.startswith('[', index):
+        yield from columnar_points(decoder.decode(text))
+        return
+    index = WHITESPACE.match(text, index + 1).end()
+    if text.startswith(']', index):
+        return
+    while True:
+        point, index = decoder.raw_decode(text, index)
+        yield point
+        index = WHITESPACE.match(text, index).end()
+        if text.startswith(']', index):
+            return
+        if not text.startswith(',', index):
+            raise ValueError("Expecting ',' delimiter in tss:points at {}".format(index))
+        index = WHITESPACE.match(text, index + 1).end()
+
+
+def columnar_points(parsed):
+    time = datetime.fromisoformat(parsed['start'])
+    values = parsed['values']
+    step = timedelta(seconds=float(parsed['interval'])) if 'interval' in parsed else None
+    deltas = parsed.get('deltas', ())
+    template = parsed.get('id')
+    ids = parsed.get('ids')
+    for index, value in enumerate(values):
+        if index:
+            time += step if step is not None else timedelta(seconds=float(deltas[index - 1]))
+        lexical = time.isoformat()
+        id_ = template.replace('{time}', lexical.translate(ISO_QUOTE)) if template is not None else ids[index]
+        yield {'time': lexical, 'value': value, 'id': id_}
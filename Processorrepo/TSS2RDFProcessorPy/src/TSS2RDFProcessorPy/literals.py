@@ -0,0 +1,80 @@
+import re
+import uuid
+
+from rdflib import Graph, Literal
+
+# strings longer than this are taken out of the Turtle before rdflib parses it
+LONG_LITERAL = 4096
+
+# the tokens in which a quote does not start a string: IRIs and comments, then the four string forms.
+# The quantifiers are possessive, so matching a long string keeps no backtracking state per escape.
+TOKENS = re.compile(
+    r'<[^>\s]*+>'
+    r'|#[^\n\r]*+'
+    r'|"""[^"\\]*+(?:(?:\\[\s\S]|"(?!""))[^"\\]*+)*+"""'
+    r"|'''[^'\\]*+(?:(?:\\[\s\S]|'(?!''))[^'\\]*+)*+'''"
+    r'|"[^"\\\n\r]*+(?:\\.[^"\\\n\r]*+)*+"'
+    r"|'[^'\\\n\r]*+(?:\\.[^'\\\n\r]*+)*+'")
+ESCAPE = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))', re.DOTALL)
+OTHER_ESCAPE = re.compile(r'\\[^"\\]')
+ECHAR = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+
+def parse_message(text: str) -> Graph:
+    """Parse a Turtle message, reading its long string literals (the tss:points of big snippets) without rdflib.
+
+    rdflib's Turtle parser copies the string read so far for every escape in a literal, which makes a JSON literal
+    with its escaped quotes quadratic to parse. The long literals are swapped for short placeholders, the rest is
+    parsed by rdflib and the placeholders are replaced by the unescaped literals afterwards."""
+    long_literals = {}
+    parts = []
+    end = 0
+    for match in TOKENS.finditer(text):
+        token = match.group()
+        if len(token) <= LONG_LITERAL or token[0] not in '"\'':
+            continue
+        quotes = 3 if token[:3] in ('"""', "'''") else 1
+        placeholder = "tss-literal-{}".format(uuid.uuid4().hex)
+        long_literals[placeholder] = unescape(token[quotes:-quotes])
+        parts += (text[end:match.start()], '"', placeholder, '"')
+        end = match.end()
+    graph = Graph()
+    if not long_literals:
+        graph.parse(data=text, format="turtle")
+        return graph
+    parts.append(text[end:])
+    try:
+        graph.parse(data="".join(parts), format="turtle")
+    except Exception:
+        # the tokens were not read the way rdflib reads them, leave it all to rdflib
+        graph = Graph()
+        graph.parse(data=text, format="turtle")
+        return graph
+    found = 0
+    for s, p, o in list(graph):
+        if isinstance(o, Literal) and str(o) in long_literals:
+            graph.remove((s, p, o))
+            graph.add((s, p, Literal(long_literals[str(o)], lang=o.language, datatype=o.datatype)))
+            found += 1
+    if found != len(long_literals):
+        # a placeholder ended up somewhere other than an object, leave it all to rdflib
+        graph = Graph()
+        graph.parse(data=text, format="turtle")
+    return graph
+
+
+def unescape(value: str) -> str:
+    if '\\' not in value:
+        return value
+    if OTHER_ESCAPE.search(value) is None:
+        # only escaped quotes and backslashes, as in serialized JSON, replaced without a call per escape
+        return '\\'.join(part.replace('\\"', '"') for part in value.split('\\\\'))
+    return ESCAPE.sub(replace_escape, value)
+
+
+def replace_escape(match) -> str:
+    if match.group(3) is not None:
+        if match.group(3) not in ECHAR:
+            raise ValueError("Invalid escape \\{} in a string literal".format(match.group(3)))
+        return ECHAR[match.group(3)]
+    return chr(int(match.group(1) or match.group(2), 16))
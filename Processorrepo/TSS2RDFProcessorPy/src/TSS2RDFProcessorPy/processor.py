@@ -1,4 +1,6 @@
 import logging
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from logging import getLogger, Logger
 
@@ -7,15 +9,61 @@ from rdflib import Graph,URIRef,Namespace,BNode,Literal
 from rdflib.namespace import XSD,RDF
 import pandas as pd
 import argparse
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import islice
 from datetime import datetime
 import json
+from .encoding import decode_points, iter_points
+from .literals import parse_message
+from .values import nt_iri, nt_string, nt_term, value_literals, value_nts
 
 # --- Type Definitions ---
 @dataclass
 class TemplateArgs(ProcessorArgs):
     reader: Reader
     writer: Writer
+    streaming: bool = False
+    batchTriples: int = 10000
+    workers: int = 1
+
+
+TYPE_NT = "<http://www.w3.org/1999/02/22-rdf-syntax-ns#type> <http://www.w3.org/ns/sosa/Observation> .\n"
+RESULT_TIME_NT = "<http://www.w3.org/ns/sosa/resultTime>"
+SIMPLE_RESULT_NT = "<http://www.w3.org/ns/sosa/hasSimpleResult>"
+DATETIME_NT = "^^<http://www.w3.org/2001/XMLSchema#dateTime>"
+# points whose values are typed together while streaming
+TYPING_CHUNK = 4096
+
+
+def expand_points(points, template):
+    # (N-Triples lines, number of triples) per point of a tss:points literal, template holds the " p o .\n" lines
+    points = iter_points(points)
+    while chunk := list(islice(points, TYPING_CHUNK)):
+        values = value_nts([point['value'] for point in chunk])
+        for point, value in zip(chunk, values):
+            subject = nt_iri(point['id'])
+            lines = (subject + " " + TYPE_NT
+                     + subject + " " + RESULT_TIME_NT + " " + nt_string(point['time']) + DATETIME_NT + " .\n"
+                     + subject + " " + SIMPLE_RESULT_NT + " " + value + " .\n")
+            lines += "".join(subject + line for line in template)
+            yield lines, 3 + len(template)
+
+
+def _expand_snippet(points, template, batch_triples) -> list:
+    # runs in the pool: the N-Triples of a snippet cut into (text, number of triples) pieces of at most batch_triples
+    pieces = []
+    batch = []
+    triples = 0
+    for lines, count in expand_points(points, template):
+        if batch and triples + count > batch_triples:
+            pieces.append(("".join(batch), triples))
+            batch = []
+            triples = 0
+        batch.append(lines)
+        triples += count
+    if batch:
+        pieces.append(("".join(batch), triples))
+    return pieces
 
 
 # --- Processor Implementation ---
@@ -25,23 +73,93 @@ class TSS2RDFProcessorPy(Processor[TemplateArgs]):
     def __init__(self, args: TemplateArgs):
         super().__init__(args)
         self.finalGraph: Graph | None = None
+        self.pool: ProcessPoolExecutor | None = None
         self.logger.debug(msg="Created TemplateProcessor with args: {}".format(args))
 
     async def init(self) -> None:
         
         self.logger.debug("Initializing TemplateProcessor with args: {}", self.args)
+        if self.args.workers > 1:
+            if self.args.streaming:
+                self.pool = ProcessPoolExecutor(max_workers=self.args.workers)
+            else:
+                # the graph mode builds one rdflib graph in this process, reading the triples back costs more than expanding them
+                self.logger.warning("workers is only used with streaming, expanding snippets in this process")
 
     async def transform(self) -> None:
-        
+
+        if self.args.streaming:
+            await self.transform_streaming()
+            return
+
         datagraph = Graph()
         async for msg in self.args.reader.strings():
-            datagraph.parse(data=msg, format="turtle")
+            datagraph += parse_message(msg)
             self.finalGraph = self.CreateRDF(datagraph)
             await self.args.writer.string(self.finalGraph.serialize(format="turtle"))
         
         await self.args.writer.close()
 
-        
+
+    async def transform_streaming(self) -> None:
+        # every message is expanded on its own and written as N-Triples, at most batchTriples triples per message
+        # unless a single point has more
+        try:
+            async for msg in self.args.reader.strings():
+                graph = parse_message(msg)
+                if self.pool:
+                    await self.stream_parallel(graph)
+                    continue
+                batch = []
+                triples = 0
+                for lines, count in self.StreamRDF(graph):
+                    if batch and triples + count > self.args.batchTriples:
+                        await self.args.writer.string("".join(batch))
+                        batch = []
+                        triples = 0
+                    batch.append(lines)
+                    triples += count
+                if batch:
+                    await self.args.writer.string("".join(batch))
+        finally:
+            if self.pool:
+                # waiting for the workers to exit blocks, so it is done off the event loop
+                await asyncio.get_running_loop().run_in_executor(None, self.pool.shutdown)
+        await self.args.writer.close()
+
+    async def stream_parallel(self, graph) -> None:
+        # snippets are expanded across the pool and written in the order StreamRDF has them,
+        # pieces of consecutive snippets are joined as long as they stay within batchTriples.
+        # At most workers snippets are in flight, so only their pieces are held in memory
+        loop = asyncio.get_running_loop()
+        jobs = self.SnippetJobs(graph)
+        running = deque()
+
+        def submit(count):
+            for points, template in islice(jobs, count):
+                running.append(loop.run_in_executor(self.pool, _expand_snippet, points, template,
+                                                    self.args.batchTriples))
+
+        submit(self.args.workers)
+        batch = []
+        triples = 0
+        try:
+            while running:
+                pieces = await running.popleft()
+                submit(1)
+                for text, count in pieces:
+                    if batch and triples + count > self.args.batchTriples:
+                        await self.args.writer.string("".join(batch))
+                        batch = []
+                        triples = 0
+                    batch.append(text)
+                    triples += count
+        finally:
+            for future in running:
+                future.cancel()
+        if batch:
+            await self.args.writer.string("".join(batch))
+
     async def produce(self) -> None:
         """Function to start the production of data, starting the pipeline.
         This function is called after all processors are completely set up."""
@@ -49,6 +167,28 @@ class TSS2RDFProcessorPy(Processor[TemplateArgs]):
 
 #####################################################################################
 
+    def StreamRDF(self,graph):
+        # (N-Triples lines, number of triples) per point, without a graph for the result
+        for points, template in self.SnippetJobs(graph):
+            yield from expand_points(points, template)
+
+    def SnippetJobs(self,graph):
+        # (tss:points literal, about template as N-Triples lines) per points literal of every snippet,
+        # plain strings that can be expanded in another process
+        tss_points = URIRef("https://w3id.org/tss#points")
+        tss_about = URIRef("https://w3id.org/tss#about")
+        tss_Snippet = URIRef("https://w3id.org/tss#Snippet")
+        tss_PointTemplate = URIRef("https://w3id.org/tss#PointTemplate")
+
+        for subj in graph.subjects(RDF.type, tss_Snippet, unique=True):
+            # the template is the same for all points of the snippet, so it is written out once
+            template = [" {} {} .\n".format(nt_term(aboutP), nt_term(aboutO))
+                        for about in graph.objects(subj, tss_about)
+                        for aboutP, aboutO in graph.predicate_objects(about)
+                        if aboutO != tss_PointTemplate]
+            for obj in graph.objects(subj, tss_points):
+                yield str(obj), template
+
     def CreateRDF(self,graph):
         # Nested dict: subject -> predicate -> list of objects
         #results = defaultdict(lambda: defaultdict(list))
@@ -65,74 +205,35 @@ class TSS2RDFProcessorPy(Processor[TemplateArgs]):
         final_graph.bind('xsd', prefix_xsd)
         print('Started creating final graph')
 
-        snippet_id_dic = {} #this dictionary is designed to bind snippet subject to point id from array. 
-
-        get_snippet_query = '''
-        PREFIX sosa: <http://www.w3.org/ns/sosa/>
-        PREFIX tss:  <https://w3id.org/tss#>
-        PREFIX rdf:  <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX xsd:  <http://www.w3.org/2001/XMLSchema#>
-
-        SELECT ?snippet ?P ?O ?about ?aboutP ?aboutO
-        WHERE {
-        ?snippet a tss:Snippet .
-        ?snippet ?P ?O .
-
-        OPTIONAL {
-            ?snippet tss:about ?about .
-            ?about ?aboutP ?aboutO .
-        }
-        }
-
-                '''
         tss_points = URIRef("https://w3id.org/tss#points")
+        tss_about = URIRef("https://w3id.org/tss#about")
         tss_Snippet = URIRef("https://w3id.org/tss#Snippet")
         tss_PointTemplate = URIRef("https://w3id.org/tss#PointTemplate")
 
-
-        for subj, pred, obj, about, aboutP, aboutO in graph.query(get_snippet_query):
-            # store snippet triples
-            if subj and pred and obj:
-                if pred == tss_points: #this is where i should focus on derefrencing the json object
-                    #results[subj][pred].append(obj)
-                    parsed = json.loads(str(obj)) #json array
-                    for point in parsed:
-                        json_id = point['id']
-                        json_time = point['time']
-                        json_value = point['value']
-                        #now convert them from strings and add them to final graph
-                        json_time = Literal(json_time,datatype=XSD.dateTime)
-                        
-                        if str(json_value) in ["true", "false"]:
-                            json_value = Literal(json_value.lower(), datatype=XSD.boolean)
-                        else:
-                            try:
-                                json_value = Literal(float(json_value), datatype=XSD.decimal)  # Attempt to convert to a number
-                            except ValueError:
-                                json_value = Literal(json_value, datatype=XSD.string) # If it's not a number, store it as a string
-
-                        #json_value = Literal(json_value,datatype=XSD.decimal) #it is not always a decimal. sometimes it is a boolean value. it is replaced with the if else block above.
-                        json_id = URIRef(json_id)
-
-                        snippet_id_dic[json_id] = subj  #the dictionary is mapped in reverse because json_id is unique, subject is not.
-                        final_graph.add((json_id,URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"),URIRef("http://www.w3.org/ns/sosa/Observation")))
-                        final_graph.add((json_id,URIRef("http://www.w3.org/ns/sosa/resultTime"),json_time))
-                        final_graph.add((json_id,URIRef("http://www.w3.org/ns/sosa/hasSimpleResult"),json_value))
-
-                    #final_graph.add((subj, pred, obj)) #instead of adding the entire json object, will break it down and add each element as object.
-                    
-                if obj == tss_Snippet:
-                    continue
-
-            # # store about triples
-            if about and aboutP and aboutO:
-                if aboutO != tss_PointTemplate:
-                #results[subj][aboutP].append(aboutO)
-                #final_graph.add((subj, aboutP, aboutO))
-                    for key,value in snippet_id_dic.items():
-                        #remember key id of reading, value is subject snippet
-                        if subj==URIRef(value):
-                            final_graph.add((key, aboutP, aboutO))
+        # every snippet is read once: its template first, then its points, so the cost follows the number of points
+        for subj in graph.subjects(RDF.type, tss_Snippet, unique=True):
+            template = [(aboutP, aboutO)
+                        for about in graph.objects(subj, tss_about)
+                        for aboutP, aboutO in graph.predicate_objects(about)
+                        if aboutO != tss_PointTemplate]
+            for obj in graph.objects(subj, tss_points):
+                parsed = decode_points(str(obj)) #json array or columnar points
+                # the value column of the snippet is typed as a whole: xsd:boolean, xsd:decimal or xsd:string
+                values = value_literals([point['value'] for point in parsed])
+                for point, json_value in zip(parsed, values):
+                    json_id = point['id']
+                    json_time = point['time']
+                    #now convert them from strings and add them to final graph
+                    json_time = Literal(json_time,datatype=XSD.dateTime)
+
+                    json_id = URIRef(json_id)
+
+                    final_graph.add((json_id,URIRef("http://www.w3.org/1999/02/22-rdf-syntax-ns#type"),URIRef("http://www.w3.org/ns/sosa/Observation")))
+                    final_graph.add((json_id,URIRef("http://www.w3.org/ns/sosa/resultTime"),json_time))
+                    final_graph.add((json_id,URIRef("http://www.w3.org/ns/sosa/hasSimpleResult"),json_value))
+                    # the about template of the snippet holds for each of its points
+                    for aboutP, aboutO in template:
+                        final_graph.add((json_id, aboutP, aboutO))
 
         print('Final graph created successfully')
         return final_graph
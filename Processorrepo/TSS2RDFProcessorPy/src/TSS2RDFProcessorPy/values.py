@@ -0,0 +1,150 @@
+import re
+
+import numpy as np
+from rdflib import Literal, URIRef
+from rdflib.namespace import XSD
+
+BOOLEAN, DECIMAL, STRING = 0, 1, 2
+
+SPECIAL_FLOATS = {"nan": "NaN", "inf": "INF", "-inf": "-INF"}
+
+# the ASCII strings float() accepts: surrounding whitespace, underscores between digits, nan and inf(inity) in any case
+DIGITS = r'[0-9](?:_?[0-9])*'
+NUMBER = re.compile(
+    r'[ \t\n\x0b\x0c\r]*[+-]?'
+    r'(?:(?:' + DIGITS + r'(?:\.(?:' + DIGITS + r')?)?|\.' + DIGITS + r')(?:[eE][+-]?' + DIGITS + r')?'
+    r'|(?i:nan|inf|infinity))'
+    r'[ \t\n\x0b\x0c\r]*')
+
+
+def nt_string(value: str) -> str:
+    # the escapes of rdflib's N-Triples serializer
+    return '"' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n').replace('\r', '\\r') + '"'
+
+
+# the characters an N-Triples IRIREF only holds as \u escapes: controls, space and <>"{}|^`\
+IRI_ESCAPES = {char: "\\u{:04X}".format(char) for char in [*range(0x21), *map(ord, '<>"{}|^`\\')]}
+
+
+def nt_iri(value: str) -> str:
+    # parsers read the escapes back to the characters of the IRI
+    return "<" + value.translate(IRI_ESCAPES) + ">"
+
+
+def nt_term(term) -> str:
+    # the N-Triples form of an rdflib term, n3() writes long literals as Turtle """...""" strings
+    if isinstance(term, URIRef):
+        return nt_iri(term)
+    if isinstance(term, Literal):
+        if term.language:
+            return nt_string(term) + "@" + term.language
+        if term.datatype:
+            return nt_string(term) + "^^" + nt_iri(term.datatype)
+        return nt_string(term)
+    return term.n3()
+
+
+def value_literal(value) -> Literal:
+    # the literal of a single point value: xsd:boolean for "true"/"false", xsd:decimal when float() reads it,
+    # xsd:string otherwise
+    if str(value) in ["true", "false"]:
+        return Literal(value.lower(), datatype=XSD.boolean)
+    try:
+        return Literal(float(value), datatype=XSD.decimal)
+    except ValueError:
+        return Literal(value, datatype=XSD.string)
+
+
+def value_nt(value) -> str:
+    # value_literal in N-Triples
+    if str(value) in ["true", "false"]:
+        return nt_string(value.lower()) + "^^<http://www.w3.org/2001/XMLSchema#boolean>"
+    try:
+        number = float(value)
+    except ValueError:
+        return nt_string(value) + "^^<http://www.w3.org/2001/XMLSchema#string>"
+    return decimal_nt(str(number))
+
+
+def decimal_nt(lexical: str) -> str:
+    # str() of the float, as Literal(float(value), datatype=XSD.decimal) has it, with the XSD names of the special values
+    return '"' + SPECIAL_FLOATS.get(lexical, lexical) + '"^^<http://www.w3.org/2001/XMLSchema#decimal>'
+
+
+def classify(uniques: list) -> tuple:
+    """The kind (BOOLEAN, DECIMAL or STRING) of every distinct value string and, for the DECIMAL ones, its float.
+
+    The column is converted by numpy at once, with the same reading as float(). Only when that fails on a string
+    are the values matched one by one against the grammar of float(), which needs no exception per value."""
+    column = np.array(uniques, dtype=object)
+    kinds = np.full(len(uniques), STRING, dtype=np.int8)
+    numbers = np.full(len(uniques), np.nan)
+    boolean = (column == "true") | (column == "false")
+    kinds[boolean] = BOOLEAN
+    rest = np.flatnonzero(~boolean)
+    try:
+        numbers[rest] = column[rest].astype(np.float64)
+        kinds[rest] = DECIMAL
+        return kinds, numbers
+    except ValueError:
+        pass
+    numeric = [index for index in rest.tolist()
+               if NUMBER.fullmatch(uniques[index]) or (not uniques[index].isascii() and is_float(uniques[index]))]
+    if numeric:
+        numbers[numeric] = column[numeric].astype(np.float64)
+        kinds[numeric] = DECIMAL
+    return kinds, numbers
+
+
+def is_float(value: str) -> bool:
+    # other Unicode digits and spaces are rare enough to leave to float() itself
+    try:
+        float(value)
+        return True
+    except ValueError:
+        return False
+
+
+def distinct(values) -> list | None:
+    # the distinct values, or None when they are not all strings and have to be typed one by one
+    try:
+        uniques = list(dict.fromkeys(values))
+    except TypeError:
+        return None
+    if any(type(value) is not str for value in uniques):
+        return None
+    return uniques
+
+
+def value_literals(values) -> list:
+    """value_literal of every value of a column, with one literal made per distinct value."""
+    uniques = distinct(values)
+    if uniques is None:
+        return [value_literal(value) for value in values]
+    kinds, numbers = classify(uniques)
+    literals = {}
+    for value, kind, number in zip(uniques, kinds.tolist(), numbers.tolist()):
+        if kind == BOOLEAN:
+            literals[value] = Literal(value, datatype=XSD.boolean)
+        elif kind == DECIMAL:
+            literals[value] = Literal(number, datatype=XSD.decimal)
+        else:
+            literals[value] = Literal(value, datatype=XSD.string)
+    return list(map(literals.__getitem__, values))
+
+
+def value_nts(values) -> list:
+    """value_nt of every value of a column, with the lexical forms of the numbers made in one go."""
+    uniques = distinct(values)
+    if uniques is None:
+        return [value_nt(value) for value in values]
+    kinds, numbers = classify(uniques)
+    decimal = kinds == DECIMAL
+    lexicals = dict(zip((value for value, numeric in zip(uniques, decimal.tolist()) if numeric),
+                        map(decimal_nt, map(str, numbers[decimal].tolist()))))
+    for value, kind in zip(uniques, kinds.tolist()):
+        if kind == BOOLEAN:
+            lexicals[value] = nt_string(value) + "^^<http://www.w3.org/2001/XMLSchema#boolean>"
+        elif kind == STRING:
+            lexicals[value] = nt_string(value) + "^^<http://www.w3.org/2001/XMLSchema#string>"
+    return list(map(lexicals.__getitem__, values))
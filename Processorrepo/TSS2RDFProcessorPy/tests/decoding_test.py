@@ -0,0 +1,74 @@
+import json
+from unittest.mock import AsyncMock
+
+from rdflib import Graph, Literal, Namespace, URIRef
+from rdflib.compare import isomorphic
+from rdflib.namespace import RDF, XSD
+
+import TSS2RDFProcessorPy.processor as processor
+
+SOSA = Namespace("http://www.w3.org/ns/sosa/")
+TSS = Namespace("https://w3id.org/tss#")
+
+
+def snippet(sensor, count, extra=""):
+    points = [{"time": "2025-08-12T{:02d}:{:02d}:00+00:00".format(i // 60, i % 60), "value": str(i % 7 * 1.5),
+               "id": "http://example.com/reading_{}_{}".format(sensor, i)} for i in range(count)]
+    return """
+<http://example.org/sensor/{0}> a tss:Snippet ;
+    tss:points {1} ;
+    tss:from "2025-08-12T00:00:00+00:00"^^xsd:dateTime ;
+    tss:about [ a tss:PointTemplate ; sosa:madeBySensor <http://example.org/sensor/{0}> ;
+                sosa:observedProperty "River Stage" {2} ] .
+""".format(sensor, Literal(json.dumps(points)).n3(), extra)
+
+
+DATA = """
+@prefix tss: <https://w3id.org/tss#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+""" + snippet(1, 5) + snippet(2, 3, '; a <http://example.com/Extra>') + snippet(3, 0)
+
+
+def sparql_create_rdf(graph):
+    # the decoder before snippets were indexed, one row per snippet triple and about triple
+    query = """
+    PREFIX tss: <https://w3id.org/tss#>
+    SELECT ?snippet ?P ?O ?about ?aboutP ?aboutO
+    WHERE { ?snippet a tss:Snippet . ?snippet ?P ?O .
+            OPTIONAL { ?snippet tss:about ?about . ?about ?aboutP ?aboutO . } }"""
+    result = Graph()
+    snippet_id_dic = {}
+    for subj, pred, obj, about, aboutP, aboutO in graph.query(query):
+        if pred == TSS.points:
+            for point in json.loads(str(obj)):
+                value = point['value']
+                if value in ["true", "false"]:
+                    value = Literal(value.lower(), datatype=XSD.boolean)
+                else:
+                    try:
+                        value = Literal(float(value), datatype=XSD.decimal)
+                    except ValueError:
+                        value = Literal(value, datatype=XSD.string)
+                snippet_id_dic[URIRef(point['id'])] = subj
+                result.add((URIRef(point['id']), RDF.type, SOSA.Observation))
+                result.add((URIRef(point['id']), SOSA.resultTime, Literal(point['time'], datatype=XSD.dateTime)))
+                result.add((URIRef(point['id']), SOSA.hasSimpleResult, value))
+        if about and aboutP and aboutO and aboutO != TSS.PointTemplate:
+            for key, value in snippet_id_dic.items():
+                if subj == value:
+                    result.add((key, aboutP, aboutO))
+    return result
+
+
+def test_indexed_decoding_matches_the_query_rows():
+    graph = Graph().parse(data=DATA, format="turtle")
+    proc = processor.TSS2RDFProcessorPy(processor.TemplateArgs(reader=None, writer=AsyncMock()))
+    result = proc.CreateRDF(graph)
+    expected = sparql_create_rdf(graph)
+    assert len(result) == len(expected) == 5 * 5 + 3 * 6
+    assert isomorphic(result, expected)
+    reading = URIRef("http://example.com/reading_2_0")
+    assert (reading, RDF.type, URIRef("http://example.com/Extra")) in result
+    assert (reading, SOSA.madeBySensor, URIRef("http://example.org/sensor/2")) in result
+    assert (URIRef("http://example.com/reading_1_0"), RDF.type, URIRef("http://example.com/Extra")) not in result
@@ -0,0 +1,54 @@
+import json
+from unittest.mock import AsyncMock
+
+from rdflib import Graph, Literal
+from rdflib.compare import isomorphic
+
+import TSS2RDFProcessorPy.processor as processor
+from TSS2RDFProcessorPy.encoding import decode_points
+
+POINTS = [
+    {"time": "2025-08-12T12:00:00+00:00", "value": "34.54",
+     "id": "http://example.com/reading_24002042_2025-08-12T12%3A00%3A00%2B00%3A00"},
+    {"time": "2025-08-12T12:15:00+00:00", "value": "-1.5E2",
+     "id": "http://example.com/reading_24002042_2025-08-12T12%3A15%3A00%2B00%3A00"},
+    {"time": "2025-08-12T12:30:00+00:00", "value": "true",
+     "id": "http://example.com/reading_24002042_2025-08-12T12%3A30%3A00%2B00%3A00"},
+]
+
+COLUMNAR = ('{"start":"2025-08-12T12:00:00+00:00","interval":900,"values":[34.54,-1.5E2,"true"],'
+            '"id":"http://example.com/reading_24002042_{time}"}')
+
+IRREGULAR = [
+    {"time": "2025-08-12T12:00:00+02:00", "value": "1", "id": "http://example.com/a"},
+    {"time": "2025-08-12T12:01:00.500000+02:00", "value": "text", "id": "http://example.com/b"},
+]
+
+IRREGULAR_COLUMNAR = ('{"start":"2025-08-12T12:00:00+02:00","deltas":[60.5],"values":[1,"text"],'
+                      '"ids":["http://example.com/a","http://example.com/b"]}')
+
+
+def snippet(points):
+    return """
+@prefix tss: <https://w3id.org/tss#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+<http://example.org/sensor/24002042> a tss:Snippet ;
+    tss:points {} ;
+    tss:about [ a tss:PointTemplate ; sosa:madeBySensor <http://example.org/sensor/24002042> ;
+                sosa:observedProperty "River Stage" ] .
+""".format(Literal(points).n3())
+
+
+def test_decode_columnar_points():
+    assert decode_points(COLUMNAR) == POINTS
+    assert decode_points(IRREGULAR_COLUMNAR) == IRREGULAR
+    assert decode_points(json.dumps(POINTS)) == POINTS
+
+
+def test_columnar_snippet_gives_the_same_rdf():
+    proc = processor.TSS2RDFProcessorPy(processor.TemplateArgs(reader=None, writer=AsyncMock()))
+    for array, columnar in ((POINTS, COLUMNAR), (IRREGULAR, IRREGULAR_COLUMNAR)):
+        expected = proc.CreateRDF(Graph().parse(data=snippet(json.dumps(array)), format="turtle"))
+        result = proc.CreateRDF(Graph().parse(data=snippet(columnar), format="turtle"))
+        assert len(result) == len(expected) > 0
+        assert isomorphic(result, expected)
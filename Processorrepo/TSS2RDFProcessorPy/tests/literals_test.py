@@ -0,0 +1,46 @@
+import json
+
+import pytest
+from rdflib import Graph
+from rdflib.compare import isomorphic
+
+import TSS2RDFProcessorPy.literals as literals
+from TSS2RDFProcessorPy.literals import parse_message, unescape
+
+POINTS = json.dumps([{"time": "2025-08-12T12:00:00+00:00", "value": str(i), "id": "http://example.com/r_{}".format(i)}
+                     for i in range(200)])
+
+MESSAGES = [
+    # the way rdflib's Turtle serializer writes a JSON literal
+    """@prefix tss: <https://w3id.org/tss#> .
+<http://example.org/s#1> a tss:Snippet ; tss:points "{}" .""".format(POINTS.replace('\\', '\\\\').replace('"', '\\"')),
+    # long strings, language tags, datatypes, unicode escapes and quotes in comments and IRIs
+    "@prefix ex: <http://example.com/> .\n"
+    "# don't read \"this\" as a string\n"
+    'ex:a ex:long """multi\nline "quoted" \\u00e9 \\U0001F600 text with \\"escapes\\" and \' single""" ;\n'
+    "    ex:single 'it\\'s \"fine\"'@en ;\n"
+    '    ex:typed "1.5"^^<http://www.w3.org/2001/XMLSchema#decimal> ;\n'
+    "    ex:list ( \"one\" 'two' ) ;\n"
+    '    ex:tab "a\\tb\\\\c" .\n'
+    "<http://example.com/with#hash> ex:p ex:o .\n",
+    # a long string ending in a quote, left to rdflib
+    '''<http://a> <http://b> """ends with a quote"""" .''',
+    '''<http://a> <http://b> "no long literals" .''',
+]
+
+
+@pytest.mark.parametrize("limit", [0, 4096])
+@pytest.mark.parametrize("text", MESSAGES)
+def test_parse_message_matches_rdflib(monkeypatch, limit, text):
+    monkeypatch.setattr(literals, "LONG_LITERAL", limit)
+    expected = Graph().parse(data=text, format="turtle")
+    result = parse_message(text)
+    assert len(result) == len(expected)
+    assert isomorphic(result, expected)
+
+
+def test_unescape():
+    assert unescape('a\\"b\\\\n\\n\\u00e9\\U0001F600') == 'a"b\\n\né\U0001F600'
+    assert unescape('x\\\\\\"y \\\\ \\"') == 'x\\"y \\ "'
+    with pytest.raises(ValueError):
+        unescape("\\q")
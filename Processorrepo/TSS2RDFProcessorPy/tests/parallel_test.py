@@ -0,0 +1,133 @@
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import AsyncMock
+
+import pytest
+from rdflib import Literal
+
+import TSS2RDFProcessorPy.processor as processor
+
+PREFIXES = """
+@prefix tss: <https://w3id.org/tss#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix ex: <http://example.com/> .
+"""
+
+
+def snippet(sensor, count):
+    points = [{"time": "2025-08-12T{:02d}:{:02d}:00+00:00".format(i // 60 % 24, i % 60), "value": str(i % 5 * 0.5),
+               "id": "http://example.com/reading_{}_{}".format(sensor, i)} for i in range(count)]
+    return """
+ex:snippet{0} a tss:Snippet ;
+    tss:points {1} ;
+    tss:about [ a tss:PointTemplate ; sosa:madeBySensor ex:sensor{0} ; sosa:observedProperty "River Stage" ] .
+""".format(sensor, Literal(json.dumps(points)).n3())
+
+
+MESSAGES = [PREFIXES + "".join(snippet(sensor, 3 + sensor * 7) for sensor in range(8)),
+            PREFIXES + snippet(8, 0) + snippet(9, 40)]
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+async def run(messages, **options):
+    writer = AsyncMock()
+    proc = processor.TSS2RDFProcessorPy(processor.TemplateArgs(reader=DummyReader(messages), writer=writer, **options))
+    await proc.init()
+    await proc.transform()
+    writer.close.assert_awaited_once()
+    return proc, [call.args[0] for call in writer.string.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_pool_writes_the_sequential_output():
+    _, sequential = await run(MESSAGES, streaming=True)
+    proc, parallel = await run(MESSAGES, streaming=True, workers=3)
+    assert proc.pool is not None
+    # the same triples in the same order, the snippets of a message are merged in graph order
+    assert "".join(parallel) == "".join(sequential)
+
+
+@pytest.mark.asyncio
+async def test_pool_batches_are_bounded():
+    _, parallel = await run(MESSAGES, streaming=True, workers=2, batchTriples=20)
+    _, sequential = await run(MESSAGES, streaming=True)
+    assert len(parallel) > 10
+    # whole points of 5 triples, at most batchTriples
+    assert all(text.count("\n") % 5 == 0 and text.count("\n") <= 20 for text in parallel)
+    assert "".join(parallel) == "".join(sequential)
+
+
+@pytest.mark.asyncio
+async def test_graph_mode_does_not_start_a_pool():
+    proc, graph = await run(MESSAGES, workers=2)
+    assert proc.pool is None
+    assert len(graph) == 2
+
+
+@pytest.mark.asyncio
+async def test_event_loop_runs_while_the_pool_expands():
+    ticks = 0
+    done = False
+
+    async def ticker():
+        nonlocal ticks
+        while not done:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(ticker())
+    await run([PREFIXES + "".join(snippet(sensor, 2000) for sensor in range(4))], streaming=True, workers=2)
+    done = True
+    await task
+    assert ticks > 10
+
+
+class CountingPool(ThreadPoolExecutor):
+    """Runs the snippet jobs in threads and counts how many were submitted."""
+
+    def __init__(self):
+        super().__init__(max_workers=2)
+        self.submitted = 0
+
+    def submit(self, fn, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(fn, *args, **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_pool_holds_at_most_workers_snippets_in_flight():
+    writer = AsyncMock()
+    proc = processor.TSS2RDFProcessorPy(processor.TemplateArgs(reader=DummyReader(MESSAGES[:1]), writer=writer,
+                                                               streaming=True, workers=2, batchTriples=1))
+    await proc.init()
+    proc.pool.shutdown()
+    proc.pool = CountingPool()
+    submitted = []
+    writer.string.side_effect = lambda text: submitted.append(proc.pool.submitted)
+    await proc.transform()
+    # the first of the 8 snippets is written while the next two are expanded
+    assert submitted[0] == 3
+    assert proc.pool.submitted == 8
+
+
+@pytest.mark.asyncio
+async def test_pool_is_shut_down_when_a_snippet_fails():
+    broken = PREFIXES + snippet(0, 3) + 'ex:broken a tss:Snippet ; tss:points "[{]" .\n'
+    proc = processor.TSS2RDFProcessorPy(processor.TemplateArgs(reader=DummyReader([broken]), writer=AsyncMock(),
+                                                               streaming=True, workers=2))
+    await proc.init()
+    with pytest.raises(ValueError):
+        await proc.transform()
+    with pytest.raises(RuntimeError):
+        proc.pool.submit(int)
@@ -0,0 +1,118 @@
+import json
+from unittest.mock import AsyncMock
+
+import pytest
+from rdflib import Graph, Literal, URIRef
+from rdflib.compare import isomorphic
+
+import TSS2RDFProcessorPy.processor as processor
+from TSS2RDFProcessorPy.encoding import decode_points, iter_points
+
+PREFIXES = """
+@prefix tss: <https://w3id.org/tss#> .
+@prefix sosa: <http://www.w3.org/ns/sosa/> .
+@prefix ex: <http://example.com/> .
+"""
+
+VALUES = ["34.54", "-1.5E2", "0", "true", "false", "TRUE", "NaN", "-inf", "", "a \"quoted\"\nline", "back\\slash"]
+
+
+def snippet(sensor, points, about='sosa:madeBySensor ex:sensor{0} ; sosa:observedProperty "River Stage"'):
+    return """
+ex:snippet{0} a tss:Snippet ;
+    tss:points {1} ;
+    tss:about [ a tss:PointTemplate ; {2} ] .
+""".format(sensor, Literal(points).n3(), about.format(sensor))
+
+
+def array(sensor, values):
+    return json.dumps([{"time": "2025-08-12T12:{:02d}:00+00:00".format(i), "value": value,
+                        "id": "http://example.com/reading_{}_{}".format(sensor, i)} for i, value in enumerate(values)])
+
+
+COLUMNAR = ('{"start":"2025-08-12T12:00:00+00:00","interval":900,"values":[34.54,-1.5E2,"true"],'
+            '"id":"http://example.com/reading_3_{time}"}')
+
+MESSAGES = [
+    PREFIXES + snippet(1, array(1, VALUES)) + snippet(2, array(2, ["1", "2"]), 'sosa:hasFeatureOfInterest [ ex:name "x" ]'),
+    PREFIXES + snippet(3, COLUMNAR) + snippet(4, "[]"),
+]
+
+
+class DummyReader:
+    """A dummy async reader that yields a sequence of strings."""
+
+    def __init__(self, messages):
+        self._messages = messages
+
+    async def strings(self):
+        for msg in self._messages:
+            yield msg
+
+
+async def run(messages, **options):
+    writer = AsyncMock()
+    proc = processor.TSS2RDFProcessorPy(processor.TemplateArgs(reader=DummyReader(messages), writer=writer, **options))
+    await proc.init()
+    await proc.transform()
+    writer.close.assert_awaited_once()
+    return [call.args[0] for call in writer.string.call_args_list]
+
+
+@pytest.mark.asyncio
+async def test_streamed_triples_match_the_graph_mode():
+    streamed = await run(MESSAGES, streaming=True)
+    graph = await run(MESSAGES)
+    result = Graph().parse(data="".join(streamed), format="nt")
+    expected = Graph().parse(data=graph[-1], format="turtle")
+    assert len(result) == len(expected) == 11 * 5 + 2 * 4 + 3 * 5
+    assert isomorphic(result, expected)
+
+
+@pytest.mark.asyncio
+async def test_batches_are_bounded():
+    streamed = await run(MESSAGES, streaming=True, batchTriples=12)
+    # whole points are written, at most 5 triples each, the rest of a message is written when it ends
+    assert len(streamed) > 5
+    assert all(text.count("\n") <= 12 for text in streamed)
+    assert sum(text.count("\n") for text in streamed) == 11 * 5 + 2 * 4 + 3 * 5
+
+
+@pytest.mark.asyncio
+async def test_point_larger_than_the_batch_is_written_on_its_own():
+    streamed = await run(MESSAGES[1:], streaming=True, batchTriples=3)
+    assert [text.count("\n") for text in streamed] == [5, 5, 5]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("workers", [1, 2])
+async def test_streamed_terms_are_n_triples(workers):
+    # n3() writes the multi-line comment as a Turtle long string, the id has characters an IRIREF does not allow
+    about = 'sosa:madeBySensor ex:sensor{0} ; ex:comment """first line\nsecond "line\"""" ; ex:label "Pegel"@de'
+    points = json.dumps([{"time": "2025-08-12T12:00:00+00:00", "value": "1",
+                          "id": "http://example.com/reading 1/{a|b}^`<x>"}])
+    streamed = await run([PREFIXES + snippet(1, points, about)], streaming=True, workers=workers)
+    text = "".join(streamed)
+    assert '"""' not in text
+    assert text.count("\n") == 6
+    result = Graph().parse(data=text, format="nt")
+    reading = URIRef("http://example.com/reading 1/{a|b}^`<x>")
+    assert result.value(reading, URIRef("http://example.com/comment")) == Literal('first line\nsecond "line"')
+    assert result.value(reading, URIRef("http://example.com/label")) == Literal("Pegel", lang="de")
+    assert len(result) == 6
+
+
+@pytest.mark.parametrize("text", [
+    array(1, VALUES),
+    " [ ] ",
+    '[\n {"time": "t", "value": 1.50, "id": "i"} ,\n{"time": "u", "value": "x", "id": "j"}\n]',
+    COLUMNAR,
+    '{"start":"2025-08-12T12:00:00+02:00","deltas":[60.5],"values":[1,"text"],"ids":["http://a","http://b"]}',
+])
+def test_iter_points_matches_decode_points(text):
+    assert list(iter_points(text)) == decode_points(text)
+
+
+def test_iter_points_rejects_broken_arrays():
+    with pytest.raises(ValueError):
+        list(iter_points('[{"time": "t"} {"time": "u"}]'))
@@ -0,0 +1,71 @@
+import random
+
+import pytest
+from rdflib import Literal
+from rdflib.namespace import XSD
+
+from TSS2RDFProcessorPy.values import (BOOLEAN, DECIMAL, NUMBER, STRING, classify, value_literal, value_literals,
+                                       value_nt, value_nts)
+
+EDGE_CASES = ["true", "false", "TRUE", "True", " true", "", " ", "nan", "NaN", "-nan", "inf", "-Infinity", "+inf",
+              "infinit", "1e5", "1E-7", "-2.5e+300", "1e400", "1e", "e5", ".5", "5.", ".", "-0", "0.0", "007",
+              "1_000", "1__000", "_1", "1_", " 42 ", "\t3.5\n", "\x1c1", "0x10", "1,5", "12a", "١٢", "１.５",
+              "\xa01", "a \"quoted\" value", "line\nbreak", "back\\slash"]
+
+
+@pytest.mark.parametrize("values", [EDGE_CASES, ["1.5", "2", "-3e2", "nan", "true"], ["a", "b", "a"], []])
+def test_columns_typed_as_value_by_value(values):
+    assert value_literals(values) == [value_literal(value) for value in values]
+    assert value_nts(values) == [value_nt(value) for value in values]
+
+
+def test_edge_cases():
+    literals = dict(zip(EDGE_CASES, value_literals(EDGE_CASES)))
+    assert literals["true"] == Literal("true", datatype=XSD.boolean)
+    # only the lower case forms are booleans, the others are not numbers either
+    assert literals["TRUE"].datatype == XSD.string
+    assert literals[" true"].datatype == XSD.string
+    assert literals[""] == Literal("", datatype=XSD.string)
+    assert literals["1e5"] == Literal(100000.0, datatype=XSD.decimal)
+    assert literals["1e400"] == Literal(float("inf"), datatype=XSD.decimal)
+    assert literals[" 42 "] == Literal(42.0, datatype=XSD.decimal)
+    assert literals["1_000"] == Literal(1000.0, datatype=XSD.decimal)
+    assert literals["1__000"].datatype == XSD.string
+    assert literals["١٢"] == Literal(12.0, datatype=XSD.decimal)
+    assert str(literals["nan"]) == "nan" and literals["nan"].datatype == XSD.decimal
+
+
+def test_special_floats_in_n_triples():
+    # the XSD names the Turtle output of the graph mode has for them
+    values = ["nan", "-Infinity", "inf", "1e5"]
+    assert value_nts(values) == [literal.n3() for literal in value_literals(values)]
+    assert value_nts(values)[0] == '"NaN"^^<http://www.w3.org/2001/XMLSchema#decimal>'
+
+
+def test_classify():
+    kinds, numbers = classify(["true", "2.5", "x", "nan"])
+    assert kinds.tolist() == [BOOLEAN, DECIMAL, STRING, DECIMAL]
+    assert numbers[1] == 2.5
+
+
+def test_number_grammar_matches_float():
+    def reads(value):
+        try:
+            float(value)
+            return True
+        except ValueError:
+            return False
+
+    alphabet = "0123456789_.eE+-nNaAiIfFtTyY \t\n\x0b\x0c\r\x1cx"
+    generator = random.Random(1)
+    for _ in range(20000):
+        value = "".join(generator.choice(alphabet) for _ in range(generator.randint(0, 8)))
+        assert (NUMBER.fullmatch(value) is not None) == reads(value), repr(value)
+
+
+def test_values_that_are_not_strings():
+    # JSON true and numbers are typed one by one, as before
+    values = [True, "1.5", 2]
+    assert value_literals(values) == [value_literal(value) for value in values]
+    with pytest.raises(TypeError):
+        value_literals(["1.5", None])